@@ -0,0 +1,105 @@
+"""
+Asset proxy cold/warm benchmark
+
+Runs a local stand-in for the CDN that adds a fixed delay to every response
+(what a slow link looks like), then fetches the same set of assets through
+the caching proxy twice: once with an empty cache and once warm. A third pass
+uses a fresh proxy on the same cache directory, which is what a restart sees.
+
+Usage:
+    python benchmarks/bench_asset_proxy.py --delay 0.2 --assets 6
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.asset_proxy import CachingAssetProxy
+
+
+def make_origin_handler(assets, delay, max_age):
+    class OriginHandler(BaseHTTPRequestHandler):
+        requests_seen = 0
+        not_modified = 0
+
+        def do_GET(self):
+            type(self).requests_seen += 1
+            time.sleep(delay)
+            body = assets.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                type(self).not_modified += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", f"max-age={max_age}")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/javascript")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", f"max-age={max_age}")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return OriginHandler
+
+
+def fetch_all(proxy, urls):
+    start = time.perf_counter()
+    statuses = [proxy.fetch(url)[3] for url in urls]
+    return (time.perf_counter() - start) * 1000, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the disk-backed asset proxy")
+    parser.add_argument("--assets", type=int, default=6, help="Number of distinct assets")
+    parser.add_argument("--size", type=int, default=128 * 1024, help="Size of each asset in bytes")
+    parser.add_argument("--delay", type=float, default=0.2, help="Origin delay per request in seconds")
+    parser.add_argument("--max-age", type=int, default=3600,
+                        help="Origin max-age; 0 forces revalidation on every fetch")
+    args = parser.parse_args()
+
+    assets = {f"/npm/lib{i}.min.js": os.urandom(args.size) for i in range(args.assets)}
+    handler = make_origin_handler(assets, args.delay, args.max_age)
+    origin = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=origin.serve_forever, daemon=True).start()
+    host = f"127.0.0.1:{origin.server_address[1]}"
+    urls = [f"http://{host}{path}" for path in assets]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        def new_proxy():
+            return CachingAssetProxy(cache_dir, allowed_hosts=(host,), allowed_schemes=("http",))
+
+        print(f"{args.assets} assets x {args.size} bytes, origin delay {args.delay * 1000:.0f} ms, "
+              f"max-age {args.max_age}")
+        print(f"{'pass':<12}{'total ms':>10}  cache status")
+        proxy = new_proxy()
+        for label in ("cold", "warm"):
+            elapsed, statuses = fetch_all(proxy, urls)
+            print(f"{label:<12}{elapsed:>10.1f}  {', '.join(sorted(set(statuses)))}")
+        elapsed, statuses = fetch_all(new_proxy(), urls)
+        print(f"{'restart':<12}{elapsed:>10.1f}  {', '.join(sorted(set(statuses)))}")
+
+        print(f"proxy stats: {proxy.get_stats()}")
+        print(f"origin requests: {handler.requests_seen} ({handler.not_modified} answered 304)")
+
+    origin.shutdown()
+    origin.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Delta update vs full download, bytes on the wire
+
+Builds a stand-in install (a large incompressible DeepSeekChat.exe and
+auto-updater.exe, the injection folder, version.txt) and a "next release"
+where only injection/inject.js and version.txt changed. The release zip and
+its manifest (written by build.write_manifest) are served by a local stub
+that supports Range. The updater's prepare_delta_update/install_delta_update
+then bring the install up to date; the script reports the bytes and
+requests used against the size of the full zip, checks that the install now
+matches the manifest, and checks the fallback when the server ignores Range.
+
+Usage:
+    python benchmarks/bench_delta_update.py --exe-mb 24
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from build import write_manifest
+from utils import auto_update
+
+
+def make_release(directory, exe_mb, version, inject_js):
+    os.makedirs(os.path.join(directory, "injection"), exist_ok=True)
+    with open(os.path.join(directory, "version.txt"), "w") as f:
+        f.write(version)
+    with open(os.path.join(directory, "injection", "inject.js"), "w") as f:
+        f.write(inject_js)
+    for name, source in (("injection/style.css", os.path.join(ROOT, "injection", "style.css")),
+                         ("deepseek.ico", os.path.join(ROOT, "deepseek.ico"))):
+        if os.path.exists(source):
+            shutil.copy2(source, os.path.join(directory, *name.split("/")))
+
+
+def make_handler(files, ranges):
+    class ReleaseHandler(BaseHTTPRequestHandler):
+        bytes_sent = 0
+        requests_seen = 0
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            type(self).requests_seen += 1
+            body = files.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            range_header = self.headers.get("Range", "")
+            if ranges and range_header.startswith("bytes="):
+                first, _, last = range_header[len("bytes="):].partition("-")
+                if first == "":
+                    start, end = max(0, len(body) - int(last)), len(body) - 1
+                else:
+                    start, end = int(first), min(int(last) if last else len(body) - 1, len(body) - 1)
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{len(body)}")
+            else:
+                start, end = 0, len(body) - 1
+                self.send_response(200)
+            self.send_header("ETag", '"release-2"')
+            self.send_header("Content-Length", str(end - start + 1))
+            self.end_headers()
+            try:
+                self.wfile.write(body[start:end + 1])
+                type(self).bytes_sent += end - start + 1
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    return ReleaseHandler
+
+
+def serve(files, ranges):
+    handler = make_handler(files, ranges)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, handler, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure delta update bytes against the full zip")
+    parser.add_argument("--exe-mb", type=float, default=24, help="Size of the stand-in executable")
+    args = parser.parse_args()
+
+    logger = logging.getLogger("bench-delta")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    auto_update.console.quiet = True
+
+    work = tempfile.mkdtemp(prefix="bench-delta-")
+    auto_update.TEMP_DIR = os.path.join(work, "tmp")
+    os.makedirs(auto_update.TEMP_DIR)
+    old_dir, new_dir = os.path.join(work, "install"), os.path.join(work, "built")
+    with open(os.path.join(ROOT, "injection", "inject.js"), encoding="utf-8") as f:
+        inject_js = f.read()
+
+    make_release(old_dir, args.exe_mb, "0.1.69", inject_js)
+    make_release(new_dir, args.exe_mb, "0.1.70", inject_js.replace("const CONFIG", "// 0.1.70\nconst CONFIG", 1))
+    # Binaries are identical between the two releases
+    for name, size in (("DeepSeekChat.exe", args.exe_mb), ("auto-updater.exe", args.exe_mb / 3)):
+        data = os.urandom(int(size * 1024 * 1024))
+        for directory in (old_dir, new_dir):
+            with open(os.path.join(directory, name), "wb") as f:
+                f.write(data)
+
+    zip_path = os.path.join(work, "DeepSeekChat-windows.zip")
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for root, _, names in os.walk(new_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                archive.write(path, os.path.relpath(path, new_dir).replace(os.sep, "/"))
+    manifest_path = os.path.join(work, "manifest.json")
+    write_manifest(new_dir, manifest_path, "0.1.70")
+    with open(zip_path, "rb") as f:
+        zip_bytes = f.read()
+    with open(manifest_path, "rb") as f:
+        manifest_bytes = f.read()
+    files = {"/DeepSeekChat-windows.zip": zip_bytes, "/DeepSeekChat-windows.manifest.json": manifest_bytes}
+
+    def release_info(base):
+        assets = [{"name": name.lstrip("/"), "browser_download_url": base + name} for name in files]
+        return {"tag_name": "v0.1.70", "assets": assets}, assets[0]
+
+    print(f"Full zip: {auto_update.format_size(len(zip_bytes))}, "
+          f"manifest: {auto_update.format_size(len(manifest_bytes))}\n")
+
+    # Delta against a server that supports Range
+    server, handler, base = serve(files, ranges=True)
+    info, asset = release_info(base)
+    delta_dir = auto_update.prepare_delta_update(info, asset, old_dir, logger)
+    ok = delta_dir is not None
+    if ok:
+        backup_dir = os.path.join(work, "backup")
+        os.makedirs(backup_dir)
+        ok = auto_update.install_delta_update(delta_dir, old_dir, backup_dir, logger)
+        manifest = json.loads(manifest_bytes)
+        ok = ok and not auto_update.changed_manifest_files(manifest, old_dir)
+    print(f"delta       {auto_update.format_size(handler.bytes_sent):>10} in {handler.requests_seen} requests "
+          f"({len(zip_bytes) / max(1, handler.bytes_sent):.0f}x less than the zip)  "
+          f"{'install matches manifest' if ok else 'FAILED'}")
+    server.shutdown()
+
+    # Same release from a server that ignores Range: must fall back, not download the zip twice
+    shutil.rmtree(os.path.join(work, "install"))
+    make_release(old_dir, args.exe_mb, "0.1.69", inject_js)
+    server, handler, base = serve(files, ranges=False)
+    info, asset = release_info(base)
+    fallback = auto_update.prepare_delta_update(info, asset, old_dir, logger)
+    print(f"no ranges   {auto_update.format_size(handler.bytes_sent):>10} in {handler.requests_seen} requests "
+          f"(body of the 200 left unread)  {'fell back' if fallback is None else 'FAILED'}")
+    server.shutdown()
+    shutil.rmtree(work, ignore_errors=True)
+    sys.exit(0 if ok and fallback is None else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Download loop CPU cost: per-chunk progress vs sampled progress
+
+Serves a large asset from a separate process as fast as loopback allows and
+downloads it three ways, measuring the client's CPU time (all threads):
+
+  before      the previous loop: iter_content(8192), with speed, ETA,
+              three format_size calls, strftime and a rich Progress.update
+              for every chunk
+  after/rich  download_release_with_retry with readinto into an adaptive
+              buffer and a 10 Hz ProgressSampler driving the rich bar
+  after/none  the same with HeadlessProgressUI (no rendering)
+
+All three hash the bytes with SHA-256 and write them to disk, so the
+difference is the loop and the rendering. The rich console renders to
+/dev/null as a terminal, so drawing costs are real but nothing is shown.
+
+Usage:
+    python benchmarks/bench_download_cpu.py --size-mb 512
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BLOCK = os.urandom(1024 * 1024)
+
+
+def serve(size):
+    class AssetHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", str(size))
+            self.send_header("ETag", '"cpu-bench"')
+            self.end_headers()
+            remaining = size
+            view = memoryview(BLOCK)
+            try:
+                while remaining:
+                    count = min(remaining, len(BLOCK))
+                    self.wfile.write(view[:count])
+                    remaining -= count
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), AssetHandler)
+    print(server.server_address[1], flush=True)
+    server.serve_forever()
+
+
+def legacy_download(auto_update, url, path):
+    """The download loop as it was before progress sampling"""
+    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
+
+    format_size = auto_update.format_size
+    hasher = hashlib.sha256()
+    with auto_update.get_session().get(url, stream=True, timeout=(5, 30)) as r:
+        total_size = int(r.headers.get('content-length', 0))
+        downloaded = 0
+        start_time = time.time()
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.percentage:>3.1f}%"),
+            TextColumn("[progress.file_size]{task.fields[downloaded_str]} / {task.fields[total_size_str]}"),
+            TextColumn("[progress.rate]{task.fields[speed]}"),
+            TextColumn("[progress.eta]{task.fields[eta]}"),
+            console=auto_update.console,
+            expand=True
+        ) as progress:
+            task = progress.add_task("[cyan]Downloading", total=total_size, downloaded_str="0 B",
+                                     total_size_str="0 B", speed="0 B/s", eta="Calculating...")
+            with open(path, 'wb') as f:
+                for chunk in r.iter_content(chunk_size=8192):
+                    if chunk:
+                        f.write(chunk)
+                        hasher.update(chunk)
+                        downloaded += len(chunk)
+                        elapsed = time.time() - start_time
+                        speed = downloaded / elapsed if elapsed > 0 else 0
+                        if speed > 0:
+                            eta_str = time.strftime("%H:%M:%S", time.gmtime((total_size - downloaded) / speed))
+                        else:
+                            eta_str = "Calculating..."
+                        progress.update(task,
+                                        advance=len(chunk),
+                                        downloaded_str=format_size(downloaded),
+                                        total_size_str=format_size(total_size),
+                                        speed=format_size(speed) + "/s",
+                                        eta=eta_str)
+    return hasher.hexdigest()
+
+
+def measure(fn):
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    fn()
+    return time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU time per GB of the updater's download loop")
+    parser.add_argument("--size-mb", type=int, default=512, help="Asset size in MB")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve)
+        return
+
+    from rich.console import Console
+    from utils import auto_update
+
+    size = args.size_mb * 1024 * 1024
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", str(size)],
+                              stdout=subprocess.PIPE, text=True)
+    try:
+        url = f"http://127.0.0.1:{server.stdout.readline().strip()}/windows.zip"
+        devnull = open(os.devnull, "w")
+        auto_update.console = Console(file=devnull, force_terminal=True, width=120)
+        logger = logging.getLogger("bench-cpu")
+        logger.addHandler(logging.NullHandler())
+        logger.propagate = False
+        work_dir = tempfile.mkdtemp(prefix="bench-cpu-")
+        auto_update.TEMP_DIR = work_dir
+
+        def after(ui_factory):
+            def run():
+                path = auto_update.download_release_with_retry(url, "windows.zip", logger, segmented=False,
+                                                               ui_factory=ui_factory)
+                os.remove(path)
+            return run
+
+        runs = [
+            ("before", lambda: legacy_download(auto_update, url, os.path.join(work_dir, "legacy.zip"))),
+            ("after/rich", after(auto_update.RichProgressUI)),
+            ("after/none", after(auto_update.HeadlessProgressUI)),
+        ]
+        print(f"Asset {args.size_mb} MB over loopback\n")
+        print(f"{'loop':<12} {'CPU s/GB':>9} {'wall s':>8} {'MB/s':>8}")
+        for label, fn in runs:
+            cpu, wall = measure(fn)
+            gb = size / (1024 ** 3)
+            print(f"{label:<12} {cpu / gb:>9.2f} {wall:>8.2f} {args.size_mb / wall:>8.0f}")
+        devnull.close()
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Local asset server load benchmark
+
+Starts the local server in each mode against a temporary directory and
+hammers it with concurrent keep-alive clients, optionally while a few
+"stalled" connections sit open without sending anything (what a stuck
+request looks like to the old single-threaded server).
+
+Usage:
+    python benchmarks/bench_local_server.py --clients 8 --requests 200 --stalled 1
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.local_server import LocalAssetServer
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_client(port, path, count, latencies, errors):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def bench_mode(mode, directory, clients, requests_per_client, stalled, request_timeout):
+    server = LocalAssetServer(directory=directory, host="127.0.0.1", port=0, mode=mode,
+                              request_timeout=request_timeout, served_paths=("asset.js",))
+    port = server.start()
+
+    # Connections that never send a request line
+    stalled_socks = []
+    for _ in range(stalled):
+        sock = socket.create_connection(("127.0.0.1", port))
+        stalled_socks.append(sock)
+    time.sleep(0.05)
+
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=run_client, args=(port, "/asset.js", requests_per_client, latencies, errors))
+        for _ in range(clients)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    for sock in stalled_socks:
+        sock.close()
+    server.stop()
+
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "elapsed": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the local asset server modes")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent client connections")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per client")
+    parser.add_argument("--stalled", type=int, default=1, help="Idle connections held open during the run")
+    parser.add_argument("--size", type=int, default=32 * 1024, help="Size of the served asset in bytes")
+    parser.add_argument("--timeout", type=float, default=2.0, help="Server request timeout in seconds")
+    parser.add_argument("--modes", nargs="+", default=list(LocalAssetServer.MODES),
+                        choices=LocalAssetServer.MODES)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "asset.js"), "wb") as f:
+            f.write(b"/* benchmark */\n" + b"x" * args.size)
+
+        print(f"{args.clients} clients x {args.requests} requests, {args.stalled} stalled connection(s), "
+              f"{args.size} byte asset")
+        print(f"{'mode':<10}{'requests':>10}{'errors':>8}{'req/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'total s':>10}")
+        for mode in args.modes:
+            r = bench_mode(mode, directory, args.clients, args.requests, args.stalled, args.timeout)
+            print(f"{r['mode']:<10}{r['requests']:>10}{r['errors']:>8}{r['rps']:>12.1f}"
+                  f"{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['elapsed']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Local server discovery latency benchmark
+
+Compares the old startup path (test-bind ports from 8080 upwards, rebind
+the server, then have the page probe a fixed port list over HTTP) with
+binding once to an OS-assigned port whose number is handed to the page.
+
+Usage:
+    python benchmarks/bench_port_discovery.py --busy 3 --runs 20
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.local_server import LocalAssetServer
+
+PROBE_PORTS = [8080, 8081, 8082, 8083, 8084, 8085]
+
+
+def legacy_find_available_port(start_port=8080):
+    for port in range(start_port, start_port + 100):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            try:
+                sock.bind(("", port))
+                return port
+            except OSError:
+                continue
+    return None
+
+
+def probe(port):
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/port", timeout=2) as response:
+            return response.status == 200
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+def legacy_discovery(directory):
+    start = time.perf_counter()
+    port = legacy_find_available_port()
+    server = LocalAssetServer(directory=directory, host="", port=port, served_paths=())
+    server.token = None
+    server.start()
+    # What the page had to do: walk the hardcoded list until something answers
+    found = None
+    for candidate in PROBE_PORTS:
+        if probe(candidate):
+            found = candidate
+            break
+    elapsed = time.perf_counter() - start
+    server.stop()
+    return elapsed, found == port
+
+
+def direct_discovery(directory):
+    start = time.perf_counter()
+    server = LocalAssetServer(directory=directory, port=0, served_paths=())
+    config = server.client_config() if server.start() else None
+    elapsed = time.perf_counter() - start
+    server.stop()
+    return elapsed, config is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local server port discovery")
+    parser.add_argument("--busy", type=int, default=3, help="Ports from 8080 upwards to occupy first")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    blockers = []
+    for port in range(8080, 8080 + args.busy):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.bind(("", port))
+            sock.listen(1)
+            blockers.append(sock)
+        except OSError:
+            sock.close()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, fn in (("probe", legacy_discovery), ("direct", direct_discovery)):
+            samples, ok = [], 0
+            for _ in range(args.runs):
+                elapsed, success = fn(directory)
+                samples.append(elapsed * 1000)
+                ok += success
+            print(f"{name:<8} median {statistics.median(samples):8.2f} ms   "
+                  f"max {max(samples):8.2f} ms   found {ok}/{args.runs}")
+
+    for sock in blockers:
+        sock.close()
+
+
+if __name__ == "__main__":
+    main()
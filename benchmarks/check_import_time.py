@@ -0,0 +1,116 @@
+"""
+Import-time budget check for main.py
+
+Runs `python -X importtime -c "import main"` a few times and fails (exit 1)
+when importing main.py takes longer than the budget, or when any of the
+heavy modules that should only load on first use shows up at import time.
+Run it after touching imports; CI can call it as a regression gate.
+
+Usage:
+    python benchmarks/check_import_time.py                 # default budget
+    python benchmarks/check_import_time.py --budget-ms 80 --runs 7
+    python benchmarks/check_import_time.py --top 15        # show the slowest imports
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only needed once the window opens, an update check runs or a dev tool starts
+DEFERRED_MODULES = (
+    "webview",
+    "requests",
+    "tqdm",
+    "rich",
+    "customtkinter",
+    "tkinter",
+    "clr",
+    "watchdog",
+    "cProfile",
+    "utils.auto_update",
+)
+
+
+def parse_importtime(stderr):
+    """Return [(name, self_us, cumulative_us, depth)] from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # header line
+        raw_name = fields[2].rstrip()
+        name = raw_name.lstrip()
+        depth = (len(raw_name) - len(name) - 1) // 2
+        rows.append((name, self_us, cumulative_us, depth))
+    return rows
+
+
+def measure(module):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    rows = parse_importtime(result.stderr)
+    total = next((cumulative for name, _, cumulative, _ in rows if name == module), None)
+    if total is None:
+        raise RuntimeError(f"No importtime entry for {module}")
+    return total, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when importing main.py gets too slow")
+    parser.add_argument("--module", default="main", help="Module to import (default: main)")
+    parser.add_argument("--budget-ms", type=float, default=150.0,
+                        help="Maximum median cumulative import time in ms (default: 150)")
+    parser.add_argument("--runs", type=int, default=5, help="Number of measured imports")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    # First run writes .pyc files; a frozen build always has them
+    measure(args.module)
+
+    totals = []
+    rows = []
+    for _ in range(args.runs):
+        total, rows = measure(args.module)
+        totals.append(total)
+    median_ms = statistics.median(totals) / 1000
+
+    imported = {name for name, _, _, _ in rows}
+    leaked = sorted(name for name in imported
+                    if any(name == heavy or name.startswith(heavy + ".") for heavy in DEFERRED_MODULES))
+
+    print(f"import {args.module}: median {median_ms:.1f} ms over {args.runs} runs "
+          f"(min {min(totals) / 1000:.1f}, max {max(totals) / 1000:.1f}), budget {args.budget_ms:.0f} ms")
+    print("\nSlowest imports (cumulative, last run):")
+    # Direct children of the measured module are what main.py itself asks for
+    direct = [row for row in rows if row[3] == 1]
+    for name, self_us, cumulative_us, _ in sorted(direct, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:>8.1f} ms  {name}")
+
+    ok = True
+    if leaked:
+        print(f"\n[FAIL] Deferred modules imported at startup: {', '.join(leaked)}")
+        ok = False
+    if median_ms > args.budget_ms:
+        print(f"\n[FAIL] Import time {median_ms:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        ok = False
+    if ok:
+        print("\n[OK] Within budget")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+AsyncLogWriter rotation failure check
+
+Makes os.replace fail, as it does on Windows while another process holds
+the log open, and writes enough records through a small max_bytes writer
+to need several rotations. Every record must still land in the live file.
+Then lets os.replace work again and checks that rotation resumes and that
+no record was lost across the live file and its backups, and that records
+submitted after close() are dropped. Exits 1 on any failure.
+
+Usage:
+    python benchmarks/check_log_writer.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import log_writer
+from utils.log_store import LogStore
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+def main():
+    log_dir = tempfile.mkdtemp(prefix="check-log-writer-")
+    store = LogStore()
+    writer = log_writer.AsyncLogWriter(log_dir, max_bytes=200, compress=False, flush_interval=0.02,
+                                       retry_interval=0.5)
+    original_replace = os.replace
+    failing = [True]
+
+    def flaky_replace(src, dst):
+        if failing[0]:
+            raise PermissionError(13, "The process cannot access the file", src)
+        return original_replace(src, dst)
+
+    log_writer.os.replace = flaky_replace
+    results = []
+    try:
+        writer.start()
+        for i in range(20):
+            writer.submit(store.append(f"locked message {i:02d}"))
+            time.sleep(0.01)
+        ok = wait_for(lambda: len(read_lines(writer.path)) == 20)
+        results.append(("records kept while rotation fails",
+                        ok, f"{len(read_lines(writer.path))}/20 in the live file"))
+
+        failing[0] = False
+        time.sleep(0.6)
+        for i in range(20):
+            writer.submit(store.append(f"unlocked message {i:02d}"))
+            time.sleep(0.01)
+        writer.close()
+        names = sorted(os.listdir(log_dir))
+        lines = [line for name in names for line in read_lines(os.path.join(log_dir, name))]
+        missing = [i for i in range(20) if not any(f"unlocked message {i:02d}" in line for line in lines)]
+        results.append(("rotation resumes afterwards",
+                        len(names) > 1 and not missing, f"files={len(names)} missing={len(missing)}"))
+
+        writer.submit(store.append("after close"))
+        results.append(("submit after close is dropped",
+                        writer._queue.empty(), f"queued={writer._queue.qsize()}"))
+    finally:
+        log_writer.os.replace = original_replace
+        writer.close()
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+    for label, ok, detail in results:
+        print(f"[{'OK' if ok else 'FAIL'}] {label:<34} {detail}")
+    sys.exit(0 if all(ok for _, ok, _ in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
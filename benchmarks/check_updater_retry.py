@@ -0,0 +1,197 @@
+"""
+Updater retry policy check against a fault-injecting stub server
+
+Starts a local HTTP server whose endpoints misbehave in scripted ways
+(503 bursts, 429 with Retry-After, 404, a connection dropped mid-body with
+and without Range support, a flipped byte, a server that never answers)
+and runs the updater's real fetch and download functions against it with
+a fast RetryPolicy. Prints one line per scenario with the request count,
+body bytes sent and wall time; exits 1 if any scenario misbehaves.
+
+Usage:
+    python benchmarks/check_updater_retry.py
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import auto_update
+from utils.auto_update import DeadlineExceeded, RetryPolicy
+
+RELEASE = json.dumps({"tag_name": "v9.9.9", "assets": []}).encode("utf-8")
+PAYLOAD = os.urandom(256 * 1024)
+ETAG = '"stub-asset-1"'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Each path is a script: the n-th request to it gets the n-th action"""
+
+    scripts = {
+        "/flaky": ["503", "503", "ok"],
+        "/limited": ["429", "ok"],
+        "/missing": ["404"],
+        "/dropped": ["drop", "ok"],
+        "/dropped-no-ranges": ["drop", "full"],
+        "/dropped-verified": ["drop", "ok"],
+        "/corrupt": ["corrupt"],
+        "/hang": ["hang"],
+        "/down": ["503"],
+    }
+    counts = {}
+    bytes_sent = {}
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        with self.lock:
+            n = self.counts.get(self.path, 0)
+            self.counts[self.path] = n + 1
+        script = self.scripts.get(self.path, ["404"])
+        action = script[min(n, len(script) - 1)]
+        body = PAYLOAD if self.path.startswith("/dropped") else RELEASE
+
+        range_header = self.headers.get("Range", "")
+        if action == "ok" and range_header.startswith("bytes=") and self.headers.get("If-Range") == ETAG:
+            start = int(range_header[len("bytes="):].split("-")[0])
+            self.send_response(206)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+            self.send_header("Content-Length", str(len(body) - start))
+            self.end_headers()
+            self._send(body[start:])
+        elif action in ("ok", "full"):
+            self.send_response(200)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self._send(body)
+        elif action == "corrupt":
+            bad = bytearray(body)
+            bad[len(bad) // 2] ^= 0xFF
+            self.send_response(200)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", str(len(bad)))
+            self.end_headers()
+            self._send(bytes(bad))
+        elif action == "drop":
+            # Promise the whole body, send half, then hang up
+            self.send_response(200)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self._send(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+        elif action == "hang":
+            time.sleep(5)
+            self.send_error(503)
+        elif action == "429":
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self.send_response(int(action))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def _send(self, data):
+        with self.lock:
+            self.bytes_sent[self.path] = self.bytes_sent.get(self.path, 0) + len(data)
+        self.wfile.write(data)
+
+
+def main():
+    logger = logging.getLogger("retry-check")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    work_dir = tempfile.mkdtemp(prefix="retry-check-")
+    auto_update.TEMP_DIR = work_dir
+    auto_update.RELEASE_CACHE_FILE = os.path.join(work_dir, "latest-release.json")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    fast = RetryPolicy(max_attempts=5, base_delay=0.05, max_delay=0.2, deadline=10,
+                       connect_timeout=1, read_timeout=2)
+    tight = RetryPolicy(max_attempts=100, base_delay=0.05, max_delay=0.2, deadline=1.5,
+                        connect_timeout=1, read_timeout=0.5)
+
+    def fetch(path, policy=fast):
+        auto_update.REPO_URL = base + path
+        try:
+            os.remove(auto_update.RELEASE_CACHE_FILE)
+        except OSError:
+            pass
+        return auto_update.fetch_latest_version_with_retry(logger, policy)[0]
+
+    def download(path, expected_sha256=None):
+        zip_path = auto_update.download_release_with_retry(base + path, "stub.zip", logger, fast,
+                                                           segmented=False, expected_sha256=expected_sha256)
+        if not zip_path:
+            return None
+        with open(zip_path, "rb") as f:
+            return f.read() == PAYLOAD
+
+    def run_raw(path, policy):
+        def attempt(timeout):
+            return policy.check(auto_update.get_session().get(base + path, timeout=timeout))
+        try:
+            policy.run(attempt, logger, path)
+        except DeadlineExceeded:
+            return "deadline"
+        except Exception as e:
+            return type(e).__name__
+        return "ok"
+
+    digest = hashlib.sha256(PAYLOAD).hexdigest()
+
+    # (name, path, call, expected result, expected requests, max seconds)
+    scenarios = [
+        ("503 burst is retried", "/flaky", lambda: fetch("/flaky"), "9.9.9", 3, 2.0),
+        ("429 waits for Retry-After", "/limited", lambda: fetch("/limited"), "9.9.9", 2, 2.5),
+        ("404 fails fast", "/missing", lambda: fetch("/missing"), None, 1, 0.5),
+        ("dropped body is resumed", "/dropped", lambda: download("/dropped"), True, 2, 3.0),
+        ("no Range support restarts cleanly", "/dropped-no-ranges",
+         lambda: download("/dropped-no-ranges"), True, 2, 3.0),
+        ("resumed download passes SHA-256", "/dropped-verified",
+         lambda: download("/dropped-verified", digest), True, 2, 3.0),
+        ("corrupt download is rejected", "/corrupt", lambda: download("/corrupt", digest), None, 1, 3.0),
+        ("hung server hits the deadline", "/hang", lambda: run_raw("/hang", tight), "deadline", None, 2.5),
+        ("persistent 503 stops at the deadline", "/down", lambda: run_raw("/down", tight), "deadline", None, 2.0),
+    ]
+
+    failures = 0
+    auto_update.console.quiet = True
+    for name, path, call, expected, expected_requests, max_seconds in scenarios:
+        start = time.perf_counter()
+        result = call()
+        elapsed = time.perf_counter() - start
+        seen = StubHandler.counts.get(path, 0)
+        ok = (result == expected and elapsed <= max_seconds
+              and (expected_requests is None or seen == expected_requests))
+        failures += not ok
+        sent = StubHandler.bytes_sent.get(path, 0)
+        print(f"[{'OK' if ok else 'FAIL'}] {name:<38} result={result!r:<10} "
+              f"requests={seen:<3} sent={sent // 1024:>4} KB {elapsed:5.2f}s")
+
+    server.shutdown()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ import shutil
 import subprocess
 import sys
 import argparse
+import hashlib
+import json
 import re  # For parsing version from workflow file
 
 def get_version_from_workflow():
@@ -31,6 +33,26 @@ def get_version_from_workflow():
         print(f"Error reading workflow file: {e}")
         return "0.0.0"
 
+def write_manifest(dist_dir, output_path, version):
+    """Write the per-file manifest (path, size, sha256) the updater uses for delta updates"""
+    files = []
+    for root, _, names in os.walk(dist_dir):
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            hasher = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    hasher.update(block)
+            files.append({
+                "path": os.path.relpath(path, dist_dir).replace(os.sep, "/"),
+                "size": os.path.getsize(path),
+                "sha256": hasher.hexdigest()
+            })
+    files.sort(key=lambda entry: entry["path"])
+    with open(output_path, 'w') as f:
+        json.dump({"version": version, "files": files}, f, indent=2)
+    print(f"Created {output_path} with {len(files)} files")
+
 def build_app(fresh=False):
     # Ensure required files exist
     if not os.path.exists("injection"):
@@ -87,6 +109,15 @@ def build_app(fresh=False):
         f.write(version)
     print(f"Created version.txt with version: {version}")
     
+    # Vendor marked, DOMPurify and fonts so the app does not depend on CDNs at startup
+    vendor_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "utils", "vendor_assets.py")
+    result = subprocess.run([sys.executable, vendor_script], capture_output=True, text=True)
+    print(result.stdout)
+    if result.returncode != 0:
+        print("Warning: vendoring third-party assets failed; the app will fall back to the CDN.")
+        if result.stderr:
+            print("Error:", result.stderr)
+
     # Define resources to copy to built directory
     resources_to_copy = [
         ("injection", "injection"),  # (source, destination)
@@ -143,6 +174,9 @@ def build_app(fresh=False):
         else:
             shutil.copy(src_path, dest_path)
     
+    # Published next to the release zip; kept outside built/ so it is not zipped itself
+    write_manifest(dist_dir, "manifest.json", version)
+
     print("\nBuild complete! Executable and resources are in ./built/ directory")
     
     # Open the output directory in Explorer
@@ -3,6 +3,69 @@
  * Optimized for performance, stability, and UI/UX
  */
 
+// ==========================================
+// 0. LIFECYCLE
+// ==========================================
+// Everything this script attaches to the page is registered here so that a
+// re-injection (dev hot reload) can remove the previous instance first.
+const Lifecycle = {
+    // True when an earlier injection is still live in this document
+    isReload: typeof window.__dsTeardown === 'function',
+    alive: true,
+    disposers: [],
+    timers: new Set(),
+    // Elements created by this script; removed on teardown
+    ownedIds: ['ds-styles', 'ds-ui-wrapper', 'ds-update-banner', 'ds-checking-overlay',
+        'ds-toast-container', 'ds-greetings-loading', 'ds-greetings-error'],
+
+    onTeardown(fn) {
+        this.disposers.push(fn);
+    },
+
+    listen(target, type, handler, options) {
+        target.addEventListener(type, handler, options);
+        this.onTeardown(() => target.removeEventListener(type, handler, options));
+    },
+
+    // setTimeout that never fires after teardown
+    setTimeout(fn, ms) {
+        const id = window.setTimeout(() => {
+            this.timers.delete(id);
+            if (this.alive) fn();
+        }, ms);
+        this.timers.add(id);
+        return id;
+    },
+
+    teardown() {
+        this.alive = false;
+        this.timers.forEach(id => window.clearTimeout(id));
+        this.timers.clear();
+        while (this.disposers.length) {
+            try {
+                this.disposers.pop()();
+            } catch (e) {
+                console.warn("DeepSeek Client: Teardown step failed", e);
+            }
+        }
+        this.ownedIds.forEach(id => document.getElementById(id)?.remove());
+        // Let the next instance re-render the footer and greeting
+        document.querySelectorAll('[data-ds-updated]').forEach(el => delete el.dataset.dsUpdated);
+        document.querySelectorAll('[data-ds-greeting]').forEach(el => delete el.dataset.dsGreeting);
+        document.body.classList.remove('dark-mode');
+    }
+};
+
+if (Lifecycle.isReload) {
+    try {
+        window.__dsTeardown();
+        console.log("DeepSeek Client: Previous instance torn down");
+    } catch (e) {
+        console.warn("DeepSeek Client: Teardown failed", e);
+    }
+}
+window.__dsTeardown = () => Lifecycle.teardown();
+
 // ==========================================
 // 1. CONFIGURATION
 // ==========================================
@@ -13,13 +76,19 @@ const CONFIG = {
         textReplacementTargets: ['._0fcaa63._7941d9f', '._0fcaa63'],
         elementsToRemove: ['._41b9122', '.a1e75851']
     },
-    ports: [8080, 8081, 8082, 8083, 8084, 8085],
+    // Local asset server ({ port, token, baseUrl }), set by main.py at injection time
+    localServer: window.__DEEPSEEK_LOCAL_SERVER__ || null,
+    // App version from version.txt, set by main.py so the footer needs no bridge call
+    appVersion: window.__DEEPSEEK_VERSION__ || null,
     resources: {
-        marked: 'https://cdn.jsdelivr.net/npm/marked/marked.min.js',
+        // CDN fallbacks; keep in sync with the pinned versions in utils/vendor_assets.py
+        marked: 'https://cdn.jsdelivr.net/npm/marked@15.0.12/marked.min.js',
         domPurify: 'https://cdn.jsdelivr.net/npm/dompurify@3.0.5/dist/purify.min.js',
         fontInter: 'https://fonts.googleapis.com/css2?family=Inter:wght@100..900&display=swap',
         fontMono: 'https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@100..800&display=swap'
     },
+    // Pinned sha384 of the scripts (utils/vendor_assets.py RESOURCES), set by main.py
+    resourceIntegrity: window.__DEEPSEEK_INTEGRITY__ || {},
     updateInterval: 1000 * 60 * 60 // Check every hour
 };
 
@@ -28,6 +97,7 @@ const CONFIG = {
 // ==========================================
 const injectStyles = () => {
     const style = document.createElement('style');
+    style.id = 'ds-styles';
     style.textContent = `
         /* --- Global Fonts --- */
         * { font-family: 'Inter', sans-serif !important; }
@@ -310,25 +380,126 @@ const injectStyles = () => {
     document.head.appendChild(style);
 };
 
-const loadScript = (src) => {
+const loadScript = (src, integrity) => {
     return new Promise((resolve, reject) => {
         if (document.querySelector(`script[src="${src}"]`)) return resolve();
         const script = document.createElement('script');
         script.src = src;
         script.async = true;
+        if (integrity) {
+            script.integrity = integrity;
+            script.crossOrigin = 'anonymous';
+        }
         script.onload = resolve;
-        script.onerror = reject;
+        script.onerror = () => {
+            script.remove();
+            reject(new Error(`Failed to load ${src}`));
+        };
         document.head.appendChild(script);
     });
 };
 
 // Style Loader
-const loadStyle = (href) => {
-    if (document.querySelector(`link[href="${href}"]`)) return;
-    const link = document.createElement('link');
-    link.rel = 'stylesheet';
-    link.href = href;
-    document.head.appendChild(link);
+const loadStyle = (href, integrity) => {
+    return new Promise((resolve, reject) => {
+        if (document.querySelector(`link[href="${href}"]`)) return resolve();
+        const link = document.createElement('link');
+        link.rel = 'stylesheet';
+        link.href = href;
+        if (integrity) {
+            link.integrity = integrity;
+            link.crossOrigin = 'anonymous';
+        }
+        link.onload = resolve;
+        link.onerror = () => {
+            link.remove();
+            reject(new Error(`Failed to load ${href}`));
+        };
+        document.head.appendChild(link);
+    });
+};
+
+// Report a startup milestone to main.py (startup timeline / --profile-startup).
+// Only the first injection in a document counts as a cold start.
+const reportStartupEvent = (name) => {
+    if (Lifecycle.isReload) return;
+    const send = () => window.pywebview.api.report_startup_event(name)
+        .catch(e => console.warn(`DeepSeek Client: Could not report ${name}`, e));
+    if (window.pywebview && window.pywebview.api) send();
+    else window.addEventListener('pywebviewready', send, { once: true });
+};
+
+// Background jobs (main.py API.start_job): the bridge call returns a job id at
+// once, and progress/completion arrive through window.__dsJobUpdate.
+const Jobs = {
+    watchers: new Map(),
+    // Updates that arrived before start_job's reply did
+    early: new Map(),
+
+    handleUpdate(job) {
+        const watcher = this.watchers.get(job.id);
+        if (!watcher) {
+            this.early.set(job.id, job);
+            return;
+        }
+        if (watcher.onProgress) watcher.onProgress(job);
+        if (['succeeded', 'failed', 'cancelled'].includes(job.state)) {
+            this.watchers.delete(job.id);
+            if (job.state === 'succeeded') watcher.resolve(job.result);
+            else watcher.reject(Object.assign(new Error(job.error || `Job ${job.state}`), { job }));
+        }
+    },
+
+    // Resolves with the job's result; `onProgress(job)` sees every pushed update
+    async run(kind, params = {}, onProgress = null) {
+        const started = await window.pywebview.api.start_job(kind, params);
+        if (started.status !== 'success') throw new Error(started.message);
+        const jobId = started.job_id;
+        return new Promise((resolve, reject) => {
+            this.watchers.set(jobId, { resolve, reject, onProgress });
+            const early = this.early.get(jobId);
+            if (early) {
+                this.early.delete(jobId);
+                this.handleUpdate(early);
+            }
+        }).finally(() => this.early.delete(jobId));
+    },
+
+    cancel(jobId) {
+        return window.pywebview.api.cancel_job(jobId);
+    }
+};
+window.__dsJobUpdate = (job) => Jobs.handleUpdate(job);
+
+// Load a third-party resource from the vendored copy on the local server,
+// falling back to the CDN. Resolves to the source that was used.
+const loadResource = async (name, loader) => {
+    const local = CONFIG.localServer;
+    const vendored = local && local.vendor && local.vendor[name];
+    if (vendored) {
+        // The version query lets the local server mark the file immutable
+        const version = encodeURIComponent(vendored.integrity.slice(-16));
+        try {
+            await loader(`${local.baseUrl}${vendored.path}?v=${version}`, vendored.integrity);
+            return 'local';
+        } catch (e) {
+            console.warn(`DeepSeek Client: Vendored ${name} unavailable, using CDN`, e);
+        }
+    }
+    // Same pinned bytes whichever way they arrive (fonts have no pin)
+    const integrity = CONFIG.resourceIntegrity[name];
+    if (local && local.proxy) {
+        // Same CDN URL, fetched through the local server's disk cache
+        const query = `url=${encodeURIComponent(CONFIG.resources[name])}&token=${encodeURIComponent(local.token)}`;
+        try {
+            await loader(`${local.baseUrl}/proxy?${query}`, integrity);
+            return 'proxy';
+        } catch (e) {
+            console.warn(`DeepSeek Client: Cached ${name} unavailable, using CDN`, e);
+        }
+    }
+    await loader(CONFIG.resources[name], integrity);
+    return 'cdn';
 };
 
 const UIManager = {
@@ -377,9 +548,15 @@ const UIManager = {
         setTimeout(() => banner.classList.add('visible'), 100);
 
         banner.querySelector('#ds-update-now').addEventListener('click', () => {
-            banner.querySelector('#ds-update-now').textContent = 'Launching...';
+            const button = banner.querySelector('#ds-update-now');
+            button.textContent = 'Launching...';
             if (window.pywebview && window.pywebview.api) {
-                window.pywebview.api.start_update();
+                Jobs.run('start_update', {}, job => { if (job.message) button.textContent = job.message; })
+                    .catch(e => {
+                        console.error("Update launch failed", e);
+                        button.textContent = 'Update & Restart';
+                        UIManager.showToast("Could not start the updater");
+                    });
             }
         });
 
@@ -394,19 +571,31 @@ const UIManager = {
         overlay.id = 'ds-checking-overlay';
         overlay.innerHTML = `
             <div class="spinner"></div>
-            <div style="font-size: 13px; font-weight: 500;">Checking for updates...</div>
+            <div id="ds-checking-text" style="font-size: 13px; font-weight: 500;">Checking for updates...</div>
             <div id="ds-close-checking" style="margin-left: 8px; cursor: pointer; opacity: 0.5; font-size: 18px;">&times;</div>
         `;
         document.body.appendChild(overlay);
         setTimeout(() => overlay.classList.add('visible'), 100);
 
         overlay.querySelector('#ds-close-checking').onclick = () => {
+            // Closing the overlay cancels the check behind it
+            if (overlay.dataset.jobId) Jobs.cancel(overlay.dataset.jobId);
             overlay.classList.remove('visible');
             setTimeout(() => overlay.remove(), 500);
         };
         return overlay;
     },
 
+    updateCheckingOverlay(overlay, job) {
+        if (!overlay) return;
+        overlay.dataset.jobId = job.id;
+        const text = overlay.querySelector('#ds-checking-text');
+        if (text && job.message) {
+            const pct = job.progress != null ? ` ${Math.round(job.progress * 100)}%` : '';
+            text.textContent = `${job.message}${pct}`;
+        }
+    },
+
     hideCheckingOverlay() {
         const overlay = document.getElementById('ds-checking-overlay');
         if (overlay) {
@@ -440,15 +629,22 @@ const VersionManager = {
     currentVersion: '...',
 
     async init() {
+        if (CONFIG.appVersion && this.currentVersion !== CONFIG.appVersion) {
+            this.currentVersion = CONFIG.appVersion;
+            this.updateFooters();
+        }
         if (!window.pywebview || !window.pywebview.api) {
-            setTimeout(() => this.init(), 500);
+            Lifecycle.setTimeout(() => this.init(), 500);
             return;
         }
 
         try {
-            this.currentVersion = await window.pywebview.api.get_version();
-            this.updateFooters();
-            this.checkForUpdates(false, true);
+            if (!CONFIG.appVersion) {
+                this.currentVersion = await window.pywebview.api.get_version();
+                this.updateFooters();
+            }
+            // A hot reload is not a startup; skip the check and its overlay
+            if (!Lifecycle.isReload) this.checkForUpdates(false, true);
         } catch (e) {
             console.error("VersionManager init failed", e);
         }
@@ -463,7 +659,9 @@ const VersionManager = {
         }
 
         try {
-            const result = await window.pywebview.api.check_for_update();
+            // Manual checks bypass the cache; everything else is answered from it
+            const result = await Jobs.run('check_for_update', { force: isManual },
+                job => UIManager.updateCheckingOverlay(overlay, job));
             if (overlay) UIManager.hideCheckingOverlay();
 
             if (result.status === "success") {
@@ -478,8 +676,9 @@ const VersionManager = {
                 UIManager.showToast("Update check failed");
             }
         } catch (e) {
-            console.error("Update check failed", e);
             if (overlay) UIManager.hideCheckingOverlay();
+            if (e.job && e.job.state === 'cancelled') return;
+            console.error("Update check failed", e);
             if (isManual || isStartup) UIManager.showToast("Error checking updates");
         }
     },
@@ -592,6 +791,7 @@ const GreetingManager = {
         // Start typing with current phrases
         this.startTyping(element.querySelector('#ds-typewriter'));
         element.dataset.dsGreeting = 'true';
+        reportStartupEvent('first_greeting');
     },
 
     startTyping(element) {
@@ -632,9 +832,9 @@ const GreetingManager = {
                 }
                 speed = 500;
             }
-            setTimeout(loop, speed);
+            Lifecycle.setTimeout(loop, speed);
         };
-        setTimeout(loop, 300);
+        Lifecycle.setTimeout(loop, 300);
     },
 
     // Load greetings from GitHub API
@@ -957,13 +1157,18 @@ function startObserver() {
     });
 
     observer.observe(document.body, { childList: true, subtree: true });
+    Lifecycle.onTeardown(() => observer.disconnect());
 }
 
 // ==========================================
 // 6. INIT
 // ==========================================
 (async function init() {
+    const initStart = performance.now();
     console.log("DeepSeek Client: Initializing...");
+    if (CONFIG.localServer) {
+        console.log(`DeepSeek Client: Local server at ${CONFIG.localServer.baseUrl}`);
+    }
     injectStyles();
 
     // UI Setup
@@ -972,17 +1177,22 @@ function startObserver() {
     // Logic Setup
     VersionManager.init();
 
-    // Resource Loading
-    loadStyle(CONFIG.resources.fontInter);
-    loadStyle(CONFIG.resources.fontMono);
+    // Resource Loading (fonts are not awaited; text renders with fallbacks meanwhile)
+    loadResource('fontInter', loadStyle).catch(e => console.warn("DeepSeek Client: Inter font failed", e));
+    loadResource('fontMono', loadStyle).catch(e => console.warn("DeepSeek Client: JetBrains Mono failed", e));
 
     try {
-        await Promise.all([
-            loadScript(CONFIG.resources.marked),
-            loadScript(CONFIG.resources.domPurify)
+        const [markedSource, purifySource] = await Promise.all([
+            loadResource('marked', loadScript),
+            loadResource('domPurify', loadScript)
         ]);
+        // Superseded by a newer injection while the libraries were loading
+        if (!Lifecycle.alive) return;
         MarkdownManager.configure();
         startObserver();
+        const observerStartMs = Math.round(performance.now() - initStart);
+        console.log(`DeepSeek Client: Observer started in ${observerStartMs} ms (marked: ${markedSource}, DOMPurify: ${purifySource})`);
+        reportStartupEvent('observer_started');
 
         // Initial manual runs
         document.querySelectorAll(CONFIG.selectors.markdownBody).forEach(el => MarkdownManager.process(el));
@@ -995,7 +1205,7 @@ function startObserver() {
     // Dark Mode Sync
     const syncDarkMode = (isDark) => document.body.classList.toggle('dark-mode', isDark);
     // Keyboard Shortcuts
-    window.addEventListener('keydown', (e) => {
+    Lifecycle.listen(window, 'keydown', (e) => {
         // Ctrl+Shift+U for Update Check
         if (e.ctrlKey && e.shiftKey && e.key === 'U') {
             e.preventDefault();
@@ -1006,5 +1216,5 @@ function startObserver() {
 
     const mediaQuery = window.matchMedia('(prefers-color-scheme: dark)');
     syncDarkMode(mediaQuery.matches);
-    mediaQuery.addEventListener('change', e => syncDarkMode(e.matches));
+    Lifecycle.listen(mediaQuery, 'change', e => syncDarkMode(e.matches));
 })();
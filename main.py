@@ -1,20 +1,37 @@
-import webview
+import time
+# Taken before any other import so the startup timeline includes them
+STARTUP_ORIGIN = time.perf_counter()
+import sys
+# --profile-startup-cprofile covers the main thread from here, imports included, up to `loaded`
+if '--profile-startup-cprofile' in sys.argv[1:]:
+    import cProfile
+    STARTUP_PROFILER = cProfile.Profile()
+    STARTUP_PROFILER.enable()
+else:
+    STARTUP_PROFILER = None
 import os
 import argparse
-import sys
 import platform
 import datetime
 import base64
 import io
 import threading
-import http.server
-import socketserver
-import socket
 import subprocess
-import time
 import logging
-import queue
-import customtkinter as ctk
+import json
+import atexit
+import traceback
+from utils.log_store import LogStore
+from utils.log_writer import AsyncLogWriter
+from utils.local_server import LocalAssetServer
+from utils.asset_proxy import CachingAssetProxy
+from utils.vendor_assets import client_manifest as client_vendor_manifest, pinned_integrity
+from utils.log_viewer import LogViewer
+from utils.injection_bundle import InjectionBundle
+from utils.startup_timeline import StartupTimeline
+from utils.single_instance import SingleInstance
+from utils.update_service import UpdateService
+from utils.jobs import JobManager
 
 # Fix Unicode encoding issues on Windows
 if platform.system() == "Windows":
@@ -28,53 +45,69 @@ if platform.system() == "Windows":
     except (AttributeError, Exception):
         pass
 
-# For native Windows screenshots
-if platform.system() == "Windows":
-    try:
-        import clr
-        clr.AddReference('System.Drawing')
-        clr.AddReference('System.Windows.Forms')
-        from System.Drawing import Bitmap, Graphics, Imaging, Point, Size
-        from System.Drawing.Imaging import ImageFormat
-    except ImportError:
-        clr = None
+def load_drawing_types():
+    """System.Drawing types for native Windows screenshots, loaded on first use"""
+    import clr
+    clr.AddReference('System.Drawing')
+    clr.AddReference('System.Windows.Forms')
+    from System.Drawing import Bitmap, Graphics, Point, Size
+    from System.Drawing.Imaging import ImageFormat
+    return Bitmap, Graphics, Point, Size, ImageFormat
 
 APP_TITLE = "DeepSeek - Into the Unknown"
 
+# Cold-start phases (see --profile-startup)
+startup_timeline = StartupTimeline(origin=STARTUP_ORIGIN)
+# Where the timeline is written when profiling, set in main()
+startup_profile_path = None
+# Where the cProfile stats are written with --profile-startup-cprofile, set in main()
+startup_cprofile_path = None
+# Startup milestones the page may report through the bridge
+PAGE_STARTUP_EVENTS = ("observer_started", "first_greeting")
+
 # Verbose logging control (toggled in main based on release_mode)
 VERBOSE_LOGS = True
 
-# Global log queue for storing all log messages
-log_queue = queue.Queue()
-log_records = []
+# Global ring buffer holding the most recent log messages
+log_store = LogStore(capacity=1000)
+# Tail-follow viewer for the log store (opened with Ctrl+Shift+L)
+log_viewer = LogViewer(log_store, max_lines=2000)
 
-def safe_print(text: str):
-    """Print text with Unicode encoding safety"""
-    try:
-        print(text)
-    except UnicodeEncodeError:
-        # Fallback: replace problematic characters
-        safe_text = text.encode('ascii', errors='replace').decode('ascii')
-        print(safe_text)
-    except Exception as e:
-        # Last resort: print error message
-        print(f"[Encoding Error: {str(e)}]")
+def get_app_directory():
+    """Returns the directory the app runs from (next to the exe when frozen)"""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(__file__))
 
-def _log(msg: str):
-    global VERBOSE_LOGS, log_queue, log_records
-    
-    # Add to log queue and records
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_entry = f"[{timestamp}] {msg}"
-    log_queue.put(log_entry)
-    log_records.append(log_entry)
-    
-    # Keep only last 1000 log entries
-    if len(log_records) > 1000:
-        log_records = log_records[-1000:]
+# Background sink writing rotated log files (and optionally the console).
+# Records queue up until main() starts it, so early messages are not lost.
+log_writer = AsyncLogWriter(os.path.join(get_app_directory(), "logs"), console_level=logging.DEBUG)
+
+def _log(msg: str, level: int = logging.INFO):
+    # Store the raw message; timestamps are formatted when the log is read
+    record = log_store.append(msg, level)
     
-    # Always print to console for visibility with safe printing
-    safe_print(msg)
+    # Disk and console output happen on the writer thread, never on the caller
+    log_writer.submit(record)
+
+def install_crash_logging():
+    """Route uncaught exceptions into the log so crashes end up on disk"""
+    def log_exception(exc_type, exc_value, exc_tb, thread_name=None):
+        where = f" in thread {thread_name}" if thread_name else ""
+        details = ''.join(traceback.format_exception(exc_type, exc_value, exc_tb)).rstrip()
+        _log(f"Unhandled exception{where}:\n{details}", logging.CRITICAL)
+
+    def excepthook(exc_type, exc_value, exc_tb):
+        log_exception(exc_type, exc_value, exc_tb)
+        log_writer.close()
+
+    def thread_excepthook(args):
+        thread_name = args.thread.name if args.thread else None
+        log_exception(args.exc_type, args.exc_value, args.exc_traceback, thread_name)
+
+    sys.excepthook = excepthook
+    threading.excepthook = thread_excepthook
+    atexit.register(log_writer.close)
 
 # Windows-specific imports for dark titlebar
 if platform.system() == "Windows":
@@ -90,6 +123,14 @@ if platform.system() == "Windows":
 # Global variable to store titlebar preference
 titlebar_preference = 'auto'
 
+# Port, base URL and session token of the local asset server, passed to the
+# injected script so it never has to probe for the server
+local_server_config = None
+
+# Cached payload for the page (see utils/injection_bundle.py), created in main()
+injection_bundle = None
+app_version = None
+
 def is_dark_mode_enabled():
     """Check if Windows is using dark mode"""
     if platform.system() != "Windows" or not winreg:
@@ -250,6 +291,7 @@ def apply_dark_titlebar_delayed(window):
         # Try multiple times with progressive backoff
         for attempt in range(5):
             if apply_dark_titlebar(window):
+                startup_timeline.mark("titlebar_applied")
                 return  # Success, stop trying
             time.sleep(0.5 * (attempt + 1))  # Progressive backoff
         
@@ -259,201 +301,277 @@ def apply_dark_titlebar_delayed(window):
     thread = threading.Thread(target=delayed_apply, daemon=True)
     thread.start()
 
+# Screenshot hotkey, only bundled in development (unfrozen) mode
+# Handlers are kept on window so a re-injection replaces rather than duplicates them.
+SCREENSHOT_HOTKEY_JS = """
+console.log("DeepSeek: Screenshot hotkey active (Ctrl+Shift+S)");
+if (window.__dsScreenshotHotkey) window.removeEventListener('keydown', window.__dsScreenshotHotkey);
+window.__dsScreenshotHotkey = function(e) {
+    if (e.ctrlKey && e.shiftKey && e.key === 'S') {
+        e.preventDefault();
+        console.log("Screenshot hotkey triggered (Native)");
+        if (window.pywebview && window.pywebview.api) {
+            window.pywebview.api.take_screenshot().then(function(response) {
+                console.log("Screenshot response:", response);
+            });
+        }
+    }
+};
+window.addEventListener('keydown', window.__dsScreenshotHotkey);
+"""
+
+# Logs hotkey (works in both dev and frozen mode)
+LOGS_HOTKEY_JS = """
+console.log("DeepSeek: Logs hotkey active (Ctrl+Shift+L)");
+if (window.__dsLogsHotkey) window.removeEventListener('keydown', window.__dsLogsHotkey);
+window.__dsLogsHotkey = function(e) {
+    if (e.ctrlKey && e.shiftKey && e.key === 'L') {
+        e.preventDefault();
+        console.log("Logs hotkey triggered");
+        if (window.pywebview && window.pywebview.api) {
+            window.pywebview.api.open_logs_window().then(function(response) {
+                console.log("Logs window response:", response);
+            });
+        }
+    }
+};
+window.addEventListener('keydown', window.__dsLogsHotkey);
+"""
+
+def create_injection_bundle(minify=False):
+    snippets = [LOGS_HOTKEY_JS]
+    if not getattr(sys, 'frozen', False):
+        snippets.insert(0, SCREENSHOT_HOTKEY_JS)
+    return InjectionBundle(os.path.join('injection', 'inject.js'), snippets, minify=minify)
+
+def injection_config():
+    """Globals set before inject.js runs"""
+    global app_version
+    if app_version is None:
+        # version.txt only changes across an update, which restarts the app
+        app_version = read_version()
+    config = {"__DEEPSEEK_VERSION__": app_version}
+    # SRI for the CDN / proxy fallbacks, independent of the local server
+    config["__DEEPSEEK_INTEGRITY__"] = pinned_integrity()
+    # Hand over the local server details before the script runs
+    if local_server_config:
+        config["__DEEPSEEK_LOCAL_SERVER__"] = local_server_config
+    return config
+
 def inject_js(window):
+    """Evaluate the injection bundle in `window`; returns True when it was injected"""
+    global injection_bundle
     try:
-        # Read injection script
-        with open('injection/inject.js', 'r') as f:
-            js_code = f.read()
-        
-        # Inject JavaScript
-        window.evaluate_js(js_code)
+        if injection_bundle is None:
+            injection_bundle = create_injection_bundle()
+        elapsed_ms = injection_bundle.inject(window, injection_config())
+        startup_timeline.mark("injected")
+        stats = injection_bundle.stats()
+        _log(f"Injected {stats['payload_bytes']} byte bundle in {elapsed_ms:.1f} ms "
+             f"(builds: {stats['builds']})", logging.DEBUG)
+        return True
     except Exception as e:
-        print(f"Error injecting JavaScript: {e}")
+        _log(f"Error injecting JavaScript: {e}", logging.ERROR)
+        return False
+
+def hot_reload_injection(window, paths, detected_at):
+    """Re-inject the edited script into the live page (dev mode)
+
+    inject.js tears down its previous instance (window.__dsTeardown) first.
+    """
+    names = ", ".join(os.path.relpath(p) for p in paths)
+    if not inject_js(window):
+        _log(f"Hot reload: {names} failed to inject; keeping the previous version", logging.WARNING)
+        return
+    latency_ms = (time.perf_counter() - detected_at) * 1000
+    _log(f"Hot reload: {names} live in {latency_ms:.0f} ms "
+         f"(evaluate_js {injection_bundle.last_injection_ms:.0f} ms)")
+
+def finish_startup_profile():
+    """Log the startup timeline and, with --profile-startup, write it to disk (once)"""
+    global startup_profile_path
+    if not startup_profile_path:
+        return
+    path, startup_profile_path = startup_profile_path, None
+    try:
+        startup_timeline.dump(path)
+        _log(f"Startup timeline written to {path}:\n{startup_timeline.format()}")
+    except OSError as e:
+        _log(f"Could not write startup timeline: {e}", logging.ERROR)
+
+def finish_startup_cprofile():
+    """Write the --profile-startup-cprofile stats to disk (once), at `loaded` or on exit"""
+    global startup_cprofile_path
+    if not (STARTUP_PROFILER and startup_cprofile_path):
+        return
+    path, startup_cprofile_path = startup_cprofile_path, None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # From the loaded handler this snapshots the main thread's stats; cProfile can only
+        # unhook a thread from inside it, so the GUI thread stops recording when run() ends
+        STARTUP_PROFILER.dump_stats(path)
+        _log(f"Startup profile written to {path}")
+    except OSError as e:
+        _log(f"Could not write startup profile: {e}", logging.ERROR)
+
+def read_version():
+    """Read version from version.txt"""
+    try:
+        if os.path.exists('version.txt'):
+            with open('version.txt', 'r') as f:
+                return f.read().strip()
+    except Exception as e:
+        _log(f"Error reading version.txt: {e}")
+    return "1.0.0"
 
 def on_window_loaded(window):
     """Called when window is loaded"""
+    startup_timeline.mark("loaded")
+    finish_startup_cprofile()
     # Apply dark titlebar with delay to ensure window is fully created
     apply_dark_titlebar_delayed(window)
-    # Inject original JavaScript
+    # Script, hotkeys and config in a single evaluate_js call
     inject_js(window)
-    
-    # Inject screenshot hotkey only in development (unfrozen) mode
-    is_frozen = getattr(sys, 'frozen', False)
-    if not is_frozen:
-        hotkey_js = """
-        console.log("DeepSeek: Screenshot hotkey active (Ctrl+Shift+S)");
-        window.addEventListener('keydown', function(e) {
-            if (e.ctrlKey && e.shiftKey && e.key === 'S') {
-                e.preventDefault();
-                console.log("Screenshot hotkey triggered (Native)");
-                if (window.pywebview && window.pywebview.api) {
-                    window.pywebview.api.take_screenshot().then(function(response) {
-                        console.log("Screenshot response:", response);
-                    });
-                }
-            }
-        });
-        """
-        window.evaluate_js(hotkey_js)
-    
-    # Inject logs hotkey (works in both dev and frozen mode)
-    logs_hotkey_js = """
-    console.log("DeepSeek: Logs hotkey active (Ctrl+Shift+L)");
-    window.addEventListener('keydown', function(e) {
-        if (e.ctrlKey && e.shiftKey && e.key === 'L') {
-            e.preventDefault();
-            console.log("Logs hotkey triggered");
-            if (window.pywebview && window.pywebview.api) {
-                window.pywebview.api.open_logs_window().then(function(response) {
-                    console.log("Logs window response:", response);
-                });
-            }
-        }
-    });
-    """
-    window.evaluate_js(logs_hotkey_js)
 
-from utils.auto_update import UpdateChecker
 class API:
     def __init__(self):
         self._window = None
+        self._update_service = None
+        # Long operations run here instead of on the bridge thread
+        self._jobs = JobManager(max_workers=4, notify=self._push_job_update, log=_log)
+
+    def _push_job_update(self, job):
+        """Forward job progress/state to the page (window.__dsJobUpdate in inject.js)"""
+        if self._window:
+            self._window.evaluate_js(f"window.__dsJobUpdate && window.__dsJobUpdate({json.dumps(job)})")
+
+    def start_job(self, kind, params=None):
+        """Start a long-running operation in the background and return its job id at once
+
+        Progress and the final result are pushed to the page as they happen;
+        get_job() can be polled as well.
+        """
+        handler = getattr(self, f"_job_{kind}", None)
+        if handler is None:
+            return {"status": "error", "message": f"Unknown job: {kind}"}
+        job_id = self._jobs.start(kind, handler, **(params or {}))
+        return {"status": "success", "job_id": job_id}
+
+    def get_job(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return {"status": "error", "message": f"Unknown job: {job_id}"}
+        return {"status": "success", "job": job}
+
+    def list_jobs(self):
+        return {"status": "success", "jobs": self._jobs.list()}
+
+    def cancel_job(self, job_id):
+        if self._jobs.cancel(job_id):
+            return {"status": "success"}
+        return {"status": "error", "message": f"Job {job_id} is not running"}
+
+    def _job_check_for_update(self, job, force=False):
+        service = self._update_service
+        if service is None:
+            raise RuntimeError("Update service not running")
+        done = service.refresh(force=bool(force)) if force or service.is_stale() else None
+        if done is not None:
+            job.report(0.2, "Contacting GitHub...")
+            # Wait in slices so a cancel from the page takes effect promptly
+            while not done.wait(0.1):
+                job.check_cancelled()
+        job.report(0.9, "Comparing versions...")
+        return self.check_for_update()
+
+    def _job_start_update(self, job):
+        job.report(0.3, "Launching updater...")
+        result = self.start_update()
+        if result["status"] != "success":
+            raise RuntimeError(result.get("message", "Could not start the updater"))
+        job.report(1.0, "Updater started, closing...")
+        return result
+
+    def _job_open_logs_window(self, job):
+        return self.open_logs_window()
 
     def get_logs(self):
         """Get all log records"""
-        global log_records
         return {
             "status": "success",
-            "logs": log_records
+            "logs": log_store.formatted()
         }
 
-    def open_logs_window(self):
-        """Open a CustomTkinter window showing all logs"""
-        global log_records
-        
-        def copy_all_logs():
-            try:
-                import pyperclip
-                pyperclip.copy('\n'.join(log_records))
-                status_label.configure(text="Copied all logs to clipboard!", text_color="green")
-            except ImportError:
-                status_label.configure(text="Please install pyperclip: pip install pyperclip", text_color="orange")
-            except Exception as e:
-                status_label.configure(text=f"Copy failed: {e}", text_color="red")
-        
-        def clear_logs():
-            global log_records
-            log_records.clear()
-            text_box.delete("1.0", "end")
-            status_label.configure(text="Logs cleared", text_color="green")
-        
-        def refresh_logs():
-            text_box.delete("1.0", "end")
-            text_box.insert("1.0", '\n'.join(log_records))
-            status_label.configure(text=f"Showing {len(log_records)} log entries", text_color="white")
-        
-        def save_logs():
-            try:
-                filename = f"deepseek-logs-{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write('\n'.join(log_records))
-                status_label.configure(text=f"Logs saved to {filename}", text_color="green")
-            except Exception as e:
-                status_label.configure(text=f"Save failed: {e}", text_color="red")
+    def get_logs_since(self, cursor=0, limit=200, level="DEBUG"):
+        """Get only the log entries added after `cursor`
 
-        # Create the log window
-        log_window = ctk.CTk()
-        log_window.title("DeepSeek - Logs")
-        log_window.geometry("800x600")
-        
-        # Set dark theme
-        ctk.set_appearance_mode("dark")
-        ctk.set_default_color_theme("blue")
-        
-        # Main frame
-        main_frame = ctk.CTkFrame(log_window)
-        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
-        
-        # Title
-        title_label = ctk.CTkLabel(main_frame, text="DeepSeek Application Logs", font=("Inter", 16, "bold"))
-        title_label.pack(pady=5)
-        
-        # Status label
-        status_label = ctk.CTkLabel(main_frame, text=f"Showing {len(log_records)} log entries", font=("Inter", 12))
-        status_label.pack(pady=2)
-        
-        # Button frame
-        button_frame = ctk.CTkFrame(main_frame)
-        button_frame.pack(fill="x", padx=10, pady=5)
-        
-        # Buttons
-        refresh_btn = ctk.CTkButton(button_frame, text="Refresh", command=refresh_logs, width=100)
-        refresh_btn.pack(side="left", padx=5)
-        
-        copy_btn = ctk.CTkButton(button_frame, text="Copy All", command=copy_all_logs, width=100)
-        copy_btn.pack(side="left", padx=5)
-        
-        save_btn = ctk.CTkButton(button_frame, text="Save to File", command=save_logs, width=100)
-        save_btn.pack(side="left", padx=5)
-        
-        clear_btn = ctk.CTkButton(button_frame, text="Clear", command=clear_logs, width=100, fg_color="red")
-        clear_btn.pack(side="left", padx=5)
-        
-        # Text box with scrollbar
-        text_frame = ctk.CTkFrame(main_frame)
-        text_frame.pack(fill="both", expand=True, padx=10, pady=5)
-        
-        text_box = ctk.CTkTextbox(text_frame, wrap="word", font=("Consolas", 11))
-        text_box.pack(side="left", fill="both", expand=True)
-        
-        # Scrollbar
-        scrollbar = ctk.CTkScrollbar(text_frame, command=text_box.yview)
-        scrollbar.pack(side="right", fill="y")
-        text_box.configure(yscrollcommand=scrollbar.set)
-        
-        # Initial load
-        refresh_logs()
-        
-        # Auto-refresh every 2 seconds
-        def auto_refresh():
-            try:
-                refresh_logs()
-                log_window.after(2000, auto_refresh)
-            except:
-                pass  # Window closed
-        
-        auto_refresh()
-        
-        # Run the window
-        log_window.mainloop()
-        
-        return {"status": "success", "message": "Logs window opened"}
+        Pass the returned `cursor` back on the next call to keep polling.
+        Entries below `level` are skipped and at most `limit` are returned.
+        """
+        try:
+            records, next_cursor, dropped = log_store.since(int(cursor or 0), limit, level)
+        except (TypeError, ValueError) as e:
+            return {"status": "error", "message": str(e)}
+        return {
+            "status": "success",
+            "logs": [record.to_dict() for record in records],
+            "cursor": next_cursor,
+            "dropped": dropped
+        }
+
+    def get_asset_proxy_stats(self):
+        """Hit/miss counters and disk usage of the third-party asset cache"""
+        proxy = getattr(self, '_asset_proxy', None)
+        if proxy is None:
+            return {"status": "error", "message": "Asset proxy is disabled"}
+        return {"status": "success", "stats": proxy.get_stats()}
+
+    def get_startup_timeline(self):
+        """Monotonic timestamps (ms since launch) of the cold-start phases reached so far"""
+        return {"status": "success", "timeline": startup_timeline.to_dict()}
+
+    def report_startup_event(self, name):
+        """Called by inject.js when a page-side startup milestone is reached"""
+        if name not in PAGE_STARTUP_EVENTS:
+            return {"status": "error", "message": f"Unknown startup event: {name}"}
+        recorded = startup_timeline.mark(name)
+        if recorded:
+            _log(f"Startup: {name} at {startup_timeline.elapsed_ms(name):.0f} ms", logging.DEBUG)
+        if name == "first_greeting":
+            # The enhanced UI is up; nothing later belongs to the cold start
+            finish_startup_profile()
+        return {"status": "success", "recorded": recorded}
+
+    def open_logs_window(self):
+        """Open the log viewer window without blocking the bridge thread"""
+        if log_viewer.open():
+            return {"status": "success", "message": "Logs window opened"}
+        return {"status": "success", "message": "Logs window already open"}
 
     def get_version(self):
         """Read version from version.txt"""
-        try:
-            if os.path.exists('version.txt'):
-                with open('version.txt', 'r') as f:
-                    return f.read().strip()
-        except Exception as e:
-            _log(f"Error reading version.txt: {e}")
-        return "1.0.0"
+        return read_version()
+
+    def check_for_update(self, force=False):
+        """Latest release info from the background update service.
 
-    def check_for_update(self):
-        """Check for updates using the UpdateChecker"""
+        Answers from the service's cache; `force` re-checks now (at most once a
+        minute, and never more than one request at a time).
+        """
+        if self._update_service is None:
+            return {"status": "error", "message": "Update service not running"}
         try:
-            checker = UpdateChecker()
-            need_update, current, latest, info = checker.check_for_update(os.getcwd())
-            return {
-                "status": "success",
-                "need_update": need_update,
-                "current_version": current,
-                "latest_version": latest,
-                "release_notes": info.get("body", "") if info else "",
-                "is_frozen": getattr(sys, 'frozen', False)
-            }
+            result = self._update_service.check(force=bool(force))
         except Exception as e:
             _log(f"Error checking for update: {e}")
             return {"status": "error", "message": str(e)}
+        if result["latest_version"] is None:
+            return {"status": "error", "message": result["last_error"] or "No release information yet"}
+        result.update({
+            "status": "success",
+            "is_frozen": getattr(sys, 'frozen', False)
+        })
+        return result
 
     def start_update(self):
         """Initiate the update process by launching the standalone updater"""
@@ -507,6 +625,7 @@ class API:
             ctypes.windll.user32.ClientToScreen(hwnd, ctypes.byref(point))
 
             # Capture using System.Drawing
+            Bitmap, Graphics, Point, Size, ImageFormat = load_drawing_types()
             bmp = Bitmap(width, height)
             g = Graphics.FromImage(bmp)
             g.CopyFromScreen(Point(point.x, point.y), Point(0, 0), Size(width, height))
@@ -625,56 +744,92 @@ def launch_auto_updater():
         show_windows_error_dialog("Auto-Updater Error", error_msg)
 
 class DeepSeekApp:
-    def __init__(self, release_mode=False):
+    def __init__(self, release_mode=False, server_mode="threaded", asset_proxy=False, asset_cache_mb=64):
         self.release_mode = release_mode
         self.api = API()
         self.window = None
+        self.server = None
         self.server_port = None
+        self.server_mode = server_mode
+        self.asset_proxy = None
+        if asset_proxy:
+            # CDN scripts and fonts cached on disk so restarts don't refetch them
+            self.asset_proxy = CachingAssetProxy(
+                os.path.join(get_app_directory(), "cache", "assets"),
+                max_bytes=asset_cache_mb * 1024 * 1024,
+                log=_log
+            )
+        self.api._asset_proxy = self.asset_proxy
+        # One update checker for the whole app; the bridge only reads its cache
+        self.update_service = UpdateService(
+            os.getcwd(),
+            os.path.join(get_app_directory(), "cache", "update-check.json"),
+            log=_log
+        )
+        self.api._update_service = self.update_service
+        self.watcher = None
 
     def start_server(self):
-        class FileHandler(http.server.SimpleHTTPRequestHandler):
-            def __init__(self, *args, **kwargs):
-                super().__init__(*args, directory=".", **kwargs)
-
-            def end_headers(self):
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.send_header('Access-Control-Allow-Methods', 'GET')
-                self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
-                return super().end_headers()
-
-            def do_GET(self):
-                if self.path == '/port':
-                    self.send_response(200)
-                    self.send_header('Content-type', 'text/plain')
-                    self.end_headers()
-                    self.wfile.write(str(self.server.server_address[1]).encode())
-                else:
-                    super().do_GET()
-
-        def find_available_port(start_port=8080):
-            for port in range(start_port, start_port + 100):
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                    # Try to bind to the port to check availability
-                    try:
-                        sock.bind(("", port))
-                        return port
-                    except OSError:
-                        continue # Port is in use, try next one
-            return None
-
-        self.server_port = find_available_port()
-        if not self.server_port:
-            _log("Could not find an available port for local server")
+        global local_server_config
+        # Port 0: the OS assigns a free port in a single bind
+        self.server = LocalAssetServer(directory=".", port=0, mode=self.server_mode, log=_log,
+                                       precompress=True, asset_proxy=self.asset_proxy)
+        try:
+            self.server_port = self.server.start()
+        except OSError as e:
+            _log(f"Failed to start local server: {e}", logging.ERROR)
+            self.server = None
             return
-
-        def run_server():
-            with socketserver.TCPServer(("", self.server_port), FileHandler) as httpd:
-                _log(f"Local server running on port {self.server_port}")
-                httpd.serve_forever()
-
-        threading.Thread(target=run_server, daemon=True).start()
+        # Read and compress the served text assets before the page asks for them
+        self.server.warm_cache()
+        local_server_config = self.server.client_config()
+        # Pinned copies of marked, DOMPurify and the fonts, if they have been vendored
+        local_server_config["vendor"] = client_vendor_manifest()
+        startup_timeline.mark("server_ready")
+
+    def stop_server(self):
+        global local_server_config
+        if self.server:
+            self.server.stop()
+            self.server = None
+        local_server_config = None
+
+    def handle_instance_command(self, command, args):
+        """Commands forwarded by later launches over the single-instance channel"""
+        if command == "ping":
+            return {"status": "success", "pid": os.getpid(), "version": read_version()}
+        if command == "activate":
+            _log(f"Second launch forwarded to this instance (args: {args.get('argv', [])})")
+            if self.window is None:
+                return {"status": "success", "message": "Window is still starting"}
+            self.window.restore()
+            self.window.show()
+            # Toggling topmost is the portable way to pull the window to the front
+            self.window.on_top = True
+            self.window.on_top = False
+            return {"status": "success", "message": "Window focused"}
+        if command == "shutdown":
+            _log("Shutdown requested over the single-instance channel")
+            if self.window is not None:
+                self.window.destroy()
+            return {"status": "success", "message": "Shutting down"}
+        return {"status": "error", "message": f"Unknown command: {command}"}
+
+    def start_hot_reload(self):
+        """Re-inject injection/ edits into the live window (development only)"""
+        from utils.injection_watcher import InjectionWatcher
+        self.watcher = InjectionWatcher(
+            "injection",
+            lambda paths, detected_at: hot_reload_injection(self.window, paths, detected_at),
+            log=_log
+        )
+        backend = self.watcher.start()
+        _log(f"Hot reload enabled for injection/ ({backend})")
 
     def run(self):
+        # Deferred until the window is created, so --help and argument errors never load it
+        import webview
+        
         self.start_server()
         
         is_frozen = getattr(sys, 'frozen', False)
@@ -688,18 +843,36 @@ class DeepSeekApp:
             js_api=self.api
         )
         self.api._window = self.window
+        startup_timeline.mark("window_created")
         self.window.events.loaded += on_window_loaded
+        if not is_frozen and not self.release_mode:
+            self.start_hot_reload()
         
         # The update check is now handled by the UI (inject.js) 
         # which calls API.check_for_updates() and API.start_update()
         # instead of launching a background console on every startup.
         pass
 
-        webview.start(
-            private_mode=False,
-            storage_path="./data",
-            debug=not self.release_mode
-        )
+        startup_timeline.mark("webview_start")
+        self.update_service.start()
+
+        try:
+            webview.start(
+                private_mode=False,
+                storage_path="./data",
+                debug=not self.release_mode
+            )
+        finally:
+            # The window is gone; release the port and worker threads
+            if self.watcher:
+                self.watcher.stop()
+            self.update_service.stop()
+            self.api._jobs.shutdown()
+            self.stop_server()
+            if STARTUP_PROFILER:
+                STARTUP_PROFILER.disable()
+
+startup_timeline.mark("imports")
 
 def main():
     parser = argparse.ArgumentParser()
@@ -707,8 +880,40 @@ def main():
     group = parser.add_mutually_exclusive_group()
     group.add_argument('--dark-titlebar', action='store_true')
     group.add_argument('--light-titlebar', action='store_true')
+    parser.add_argument('--server-mode', choices=LocalAssetServer.MODES, default='threaded',
+                        help='Local asset server: bounded thread pool with keep-alive, or the single-threaded server')
+    parser.add_argument('--new-instance', action='store_true',
+                        help='Start a separate instance even if one is already running')
+    parser.add_argument('--shutdown', action='store_true',
+                        help='Ask the running instance to close, then exit')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Write a JSON timeline of the startup phases to logs/startup-<time>.json')
+    parser.add_argument('--profile-startup-cprofile', action='store_true',
+                        help='Also write a cProfile file of the main thread from process start to the page load')
+    parser.add_argument('--minify-injection', action='store_true',
+                        help='Minify the injected script (off by default)')
+    parser.add_argument('--asset-proxy', action='store_true',
+                        help='Load CDN scripts and fonts through an on-disk cache on the local server')
+    parser.add_argument('--asset-cache-mb', type=int, default=64,
+                        help='Disk budget for cached CDN resources (default: 64)')
     args = parser.parse_args()
     
+    # Hand off to an already running instance before paying for anything else
+    instance = None
+    if not args.new_instance:
+        instance = SingleInstance(get_app_directory(), log=_log)
+        if not instance.acquire():
+            command = "shutdown" if args.shutdown else "activate"
+            try:
+                reply = instance.send(command, {"argv": sys.argv[1:]})
+            except OSError as e:
+                print(f"DeepSeek is already running but did not respond: {e}", file=sys.stderr)
+                sys.exit(1)
+            sys.exit(0 if reply.get("status") == "success" else 1)
+    if args.shutdown:
+        print("DeepSeek is not running.", file=sys.stderr)
+        sys.exit(0)
+    
     global titlebar_preference
     titlebar_preference = 'dark' if args.dark_titlebar else ('light' if args.light_titlebar else 'auto')
     
@@ -718,7 +923,36 @@ def main():
     global VERBOSE_LOGS
     VERBOSE_LOGS = not release_mode
     
-    app = DeepSeekApp(release_mode=release_mode)
-    app.run()
+    # Windowed builds have no console; otherwise echo INFO+ (everything when verbose)
+    if sys.stdout is None:
+        log_writer.console_level = None
+    else:
+        log_writer.console_level = logging.DEBUG if VERBOSE_LOGS else logging.INFO
+    log_writer.start()
+    install_crash_logging()
+    
+    global injection_bundle
+    injection_bundle = create_injection_bundle(minify=args.minify_injection)
+    
+    global startup_profile_path, startup_cprofile_path
+    if args.profile_startup or args.profile_startup_cprofile:
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(get_app_directory(), "logs", f"startup-{stamp}")
+        startup_profile_path = base + ".json"
+        if args.profile_startup_cprofile:
+            startup_cprofile_path = base + ".prof"
+            atexit.register(finish_startup_cprofile)
+        # Pages without a greeting never report one; write whatever was reached on exit
+        atexit.register(finish_startup_profile)
+    
+    app = DeepSeekApp(release_mode=release_mode, server_mode=args.server_mode,
+                      asset_proxy=args.asset_proxy, asset_cache_mb=args.asset_cache_mb)
+    if instance:
+        instance.serve(app.handle_instance_command)
+    try:
+        app.run()
+    finally:
+        if instance:
+            instance.release()
 if __name__ == "__main__":
     main()
@@ -1,2 +1,3 @@
 # This file makes the 'utils' directory a Python package.
-from . import auto_update
\ No newline at end of file
+# Submodules are imported where they are used so that importing one of them
+# (e.g. utils.log_store) does not pull in auto_update's requests/rich stack.
@@ -0,0 +1,244 @@
+import collections
+import email.utils
+import gzip
+import hashlib
+import os
+import threading
+import time
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Smaller bodies are not worth the Content-Encoding overhead
+MIN_COMPRESS_SIZE = 256
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def is_compressible(content_type):
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress_variants(body):
+    """Build the encoded variants of `body`, keyed by Content-Encoding.
+
+    Only variants that are actually smaller than the original are kept.
+    Brotli is used when the module is installed.
+    """
+    variants = {}
+    # mtime=0 keeps the output (and so the ETag) stable across restarts
+    gz = gzip.compress(body, compresslevel=9, mtime=0)
+    if len(gz) < len(body):
+        variants["gzip"] = gz
+    if brotli is not None:
+        br = brotli.compress(body, quality=11)
+        if len(br) < len(body):
+            variants["br"] = br
+    return variants
+
+
+def parse_accept_encoding(header):
+    """Map each coding in an Accept-Encoding header to its q-value"""
+    codings = {}
+    if not header:
+        return codings
+    for part in header.split(','):
+        fields = part.strip().split(';')
+        coding = fields[0].strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in fields[1:]:
+            name, _, value = param.strip().partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding] = q
+    return codings
+
+
+def choose_encoding(accept_encoding, available):
+    """Pick the best available encoding the client accepts, or None for identity"""
+    accepted = parse_accept_encoding(accept_encoding)
+    # Server preference order: smallest output first
+    for coding in ("br", "gzip"):
+        if coding not in available:
+            continue
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        if q > 0:
+            return coding
+    return None
+
+
+class CachedAsset:
+    """An asset held in memory together with its validators"""
+
+    __slots__ = ("path", "body", "size", "mtime_ns", "etag", "last_modified",
+                 "mtime", "content_type", "checked_at", "compressible", "_variants")
+
+    def __init__(self, path, body, stat_result, content_type):
+        self.path = path
+        self.body = body
+        self.size = stat_result.st_size
+        self.mtime_ns = stat_result.st_mtime_ns
+        self.mtime = int(stat_result.st_mtime)
+        self.content_type = content_type
+        # Strong validator: derived from the bytes, not the timestamp
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.last_modified = email.utils.formatdate(self.mtime, usegmt=True)
+        self.checked_at = time.monotonic()
+        self.compressible = is_compressible(content_type) and len(body) >= MIN_COMPRESS_SIZE
+        self._variants = None
+
+    @property
+    def variants(self):
+        """Encoded variants, built once on first use"""
+        if self._variants is None:
+            self.prepare_variants()
+        return self._variants
+
+    def prepare_variants(self):
+        self._variants = compress_variants(self.body) if self.compressible else {}
+        return self._variants
+
+    def representation(self, accept_encoding):
+        """Return (body, content_encoding, etag) for the client's Accept-Encoding"""
+        if self.compressible:
+            coding = choose_encoding(accept_encoding, self.variants)
+            if coding:
+                # Each representation gets its own strong ETag
+                return self.variants[coding], coding, self.etag[:-1] + '-' + coding + '"'
+        return self.body, None, self.etag
+
+    def matches(self, if_none_match=None, if_modified_since=None):
+        """True when the client's cached copy is still current (answer 304)"""
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            # Weak comparison is allowed for If-None-Match; any representation
+            # of the same bytes is still current
+            base = self.etag[:-1]
+            for tag in tags:
+                tag = tag.removeprefix('W/')
+                if tag == '*' or tag == self.etag or (tag.startswith(base) and tag.endswith('"')):
+                    return True
+            return False
+        if if_modified_since is not None:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+            except (TypeError, IndexError, OverflowError, ValueError):
+                return False
+            if since is None:
+                return False
+            return self.mtime <= int(since.timestamp())
+        return False
+
+
+class AssetCache:
+    """In-memory, size-bounded LRU cache of served files keyed by path.
+
+    Entries are revalidated against the file's mtime and size at most once
+    per `revalidate_interval` seconds, so a hot asset costs a dict lookup
+    instead of a stat, open and read on every request.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, max_entry_bytes=4 * 1024 * 1024,
+                 revalidate_interval=1.0, precompress=False):
+        self.max_bytes = max_bytes
+        self.precompress = precompress
+        self.max_entry_bytes = max_entry_bytes
+        self.revalidate_interval = revalidate_interval
+        self._entries = collections.OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, content_type):
+        """Return a CachedAsset for `path`, loading it if needed.
+
+        `content_type` is a callable mapping a path to its MIME type. Returns
+        None when the file does not exist or is too large to cache.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and now - entry.checked_at < self.revalidate_interval:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.invalidate(path)
+            return None
+
+        if entry is not None and entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+            with self._lock:
+                entry.checked_at = now
+                if path in self._entries:
+                    self._entries.move_to_end(path)
+                self.hits += 1
+            return entry
+
+        if st.st_size > self.max_entry_bytes:
+            self.invalidate(path)
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                body = f.read()
+        except OSError:
+            self.invalidate(path)
+            return None
+
+        entry = CachedAsset(path, body, st, content_type(path))
+        with self._lock:
+            self.misses += 1
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._total -= len(old.body)
+            self._entries[path] = entry
+            self._total += len(body)
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._total -= len(evicted.body)
+        if self.precompress:
+            # Build the encoded variants now rather than on the first request
+            entry.prepare_variants()
+        return entry
+
+    def warm(self, paths, content_type):
+        """Load (and, with precompress, encode) assets ahead of the first request"""
+        for path in paths:
+            self.get(path, content_type)
+
+    def invalidate(self, path=None):
+        """Drop one entry, or everything when `path` is None"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._total = 0
+                return
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._total -= len(old.body)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total,
+                "hits": self.hits,
+                "misses": self.misses
+            }
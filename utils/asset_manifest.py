@@ -0,0 +1,93 @@
+import hashlib
+import mimetypes
+import os
+import posixpath
+import urllib.parse
+
+
+class ManifestEntry:
+    """One servable file: where it lives on disk and what it contains"""
+
+    __slots__ = ("url_path", "fs_path", "size", "sha256", "content_type")
+
+    def __init__(self, url_path, fs_path, size, sha256, content_type):
+        self.url_path = url_path
+        self.fs_path = fs_path
+        self.size = size
+        self.sha256 = sha256
+        self.content_type = content_type
+
+    def to_dict(self):
+        return {
+            "path": self.url_path,
+            "size": self.size,
+            "sha256": self.sha256,
+            "content_type": self.content_type
+        }
+
+
+class AssetManifest:
+    """Index of the files the local server is allowed to serve.
+
+    Built once at startup from an allow-list of directories and files under
+    `root`. Lookups are a single dict access on the URL path, so requests for
+    anything outside the allow-list are rejected without touching the disk.
+    """
+
+    SKIP_NAMES = {"__pycache__", ".DS_Store", "Thumbs.db"}
+
+    def __init__(self, root, entries):
+        self.root = root
+        self._entries = {entry.url_path: entry for entry in entries}
+
+    @classmethod
+    def build(cls, root, allowed_paths):
+        """Walk `allowed_paths` (relative to `root`) and hash every file found"""
+        root = os.path.abspath(root)
+        entries = []
+        for allowed in allowed_paths:
+            base = os.path.join(root, allowed)
+            if os.path.isfile(base):
+                entries.append(cls._make_entry(root, base))
+                continue
+            for dirpath, dirnames, filenames in os.walk(base):
+                dirnames[:] = sorted(d for d in dirnames
+                                     if d not in cls.SKIP_NAMES and not d.startswith('.'))
+                for filename in sorted(filenames):
+                    if filename in cls.SKIP_NAMES or filename.startswith('.'):
+                        continue
+                    entries.append(cls._make_entry(root, os.path.join(dirpath, filename)))
+        return cls(root, entries)
+
+    @staticmethod
+    def _make_entry(root, fs_path):
+        digest = hashlib.sha256()
+        size = 0
+        with open(fs_path, 'rb') as f:
+            for block in iter(lambda: f.read(64 * 1024), b''):
+                digest.update(block)
+                size += len(block)
+        rel = os.path.relpath(fs_path, root).replace(os.sep, '/')
+        content_type = mimetypes.guess_type(fs_path)[0] or 'application/octet-stream'
+        return ManifestEntry('/' + rel, fs_path, size, digest.hexdigest(), content_type)
+
+    def lookup(self, request_path):
+        """Return the entry for a request path (query string ignored) or None"""
+        path = urllib.parse.unquote(urllib.parse.urlsplit(request_path).path)
+        entry = self._entries.get(path)
+        if entry is None and path:
+            # Tolerate "//" and "./" segments; ".." can never climb out of the index
+            entry = self._entries.get(posixpath.normpath(path))
+        return entry
+
+    def __contains__(self, request_path):
+        return self.lookup(request_path) is not None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries.values())
+
+    def to_dict(self):
+        return {"files": [entry.to_dict() for entry in self]}
@@ -0,0 +1,334 @@
+import collections
+import email.utils
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from utils.vendor_assets import USER_AGENT
+
+# Static hosts whose responses may be cached on disk
+DEFAULT_ALLOWED_HOSTS = (
+    "cdn.jsdelivr.net",
+    "fonts.googleapis.com",
+    "fonts.gstatic.com",
+)
+
+# Response headers kept with a cached body and replayed to the page
+STORED_HEADERS = ("content-type", "etag", "last-modified", "cache-control", "expires")
+
+CSS_URL_RE = re.compile(r"url\((['\"]?)(https?://[^)'\"]+)\1\)")
+
+
+def parse_cache_control(value):
+    """Split a Cache-Control header into a {directive: value-or-True} dict"""
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else True
+    return directives
+
+
+def freshness_lifetime(headers):
+    """Seconds a response may be reused without revalidation, or None for no-store"""
+    directives = parse_cache_control(headers.get("cache-control"))
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return max(0, int(directives[name]))
+            except (TypeError, ValueError):
+                return 0
+    expires = headers.get("expires")
+    if expires:
+        try:
+            expires_at = email.utils.parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return 0
+        return max(0, int(expires_at - time.time()))
+    return 0
+
+
+class ProxyCacheEntry:
+    __slots__ = ("url", "digest", "size", "headers", "stored_at", "fresh_until", "last_access")
+
+    def __init__(self, url, digest, size, headers, stored_at, fresh_until, last_access):
+        self.url = url
+        self.digest = digest
+        self.size = size
+        self.headers = headers
+        self.stored_at = stored_at
+        self.fresh_until = fresh_until
+        self.last_access = last_access
+
+    def is_fresh(self, now=None):
+        return (now or time.time()) < self.fresh_until
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data[name] for name in cls.__slots__})
+
+
+class CachingAssetProxy:
+    """Disk-backed cache in front of allow-listed static asset hosts.
+
+    Bodies are stored content-addressed (by SHA-256) under `cache_dir`, so the
+    same file served from two URLs is kept once. The cache is bounded by
+    `max_bytes`; least recently used URLs are evicted first. Freshness follows
+    the origin's Cache-Control / Expires, and stale entries are revalidated
+    with If-None-Match / If-Modified-Since. If the origin cannot be reached, a
+    stale copy is served rather than failing.
+    """
+
+    INDEX_NAME = "index.json"
+
+    def __init__(self, cache_dir, max_bytes=64 * 1024 * 1024, allowed_hosts=DEFAULT_ALLOWED_HOSTS,
+                 allowed_schemes=("https",), timeout=15, log=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.allowed_hosts = set(allowed_hosts)
+        self.allowed_schemes = set(allowed_schemes)
+        self.timeout = timeout
+        self.log = log
+        self._lock = threading.Lock()
+        # url -> [lock, callers using it]; dropped when the last caller is done
+        self._url_locks = {}
+        self._entries = {}
+        self._total = 0
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "stale_served": 0,
+                      "errors": 0, "evictions": 0, "bytes_served": 0}
+        self._load_index()
+
+    # --- index ---------------------------------------------------------------
+
+    def _index_path(self):
+        return os.path.join(self.cache_dir, self.INDEX_NAME)
+
+    def _object_path(self, digest):
+        return os.path.join(self.cache_dir, "objects", digest[:2], digest)
+
+    def _load_index(self):
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for item in data.get("entries", []):
+            try:
+                entry = ProxyCacheEntry.from_dict(item)
+            except (KeyError, TypeError):
+                continue
+            if os.path.exists(self._object_path(entry.digest)):
+                self._entries[entry.url] = entry
+        self._total = self._unique_bytes()
+
+    def _save_index(self):
+        # Caller holds self._lock
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self._index_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": [e.to_dict() for e in self._entries.values()]}, f)
+        os.replace(tmp_path, self._index_path())
+
+    def _unique_bytes(self):
+        sizes = {}
+        for entry in self._entries.values():
+            sizes[entry.digest] = entry.size
+        return sum(sizes.values())
+
+    def _evict(self):
+        # Caller holds self._lock. Drop least recently used URLs until within budget.
+        if self._total <= self.max_bytes:
+            return
+        users = collections.Counter(e.digest for e in self._entries.values())
+        for victim in sorted(self._entries.values(), key=lambda e: e.last_access):
+            if self._total <= self.max_bytes:
+                break
+            del self._entries[victim.url]
+            self.stats["evictions"] += 1
+            users[victim.digest] -= 1
+            if not users[victim.digest]:
+                self._total -= victim.size
+                try:
+                    os.remove(self._object_path(victim.digest))
+                except OSError:
+                    pass
+
+    # --- public API ----------------------------------------------------------
+
+    def is_allowed(self, url):
+        parts = urllib.parse.urlsplit(url)
+        return parts.scheme in self.allowed_schemes and parts.netloc in self.allowed_hosts
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes_cached"] = self._total
+            stats["max_bytes"] = self.max_bytes
+        return stats
+
+    def fetch(self, url, user_agent=None):
+        """Return (status, headers, body, cache_status) for an allow-listed URL.
+
+        `user_agent` is the page's own User-Agent, sent upstream so hosts that
+        tailor responses to the browser (Google Fonts only lists woff2 sources
+        for ones it recognises) answer as they would to the webview.
+        Raises ValueError for URLs outside the allow-list.
+        """
+        if not self.is_allowed(url):
+            raise ValueError(f"Host not allowed: {url}")
+
+        with self._lock:
+            slot = self._url_locks.setdefault(url, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            # One upstream request per URL at a time; concurrent callers share the result
+            with slot[0]:
+                return self._fetch_locked(url, user_agent or USER_AGENT)
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if not slot[1]:
+                    del self._url_locks[url]
+
+    def _read_body(self, entry):
+        with open(self._object_path(entry.digest), "rb") as f:
+            return f.read()
+
+    def _serve_entry(self, entry, cache_status):
+        try:
+            body = self._read_body(entry)
+        except OSError:
+            with self._lock:
+                self._entries.pop(entry.url, None)
+                self._total = self._unique_bytes()
+            return None
+        now = time.time()
+        with self._lock:
+            entry.last_access = now
+            self.stats["bytes_served"] += len(body)
+        return 200, dict(entry.headers), body, cache_status
+
+    def _fetch_locked(self, url, user_agent):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(url)
+
+        if entry is not None and entry.is_fresh(now):
+            result = self._serve_entry(entry, "HIT")
+            if result is not None:
+                with self._lock:
+                    self.stats["hits"] += 1
+                return result
+            entry = None
+
+        request_headers = {"User-Agent": user_agent}
+        if entry is not None:
+            if entry.headers.get("etag"):
+                request_headers["If-None-Match"] = entry.headers["etag"]
+            if entry.headers.get("last-modified"):
+                request_headers["If-Modified-Since"] = entry.headers["last-modified"]
+
+        try:
+            request = urllib.request.Request(url, headers=request_headers)
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                status = response.status
+                headers = {k.lower(): v for k, v in response.headers.items()}
+                body = response.read()
+        except urllib.error.HTTPError as e:
+            status = e.code
+            headers = {k.lower(): v for k, v in e.headers.items()}
+            body = e.read() if status != 304 else b""
+        except (urllib.error.URLError, OSError) as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            if entry is not None:
+                result = self._serve_entry(entry, "STALE")
+                if result is not None:
+                    with self._lock:
+                        self.stats["stale_served"] += 1
+                    if self.log:
+                        self.log(f"Asset proxy: origin unreachable, serving stale {url}: {e}", logging.WARNING)
+                    return result
+            raise
+
+        if status == 304 and entry is not None:
+            # Still valid: refresh metadata and serve the stored body
+            lifetime = freshness_lifetime(headers) or freshness_lifetime(entry.headers) or 0
+            with self._lock:
+                for name in STORED_HEADERS:
+                    if name in headers:
+                        entry.headers[name] = headers[name]
+                entry.fresh_until = now + lifetime
+                self.stats["revalidated"] += 1
+                try:
+                    self._save_index()
+                except OSError as e:
+                    # The in-memory entry is updated; the index catches up on the next save
+                    if self.log:
+                        self.log(f"Asset proxy: could not save index: {e}", logging.WARNING)
+            result = self._serve_entry(entry, "REVALIDATED")
+            if result is not None:
+                return result
+            # The stored body is gone (and its entry dropped); fetch it again unconditionally
+            return self._fetch_locked(url, user_agent)
+
+        with self._lock:
+            self.stats["misses"] += 1
+            self.stats["bytes_served"] += len(body)
+
+        if status != 200:
+            return status, {"content-type": headers.get("content-type", "text/plain")}, body, "MISS"
+
+        stored = {name: headers[name] for name in STORED_HEADERS if name in headers}
+        lifetime = freshness_lifetime(headers)
+        if lifetime is not None and len(body) <= self.max_bytes:
+            self._store(url, body, stored, now, lifetime)
+        return 200, stored, body, "MISS"
+
+    def _store(self, url, body, headers, now, lifetime):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        try:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(body)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            if self.log:
+                self.log(f"Asset proxy: could not store {url}: {e}", logging.WARNING)
+            return
+        with self._lock:
+            self._entries[url] = ProxyCacheEntry(url, digest, len(body), headers, now, now + lifetime, now)
+            self._total = self._unique_bytes()
+            self._evict()
+            try:
+                self._save_index()
+            except OSError:
+                pass
+
+
+def rewrite_css_urls(css, proxy_url_for, is_allowed):
+    """Point url(...) references at allow-listed hosts (e.g. font files) through the proxy"""
+    def replace(match):
+        quote, url = match.group(1), match.group(2)
+        if not is_allowed(url):
+            return match.group(0)
+        return f"url({quote}{proxy_url_for(url)}{quote})"
+    return CSS_URL_RE.sub(replace, css)
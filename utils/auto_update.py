@@ -3,9 +3,17 @@ import sys
 import shutil
 import tempfile
 import zipfile
+import zlib
 import requests
+import urllib3
 import json
+import random
+import hashlib
+import collections
+import socket
+import struct
 import subprocess
+import threading
 import time
 import re
 import argparse
@@ -53,8 +61,10 @@ APP_NAME = "DeepSeekChat.exe"
 REPO_URL = "https://api.github.com/repos/LousyBook94/DeepSeek-Desktop/releases/latest"
 VERSION_FILE = "version.txt"
 TEMP_DIR = os.path.join(tempfile.gettempdir(), "DeepSeekUpdate")
-MAX_RETRIES = 5
-RETRY_DELAY = 5
+# Survives the TEMP_DIR cleanup after an update
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "DeepSeekUpdateCache")
+RELEASE_CACHE_FILE = os.path.join(CACHE_DIR, "latest-release.json")
+USER_AGENT = 'DeepSeek-Desktop-Updater/1.0'
 
 def get_script_directory():
     """Returns directory where script is located."""
@@ -150,74 +160,238 @@ def get_current_version(script_dir):
             return f.read().strip()
     return "0.0.0"
 
-def fetch_latest_version_with_retry(logger):
-    """Fetches the latest release info from GitHub with retry logic."""
-    with console.status(f"[bold green]Fetching latest version...") as status:
-        for attempt in range(MAX_RETRIES):
+class RetryableStatus(Exception):
+    """An HTTP response worth retrying (5xx, 429, rate-limited 403)"""
+
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+
+class DeadlineExceeded(Exception):
+    """The retry policy's overall deadline ran out"""
+
+
+class RetryPolicy:
+    """Retry rules shared by every network call in the updater.
+
+    - separate connect and read timeouts, with the read timeout capped by
+      the time left before `deadline` (seconds for the whole operation)
+    - exponential backoff with full jitter: sleep uniform(0, base * 2^n),
+      capped at `max_delay`
+    - 5xx, 429 and rate-limited 403 responses are retried, honoring
+      Retry-After; other 4xx fail on the first attempt
+    - connection errors, timeouts and broken streams are retried; anything
+      else (bad JSON, disk errors) propagates immediately
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, max_attempts=5, base_delay=1.0, max_delay=30.0, deadline=120.0,
+                 connect_timeout=5.0, read_timeout=30.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def check(self, response):
+        """Raise RetryableStatus or requests.HTTPError for error responses"""
+        status = response.status_code
+        rate_limited = status == 403 and response.headers.get('X-RateLimit-Remaining') == '0'
+        if status in self.RETRY_STATUSES or rate_limited:
+            raise RetryableStatus(response)
+        response.raise_for_status()
+        return response
+
+    @staticmethod
+    def retry_after(response):
+        """Seconds the server asked us to wait, if it said"""
+        value = response.headers.get('Retry-After')
+        if value:
             try:
-                logger.debug(f"[Attempt {attempt+1}/{MAX_RETRIES}] Fetching release info from GitHub...")
-                
-                # Set headers to avoid SSL issues and improve compatibility
-                headers = {
-                    'User-Agent': 'DeepSeek-Desktop-Updater/1.0',
-                    'Accept': 'application/vnd.github.v3+json',
-                    'Connection': 'keep-alive'
-                }
-                
-                response = requests.get(REPO_URL, timeout=60, headers=headers)
-                response.raise_for_status()
-                release_info = response.json()
-                
-                latest_version = release_info.get("tag_name", "")
-                if not latest_version:
-                    logger.error("Version tag not found in release.")
-                    raise ValueError("Version tag not found in release.")
-                    
-                latest_version = latest_version.lstrip('v')
-                console.print(f"[green][OK][/green] Successfully fetched version info")
-                return latest_version, release_info
-            except requests.exceptions.SSLError as e:
-                error_msg = f"[{attempt + 1}/{MAX_RETRIES}] SSL Error: {e}"
-                logger.error(error_msg)
-                
-                if attempt < MAX_RETRIES - 1:
-                    console.print(f"[yellow][WARN][/yellow] SSL error. Retrying in {RETRY_DELAY} seconds...")
-                    time.sleep(RETRY_DELAY)
-                else:
-                    console.print(f"[red][FAIL][/red] SSL connection failed after all attempts")
-                    return None, None
-            except requests.exceptions.ConnectionError as e:
-                error_msg = f"[{attempt + 1}/{MAX_RETRIES}] Connection Error: {e}"
-                logger.error(error_msg)
-                
-                if attempt < MAX_RETRIES - 1:
-                    console.print(f"[yellow][WARN][/yellow] Connection error. Retrying in {RETRY_DELAY} seconds...")
-                    time.sleep(RETRY_DELAY)
-                else:
-                    console.print(f"[red][FAIL][/red] Connection failed after all attempts")
-                    return None, None
-            except requests.exceptions.Timeout as e:
-                error_msg = f"[{attempt + 1}/{MAX_RETRIES}] Timeout Error: {e}"
-                logger.error(error_msg)
-                
-                if attempt < MAX_RETRIES - 1:
-                    console.print(f"[yellow][WARN][/yellow] Timeout error. Retrying in {RETRY_DELAY} seconds...")
-                    time.sleep(RETRY_DELAY)
-                else:
-                    console.print(f"[red][FAIL][/red] Request timeout after all attempts")
-                    return None, None
-            except Exception as e:
-                error_msg = f"[{attempt + 1}/{MAX_RETRIES}] Failed to fetch release info: {e}"
-                if 'response' in locals():
-                    error_msg += f"\nResponse status: {response.status_code}"
-                logger.error(error_msg)
-                
-                if attempt < MAX_RETRIES - 1:
-                    console.print(f"[yellow][WARN][/yellow] Error occurred. Retrying in {RETRY_DELAY} seconds...")
-                    time.sleep(RETRY_DELAY)
-                else:
-                    console.print(f"[red][FAIL][/red] All attempts to fetch release info failed")
-                    return None, None
+                return max(0.0, float(value))
+            except ValueError:
+                try:
+                    from email.utils import parsedate_to_datetime
+                    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+                except (TypeError, ValueError, IndexError, OverflowError):
+                    pass
+        reset = response.headers.get('X-RateLimit-Reset')
+        if reset and response.headers.get('X-RateLimit-Remaining') == '0':
+            try:
+                return max(0.0, float(reset) - time.time())
+            except ValueError:
+                pass
+        return None
+
+    def run(self, operation, logger, what="request", on_retry=None):
+        """Call `operation(timeout)` until it succeeds or the policy gives up.
+
+        `timeout` is a (connect, read) tuple for requests. `on_retry(attempt,
+        error, delay)` is called before each sleep. Raises the last error,
+        or DeadlineExceeded when the next wait would overrun the deadline.
+        """
+        start = time.monotonic()
+        for attempt in range(self.max_attempts):
+            remaining = self.deadline - (time.monotonic() - start)
+            if remaining <= 0:
+                raise DeadlineExceeded(f"{what}: gave up after {self.deadline:.0f}s")
+            timeout = (min(self.connect_timeout, remaining), min(self.read_timeout, remaining))
+            try:
+                return operation(timeout)
+            except RetryableStatus as e:
+                error = e
+                hinted = self.retry_after(e.response)
+                delay = hinted if hinted is not None else self.backoff(attempt)
+            except requests.HTTPError:
+                raise  # 4xx: retrying will not help
+            except (requests.ConnectionError, requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                error = e
+                delay = self.backoff(attempt)
+
+            last = attempt == self.max_attempts - 1
+            remaining = self.deadline - (time.monotonic() - start)
+            logger.warning(f"[{attempt + 1}/{self.max_attempts}] {what} failed: {error}")
+            if last:
+                raise error
+            if delay >= remaining:
+                raise DeadlineExceeded(f"{what}: next retry in {delay:.1f}s would pass the deadline") from error
+            if on_retry:
+                on_retry(attempt, error, delay)
+            time.sleep(delay)
+        raise DeadlineExceeded(f"{what}: no attempts made")
+
+
+# Release metadata is small: fail within a minute rather than several
+FETCH_POLICY = RetryPolicy(max_attempts=5, base_delay=1.0, max_delay=10.0, deadline=60.0,
+                           connect_timeout=5.0, read_timeout=15.0)
+# Asset downloads may legitimately take a while; the read timeout is per chunk
+DOWNLOAD_POLICY = RetryPolicy(max_attempts=5, base_delay=2.0, max_delay=30.0, deadline=30 * 60.0,
+                              connect_timeout=10.0, read_timeout=30.0)
+
+_session = None
+
+def get_session():
+    """Shared requests.Session so retries and downloads reuse TCP/TLS connections"""
+    global _session
+    if _session is None:
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept': 'application/vnd.github.v3+json'
+        })
+        _session = session
+    return _session
+
+def load_release_cache():
+    """Last release response and its validators: {etag, last_modified, release_info}"""
+    try:
+        with open(RELEASE_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if isinstance(cache, dict) and cache.get("release_info"):
+            return cache
+    except (OSError, ValueError):
+        pass
+    return None
+
+def save_release_cache(release_info, headers):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = RELEASE_CACHE_FILE + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "etag": headers.get('ETag'),
+                "last_modified": headers.get('Last-Modified'),
+                "release_info": release_info
+            }, f)
+        os.replace(tmp_path, RELEASE_CACHE_FILE)
+    except OSError:
+        pass
+
+def conditional_headers(cache):
+    """If-None-Match / If-Modified-Since for a cached release (304s are free on GitHub)"""
+    headers = {}
+    if cache:
+        if cache.get("etag"):
+            headers['If-None-Match'] = cache["etag"]
+        if cache.get("last_modified"):
+            headers['If-Modified-Since'] = cache["last_modified"]
+    return headers
+
+def fetch_latest_version_with_retry(logger, policy=FETCH_POLICY):
+    """Fetches the latest release info from GitHub with retry logic."""
+    def attempt(timeout):
+        # Revalidate the cached release; an unchanged one costs a bodiless 304
+        cache = load_release_cache()
+        response = get_session().get(REPO_URL, timeout=timeout, headers=conditional_headers(cache))
+        if response.status_code == 304 and cache:
+            logger.debug("Release unchanged since last check (304)")
+            return cache["release_info"]
+        release_info = policy.check(response).json()
+        save_release_cache(release_info, response.headers)
+        return release_info
+
+    def on_retry(attempt_index, error, delay):
+        console.print(f"[yellow][WARN][/yellow] {error}. Retrying in {delay:.1f} seconds...")
+
+    with console.status("[bold green]Fetching latest version...") as status:
+        try:
+            release_info = policy.run(attempt, logger, "Fetching release info", on_retry)
+        except (requests.RequestException, RetryableStatus, DeadlineExceeded, ValueError) as e:
+            logger.error(f"Failed to fetch release info: {e}")
+            console.print("[red][FAIL][/red] All attempts to fetch release info failed")
+            return None, None
+
+    latest_version = release_info.get("tag_name", "")
+    if not latest_version:
+        logger.error("Version tag not found in release.")
+        return None, None
+    console.print("[green][OK][/green] Successfully fetched version info")
+    return latest_version.lstrip('v'), release_info
+
+def fetch_latest_release(etag=None, timeout=15, logger=None):
+    """Conditional request for the latest release, without console output.
+
+    Returns (status_code, headers, release_info). release_info is None unless
+    the status is 200; a 304 means the release behind `etag` is unchanged and,
+    on GitHub, does not count against the rate limit. A rate-limited or
+    failing response is returned as-is once the short retry budget is spent,
+    so the caller can read its headers. Network failures raise
+    requests.RequestException.
+    """
+    policy = RetryPolicy(max_attempts=2, base_delay=1.0, max_delay=2.0, deadline=timeout,
+                         connect_timeout=5.0, read_timeout=timeout)
+    headers = {'If-None-Match': etag} if etag else {}
+
+    def attempt(request_timeout):
+        response = get_session().get(REPO_URL, timeout=request_timeout, headers=headers)
+        if response.status_code == 304:
+            return response
+        return policy.check(response)
+
+    try:
+        response = policy.run(attempt, logger or logging.getLogger(__name__), "Release check")
+    except RetryableStatus as e:
+        response = e.response
+    except DeadlineExceeded as e:
+        if isinstance(e.__cause__, RetryableStatus):
+            response = e.__cause__.response
+        else:
+            raise requests.Timeout(str(e)) from e
+    except requests.HTTPError as e:
+        response = e.response
+    release_info = response.json() if response.status_code == 200 else None
+    return response.status_code, dict(response.headers), release_info
 
 def compare_versions(current, latest):
     """Compares two version strings. Returns True if current >= latest."""
@@ -254,6 +428,37 @@ def compare_versions(current, latest):
         print(f"Warning: Version parsing error: {e}. Assuming update needed.")
         return False
 
+def request_app_shutdown(script_dir, logger, timeout=10):
+    """Ask a running app to close itself through its single-instance channel.
+
+    Speaks the same one-line JSON protocol as utils/single_instance.py (kept
+    inline because the updater is built as a standalone executable). Returns
+    True once the app has released its instance file, False if it is not
+    running or did not answer, in which case the caller falls back to taskkill.
+    """
+    info_path = os.path.join(script_dir, "instance.json")
+    try:
+        with open(info_path, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        message = {"token": info["token"], "command": "shutdown", "args": {}}
+        with socket.create_connection(("127.0.0.1", info["port"]), timeout=2) as sock:
+            sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+            reply = json.loads(sock.makefile("rb").readline().decode("utf-8"))
+    except (OSError, ValueError, KeyError):
+        return False
+    if reply.get("status") != "success":
+        logger.warning(f"App refused shutdown request: {reply.get('message')}")
+        return False
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if not os.path.exists(info_path):
+            logger.info(f"{APP_NAME} closed cleanly.")
+            return True
+        time.sleep(0.2)
+    logger.warning(f"{APP_NAME} did not close within {timeout}s")
+    return False
+
 def bring_console_to_front():
     """Brings the console window to the front (Windows only)."""
     try:
@@ -278,6 +483,18 @@ class UpdateChecker:
         latest_version, release_info = fetch_latest_version_with_retry(self.logger)
         return latest_version, release_info
 
+    def fetch_release(self, etag=None, timeout=15):
+        """Conditional fetch used by the background update service.
+
+        Returns (status_code, headers, latest_version, release_info) with the
+        release info sanitized; version and info are None unless status is 200.
+        """
+        status, headers, info = fetch_latest_release(etag, timeout, self.logger)
+        if status != 200 or not info:
+            return status, headers, None, None
+        latest = (info.get("tag_name") or "").lstrip('v') or None
+        return status, headers, latest, self.sanitize_release_info(info)
+
     def sanitize_text_field(self, text, field_name="text"):
         """Sanitize any text field to handle Unicode characters safely"""
         if not text:
@@ -343,88 +560,1039 @@ class UpdateChecker:
         need_update = not compare_versions(current, latest)
         return need_update, current, latest, info
 
-def download_release_with_retry(asset_url, asset_name, logger):
-    """Downloads the release zip with retry logic and progress."""
-    temp_zip_path = os.path.join(TEMP_DIR, "update.zip")
-    
-    for attempt in range(MAX_RETRIES):
+def load_download_state(state_path):
+    """Sidecar state of a partial download, or None"""
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        return state if isinstance(state, dict) else None
+    except (OSError, ValueError):
+        return None
+
+
+def save_download_state(state_path, state):
+    try:
+        tmp_path = state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+    except OSError:
+        pass
+
+
+def discard_partial_download(*paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def hash_file_prefix(hasher, path, length):
+    """Feed the first `length` bytes of `path` to `hasher` and return it"""
+    with open(path, 'rb') as f:
+        while length > 0:
+            data = f.read(min(length, 1024 * 1024))
+            if not data:
+                break
+            hasher.update(data)
+            length -= len(data)
+    return hasher
+
+
+def resume_offset(asset_url, part_path, state):
+    """Bytes of `part_path` that can be resumed, or 0 to start over.
+
+    A partial file is only trusted when it belongs to the same URL and we
+    have a validator (ETag or Last-Modified) for If-Range, so a republished
+    asset is never stitched onto old bytes.
+    """
+    if not state or state.get('url') != asset_url or state.get('mode') == 'segmented':
+        return 0
+    if not (state.get('etag') or state.get('last_modified')):
+        return 0
+    try:
+        on_disk = os.path.getsize(part_path)
+    except OSError:
+        return 0
+    # The state is written after the data is flushed, so it never runs ahead
+    return min(on_disk, int(state.get('received') or 0))
+
+
+CHECKSUM_ASSET_NAMES = ('checksums.txt', 'sha256sums', 'sha256sums.txt')
+
+
+def parse_checksums(text, asset_name):
+    """SHA-256 for asset_name from `sha256sum` style output, or a bare digest"""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2 and parts[-1].lstrip('*') == asset_name and re.fullmatch(r'[0-9a-fA-F]{64}', parts[0]):
+            return parts[0].lower()
+    if len(lines) == 1 and re.fullmatch(r'[0-9a-fA-F]{64}', lines[0].split()[0]):
+        return lines[0].split()[0].lower()
+    return None
+
+
+def expected_asset_digest(release_info, asset, logger, policy=FETCH_POLICY):
+    """Published SHA-256 of a release asset, or None when the release has none.
+
+    GitHub fills in `digest` ("sha256:<hex>") for assets uploaded since
+    mid-2025; older releases may ship a checksums.txt / SHA256SUMS asset or
+    a `<asset>.sha256` file instead.
+    """
+    digest = asset.get('digest') or ''
+    if digest.lower().startswith('sha256:'):
+        return digest.split(':', 1)[1].lower()
+
+    name = asset.get('name', '')
+    for candidate in release_info.get('assets', []):
+        candidate_name = candidate.get('name', '').lower()
+        if candidate_name not in CHECKSUM_ASSET_NAMES and candidate_name != name.lower() + '.sha256':
+            continue
+
+        def attempt(timeout):
+            response = get_session().get(candidate['browser_download_url'], timeout=timeout,
+                                         headers={'Accept': 'application/octet-stream'})
+            return policy.check(response).text
+
+        try:
+            found = parse_checksums(policy.run(attempt, logger, "Fetching checksums"), name)
+        except (requests.RequestException, RetryableStatus, DeadlineExceeded) as e:
+            logger.warning(f"Could not fetch {candidate.get('name')}: {e}")
+            continue
+        if found:
+            return found
+    return None
+
+
+class DownloadProgress:
+    """Byte counters shared by the download threads and the progress sampler.
+
+    The download loop only adds to `completed`; speed, ETA and formatting
+    happen in the sampler at a fixed rate, not once per chunk.
+    """
+
+    def __init__(self, total=0, completed=0):
+        self._lock = threading.Lock()
+        self.total = total
+        self.completed = completed
+        self.baseline = completed  # bytes present before this run, excluded from speed
+        self.connections = 1
+        self.started = time.monotonic()
+
+    def add(self, count):
+        with self._lock:
+            self.completed += count
+
+    def reset(self, total, completed=0):
+        with self._lock:
+            self.total = total
+            self.completed = completed
+            self.baseline = completed
+            self.started = time.monotonic()
+
+    def snapshot(self):
+        with self._lock:
+            completed, total, baseline = self.completed, self.total, self.baseline
+        elapsed = time.monotonic() - self.started
+        speed = (completed - baseline) / elapsed if elapsed > 0 else 0.0
+        eta = (total - completed) / speed if speed > 0 and total else None
+        return completed, total, speed, eta
+
+
+class RichProgressUI:
+    """Progress bar on the console, as the updater has always shown it"""
+
+    def __init__(self, description="Downloading"):
+        self.description = description
+        self._progress = None
+        self._task = None
+
+    def start(self, progress):
+        self._progress = Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.percentage:>3.1f}%"),
+            TextColumn("[progress.file_size]{task.fields[downloaded_str]} / {task.fields[total_size_str]}"),
+            TextColumn("[progress.rate]{task.fields[speed]}"),
+            TextColumn("[progress.eta]{task.fields[eta]}"),
+            console=console,
+            expand=True
+        )
+        self._progress.start()
+        self._task = self._progress.add_task(f"[cyan]{self.description}",
+                                             total=progress.total or None,
+                                             completed=progress.completed,
+                                             downloaded_str=format_size(progress.completed),
+                                             total_size_str=format_size(progress.total),
+                                             speed="0 B/s",
+                                             eta="Calculating...")
+
+    def update(self, progress):
+        completed, total, speed, eta = progress.snapshot()
+        description = self.description
+        if progress.connections > 1:
+            description += f" ({progress.connections} conn)"
+        self._progress.update(self._task,
+                              description=f"[cyan]{description}",
+                              total=total or None,
+                              completed=completed,
+                              downloaded_str=format_size(completed),
+                              total_size_str=format_size(total),
+                              speed=format_size(speed) + "/s",
+                              eta=time.strftime("%H:%M:%S", time.gmtime(eta)) if eta is not None else "Calculating...")
+
+    def stop(self, progress):
+        self.update(progress)
+        self._progress.stop()
+
+
+class HeadlessProgressUI:
+    """No rendering at all; used when stdout is not a terminal"""
+
+    def start(self, progress):
+        pass
+
+    def update(self, progress):
+        pass
+
+    def stop(self, progress):
+        pass
+
+
+def make_progress_ui(description="Downloading"):
+    if console.is_terminal and not console.quiet:
+        return RichProgressUI(description)
+    return HeadlessProgressUI()
+
+
+class ProgressSampler:
+    """Publishes a DownloadProgress to a UI from its own thread at a fixed rate.
+
+    Use as a context manager around the download loop.
+    """
+
+    def __init__(self, progress, ui=None, interval=0.1):
+        self.progress = progress
+        self.ui = ui or make_progress_ui()
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.ui.update(self.progress)
+
+    def __enter__(self):
+        self.ui.start(self.progress)
+        if not isinstance(self.ui, HeadlessProgressUI):
+            self._thread = threading.Thread(target=self._run, name="download-progress", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.ui.stop(self.progress)
+        return False
+
+
+class ReadBuffer:
+    """Reusable read buffer that grows while reads keep filling it.
+
+    Starts at `initial` bytes and doubles up to `maximum` whenever a read
+    fills it completely, so a fast link quickly moves to few large reads
+    while a slow one keeps small, responsive reads.
+    """
+
+    def __init__(self, initial=64 * 1024, maximum=1024 * 1024):
+        self.maximum = maximum
+        self._buffer = bytearray(initial)
+        self._view = memoryview(self._buffer)
+
+    def iter_body(self, response, limit=None):
+        """Yield memoryviews of the body of a streamed requests response.
+
+        The views alias the buffer and are only valid until the next one is
+        yielded. urllib3 errors are re-raised as the requests exceptions the
+        retry policy knows, as iter_content would.
+        """
+        raw = response.raw
+        raw.decode_content = True
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = len(self._buffer) if remaining is None else min(len(self._buffer), remaining)
+            try:
+                count = raw.readinto(self._view[:size])
+            except urllib3.exceptions.ProtocolError as e:
+                raise requests.exceptions.ChunkedEncodingError(e)
+            except urllib3.exceptions.ReadTimeoutError as e:
+                raise requests.ConnectionError(e)
+            if not count:
+                return
+            yield self._view[:count]
+            if remaining is not None:
+                remaining -= count
+            if count == len(self._buffer) and len(self._buffer) < self.maximum:
+                self._buffer = bytearray(min(self.maximum, len(self._buffer) * 2))
+                self._view = memoryview(self._buffer)
+
+
+# Below this a single stream finishes before extra connections pay off
+SEGMENTED_MIN_SIZE = 4 * 1024 * 1024
+
+
+class SegmentedDownloadError(Exception):
+    """The server stopped honoring ranges, the asset changed, or we were stopped"""
+
+
+class SegmentedDownloader:
+    """Downloads one asset as byte ranges fetched concurrently.
+
+    `probe()` asks for bytes=0-0 to learn the size and validator and whether
+    ranges work at all. `run()` preallocates the part file and hands
+    fixed-size segments to worker threads, each with its own file handle
+    so writes land at their offset, over the shared session's connection
+    pool. Every segment request carries If-Range, so a republished asset
+    answers 200 and aborts the run instead of mixing versions.
+
+    The connection count starts at `initial_connections` and grows one at
+    a time while the per-connection throughput holds up (at least
+    `ramp_threshold` of the best seen); once it drops the link is
+    saturated and N stays put. Finished segments are recorded in the
+    sidecar state file, so the next updater run fetches only the rest.
+
+    SHA-256 is computed from the received chunks, in file order, without
+    reading the file back. The connection at the hash frontier feeds its
+    bytes straight to the hasher; chunks that arrive ahead of it are held
+    in memory, up to `hash_buffer_bytes`, after which those connections
+    wait for the frontier to catch up. Only segments left on disk by an
+    earlier run are read back, once, when the frontier reaches them. The
+    digest (`sha256`) is ready when the last segment lands.
+    """
+
+    def __init__(self, url, part_path, state_path, logger, policy=DOWNLOAD_POLICY,
+                 initial_connections=2, max_connections=8, segment_size=None,
+                 ramp_interval=0.5, ramp_threshold=0.85, progress=None, hash_buffer_bytes=64 * 1024 * 1024):
+        self.url = url
+        self.part_path = part_path
+        self.state_path = state_path
+        self.logger = logger
+        self.policy = policy
+        self.initial_connections = initial_connections
+        self.max_connections = max_connections
+        self.segment_size = segment_size
+        self.ramp_interval = ramp_interval
+        self.ramp_threshold = ramp_threshold
+        self.hash_buffer_bytes = hash_buffer_bytes
+        self.size = None
+        self.etag = None
+        self.last_modified = None
+        self.progress = progress or DownloadProgress()
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._pending = collections.deque()
+        self._done = set()
+        self._active = 0
+        self._error = None
+        self._state = None
+        self._resumed = set()
+        self._hasher = hashlib.sha256()
+        self._hashed = 0
+        # Chunks received ahead of the hash frontier, by file offset
+        self._held = {}
+        self._held_bytes = 0
+        self._hash_cond = threading.Condition()
+        self.sha256 = None
+
+    @property
+    def validator(self):
+        return self.etag or self.last_modified
+
+    def probe(self):
+        """True when the server serves ranges of this asset with a validator"""
+        def attempt(timeout):
+            headers = {'Range': 'bytes=0-0', 'Accept': 'application/octet-stream'}
+            with get_session().get(self.url, stream=True, timeout=timeout, headers=headers) as r:
+                self.policy.check(r)
+                match = re.match(r'bytes 0-0/(\d+)$', r.headers.get('content-range', ''))
+                if r.status_code != 206 or not match:
+                    return False
+                self.size = int(match.group(1))
+                self.etag = r.headers.get('ETag')
+                self.last_modified = r.headers.get('Last-Modified')
+                return bool(self.validator)
+
+        return self.policy.run(attempt, self.logger, "Range probe")
+
+    def _segments(self):
+        size = self.segment_size or max(1024 * 1024, min(8 * 1024 * 1024, self.size // 32))
+        self.segment_size = size
+        return [(start, min(start + size, self.size) - 1) for start in range(0, self.size, size)]
+
+    def _prepare(self, segments):
+        state = load_download_state(self.state_path)
+        resumable = (state and state.get('mode') == 'segmented' and state.get('url') == self.url
+                     and state.get('size') == self.size and state.get('segment_size') == self.segment_size
+                     and state.get('etag') == self.etag and state.get('last_modified') == self.last_modified
+                     and os.path.exists(self.part_path) and os.path.getsize(self.part_path) == self.size)
+        if resumable:
+            self._done = set(state.get('done') or [])
+            self._resumed = set(self._done)
+        else:
+            with open(self.part_path, 'wb') as f:
+                f.truncate(self.size)
+            self._done = set()
+        self._state = {
+            'mode': 'segmented',
+            'url': self.url,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'size': self.size,
+            'segment_size': self.segment_size,
+            'done': sorted(self._done)
+        }
+        save_download_state(self.state_path, self._state)
+        self._pending = collections.deque(seg for seg in segments if seg[0] not in self._done)
+        self.progress.reset(self.size, sum(end - start + 1 for start, end in segments if start in self._done))
+        if self._done:
+            self.logger.info(f"Resuming segmented download: {len(self._done)}/{len(segments)} segments present")
+
+    def _fetch(self, f, buffer, start, end, timeout):
+        headers = {
+            'Range': f'bytes={start}-{end}',
+            'If-Range': self.validator,
+            'Accept': 'application/octet-stream'
+        }
+        received = 0
+        try:
+            with get_session().get(self.url, stream=True, timeout=timeout, headers=headers) as r:
+                if r.status_code == 200:
+                    raise SegmentedDownloadError("Asset changed or ranges no longer honored")
+                self.policy.check(r)
+                if not r.headers.get('content-range', '').startswith(f'bytes {start}-{end}/'):
+                    raise SegmentedDownloadError(f"Unexpected Content-Range {r.headers.get('content-range')!r}")
+                f.seek(start)
+                for chunk in buffer.iter_body(r, end - start + 1):
+                    if self._stop.is_set():
+                        raise SegmentedDownloadError("Stopped")
+                    f.write(chunk)
+                    self._consume(start + received, chunk)
+                    received += len(chunk)
+                    self.progress.add(len(chunk))
+            if received != end - start + 1:
+                raise requests.ConnectionError(f"Segment {start}-{end} truncated at {received} bytes")
+        except BaseException:
+            self.progress.add(-received)
+            # The retry sends the segment again from its first byte
+            with self._hash_cond:
+                for position in [p for p in self._held if start <= p <= end]:
+                    self._held_bytes -= len(self._held.pop(position))
+                self._hash_cond.notify_all()
+            raise
+
+    def _worker(self):
+        try:
+            with open(self.part_path, 'r+b') as f:
+                buffer = ReadBuffer()
+                while not self._stop.is_set():
+                    with self._lock:
+                        if not self._pending:
+                            return
+                        start, end = self._pending.popleft()
+                    self.policy.run(lambda timeout: self._fetch(f, buffer, start, end, timeout),
+                                    self.logger, f"Segment {start}-{end}")
+                    with self._lock:
+                        self._done.add(start)
+                        self._state['done'] = sorted(self._done)
+                        save_download_state(self.state_path, self._state)
+        except Exception as e:
+            with self._lock:
+                if self._error is None and not self._stop.is_set():
+                    self._error = e
+            self._stop.set()
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _consume(self, position, data):
+        """Hash `data` received at `position`, holding it if it is ahead of the frontier"""
+        with self._hash_cond:
+            while (position > self._hashed and self._held_bytes + len(data) > self.hash_buffer_bytes
+                   and not self._stop.is_set()):
+                self._hash_cond.wait(0.1)
+            if position > self._hashed:
+                self._held[position] = bytes(data)
+                self._held_bytes += len(data)
+                return
+            # A retried segment resends bytes the frontier has already hashed
+            skip = self._hashed - position
+            if skip < len(data):
+                self._hasher.update(data[skip:])
+                self._hashed += len(data) - skip
+            self._advance_hash()
+            self._hash_cond.notify_all()
+
+    def _advance_hash(self):
+        # Caller holds self._hash_cond. Hash everything now contiguous with the frontier.
+        while self._hashed < self.size:
+            data = self._held.pop(self._hashed, None)
+            if data is not None:
+                self._held_bytes -= len(data)
+                self._hasher.update(data)
+                self._hashed += len(data)
+            elif self._hashed in self._resumed:
+                # Written by an earlier run, so it only exists on disk
+                end = min(self._hashed + self.segment_size, self.size)
+                with open(self.part_path, 'rb') as f:
+                    f.seek(self._hashed)
+                    while self._hashed < end:
+                        data = f.read(min(end - self._hashed, 1024 * 1024))
+                        if not data:
+                            raise SegmentedDownloadError("Part file shorter than its recorded segments")
+                        self._hasher.update(data)
+                        self._hashed += len(data)
+            else:
+                break
+
+    def _add_connection(self):
+        with self._lock:
+            if not self._pending or self.connections >= self.max_connections:
+                return False
+            self.connections += 1
+            self.progress.connections = self.connections
+            self._active += 1
+        threading.Thread(target=self._worker, name=f"segment-{self.connections}", daemon=True).start()
+        return True
+
+    def run(self, sample_interval=0.1):
+        """Download every segment into part_path, reporting through self.progress"""
+        segments = self._segments()
+        self._prepare(segments)
+        with self._hash_cond:
+            self._advance_hash()
+        for _ in range(self.initial_connections):
+            self._add_connection()
+
+        ramping = True
+        best_per_connection = 0.0
+        window_start, window_bytes = time.monotonic(), self.progress.completed
         try:
+            while True:
+                with self._lock:
+                    active = self._active
+                if active == 0:
+                    break
+                time.sleep(sample_interval)
+
+                now = time.monotonic()
+                if ramping and now - window_start >= self.ramp_interval:
+                    rate = (self.progress.completed - window_bytes) / (now - window_start)
+                    per_connection = rate / max(1, active)
+                    best_per_connection = max(best_per_connection, per_connection)
+                    if per_connection >= self.ramp_threshold * best_per_connection:
+                        ramping = self._add_connection()
+                    else:
+                        ramping = False
+                    if not ramping:
+                        self.logger.info(f"Segmented download settled at {self.connections} connections "
+                                         f"({format_size(per_connection)}/s each)")
+                    window_start, window_bytes = now, self.progress.completed
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            if self._error is not None or self._pending:
+                self._stop.set()
+
+        if self._error is not None:
+            raise self._error
+        missing = [start for start, _ in segments if start not in self._done]
+        if missing or os.path.getsize(self.part_path) != self.size:
+            raise SegmentedDownloadError(f"{len(missing)} segments missing after download")
+        if self._hashed == self.size:
+            self.sha256 = self._hasher.hexdigest()
+        return self.part_path
+
+
+def download_segmented(asset_url, asset_name, part_path, state_path, logger, policy=DOWNLOAD_POLICY,
+                       ui_factory=make_progress_ui):
+    """Try a segmented download into part_path.
+
+    Returns the SHA-256 of the downloaded file, or None to use a single stream.
+    """
+    downloader = SegmentedDownloader(asset_url, part_path, state_path, logger, policy)
+    try:
+        if not downloader.probe():
+            logger.info("Server does not serve ranges for this asset; using a single stream")
+            return None
+    except (requests.RequestException, RetryableStatus, DeadlineExceeded) as e:
+        logger.warning(f"Range probe failed: {e}")
+        return None
+    if downloader.size < SEGMENTED_MIN_SIZE:
+        return None
+
+    console.print(f"[bold blue]Downloading {asset_name} in segments...[/bold blue]")
+    with ProgressSampler(downloader.progress, ui_factory()):
+        try:
+            downloader.run()
+        except (requests.RequestException, RetryableStatus, DeadlineExceeded,
+                SegmentedDownloadError, OSError) as e:
+            logger.warning(f"Segmented download failed ({e}); falling back to a single stream")
+            console.print(f"[yellow][WARN][/yellow] Segmented download failed: {e}")
+            discard_partial_download(part_path, state_path)
+            return None
+    return downloader.sha256
+
+
+def download_release_with_retry(asset_url, asset_name, logger, policy=DOWNLOAD_POLICY, segmented=True,
+                                expected_sha256=None, ui_factory=make_progress_ui):
+    """Downloads the release zip with retry logic and progress.
+
+    The file is hashed (SHA-256) as it is written. With `expected_sha256`
+    a mismatching download is deleted and None is returned, so a corrupt
+    asset never reaches the backup or extraction step.
+
+    Large assets on servers that honor ranges go through SegmentedDownloader;
+    anything else, or a segmented run that fails, uses a single stream.
+    Bytes land in update.zip.part next to a small JSON state file (URL,
+    ETag/Last-Modified, size, bytes received). A retry, or the next updater
+    run, resumes with Range + If-Range; if the asset changed or the server
+    ignores ranges the reply is a plain 200 and the download starts over.
+
+    The loop only counts bytes; a ProgressSampler renders them at 10 Hz
+    through the UI from `ui_factory` (a rich bar on a terminal, nothing
+    when headless).
+    """
+    temp_zip_path = os.path.join(TEMP_DIR, "update.zip")
+    part_path = temp_zip_path + ".part"
+    state_path = temp_zip_path + ".state.json"
+    start_time = time.time()
+    digest = None
+
+    def attempt(timeout):
+        nonlocal start_time, digest
+        state = load_download_state(state_path)
+        offset = resume_offset(asset_url, part_path, state)
+        headers = {'Accept': 'application/octet-stream'}
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+            headers['If-Range'] = state.get('etag') or state.get('last_modified')
+            console.print(f"[bold blue]Resuming {asset_name} at {format_size(offset)}...[/bold blue]")
+        else:
             console.print(f"[bold blue]Downloading {asset_name}...[/bold blue]")
-            
-            with requests.get(asset_url, stream=True, timeout=60) as r:
-                r.raise_for_status()
-                total_size = int(r.headers.get('content-length', 0))
-                
-                # Custom progress tracking for ETA and speed
-                downloaded = 0
-                start_time = time.time()
-                
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                    BarColumn(),
-                    TextColumn("[progress.percentage]{task.percentage:>3.1f}%"),
-                    TextColumn("[progress.file_size]{task.fields[downloaded_str]} / {task.fields[total_size_str]}"),
-                    TextColumn("[progress.rate]{task.fields[speed]}"),
-                    TextColumn("[progress.eta]{task.fields[eta]}"),
-                    console=console,
-                    expand=True
-                ) as progress:
-                    task = progress.add_task("[cyan]Downloading",
-                                            total=total_size,
-                                            downloaded_str="0 B",
-                                            total_size_str="0 B",
-                                            speed="0 B/s",
-                                            eta="Calculating...")
-                    
-                    with open(temp_zip_path, 'wb') as f:
-                        for chunk in r.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                                downloaded += len(chunk)
-                                
-                                # Calculate progress metrics
-                                elapsed = time.time() - start_time
-                                speed = downloaded / elapsed if elapsed > 0 else 0
-                                
-                                # Calculate ETA
-                                if speed > 0:
-                                    remaining = (total_size - downloaded) / speed
-                                    eta_str = time.strftime("%H:%M:%S", time.gmtime(remaining))
-                                else:
-                                    eta_str = "Calculating..."
-                                
-                                # Format size strings
-                                downloaded_str = format_size(downloaded)
-                                total_size_str = format_size(total_size)
-                                speed_str = format_size(speed) + "/s"
-                                
-                                progress.update(task,
-                                              advance=len(chunk),
-                                              downloaded_str=downloaded_str,
-                                              total_size_str=total_size_str,
-                                              speed=speed_str,
-                                              eta=eta_str)
-            
-            if os.path.exists(temp_zip_path) and os.path.getsize(temp_zip_path) > 0:
-                elapsed = time.time() - start_time
-                console.print(f"[green][OK][/green] Download complete! Elapsed time: {format_time(elapsed)}")
+
+        with get_session().get(asset_url, stream=True, timeout=timeout, headers=headers) as r:
+            if r.status_code == 416 and offset and offset == state.get('size'):
+                # Everything was already here; the previous run stopped before renaming
+                logger.info("Partial download was already complete")
+                digest = hash_file_prefix(hashlib.sha256(), part_path, offset).hexdigest()
+                os.replace(part_path, temp_zip_path)
+                discard_partial_download(state_path)
                 return temp_zip_path
+            if r.status_code == 416:
+                # Our bytes no longer fit the asset; start clean next attempt
+                discard_partial_download(part_path, state_path)
+                raise requests.ConnectionError("Range not satisfiable, restarting download")
+            policy.check(r)
+
+            if r.status_code == 206:
+                content_range = r.headers.get('content-range', '')
+                if not content_range.startswith(f'bytes {offset}-'):
+                    discard_partial_download(state_path)
+                    raise requests.ConnectionError(f"Unexpected Content-Range {content_range!r}")
+                total_size = int(content_range.rsplit('/', 1)[-1]) if not content_range.endswith('/*') else 0
+                logger.info(f"Resuming download at byte {offset} of {total_size}")
             else:
-                raise IOError("Downloaded file is empty or not found.")
+                if offset:
+                    logger.info("Server sent the full asset; restarting download from the beginning")
+                offset = 0
+                total_size = int(r.headers.get('content-length', 0))
 
-        except Exception as e:
-            logger.error(f"[{attempt + 1}/{MAX_RETRIES}] Download failed: {e}")
+            hasher = hashlib.sha256()
+            if offset:
+                # Bytes kept from an earlier attempt are hashed once, before new ones arrive
+                hash_file_prefix(hasher, part_path, offset)
+
+            state = {
+                'url': asset_url,
+                'etag': r.headers.get('ETag'),
+                'last_modified': r.headers.get('Last-Modified'),
+                'size': total_size,
+                'received': offset
+            }
+            save_download_state(state_path, state)
+
+            downloaded = offset
+            start_time = time.time()
+            last_save = start_time
+            progress = DownloadProgress(total_size, offset)
+
+            with ProgressSampler(progress, ui_factory()):
+                with open(part_path, 'r+b' if offset else 'wb') as f:
+                    f.seek(offset)
+                    f.truncate()
+                    try:
+                        for chunk in ReadBuffer().iter_body(r):
+                            f.write(chunk)
+                            hasher.update(chunk)
+                            downloaded += len(chunk)
+                            progress.add(len(chunk))
+
+                            now = time.time()
+                            if now - last_save >= 1.0:
+                                f.flush()
+                                state['received'] = downloaded
+                                save_download_state(state_path, state)
+                                last_save = now
+                    finally:
+                        # Whatever arrived is kept for the next attempt
+                        f.flush()
+                        state['received'] = downloaded
+                        save_download_state(state_path, state)
+
+        # A connection dropped mid-body can look like a clean end of stream
+        if total_size and downloaded < total_size:
+            raise requests.ConnectionError(f"Download truncated at {downloaded} of {total_size} bytes")
+        if downloaded == 0:
+            raise requests.ConnectionError("Downloaded file is empty or not found.")
+        os.replace(part_path, temp_zip_path)
+        discard_partial_download(state_path)
+        digest = hasher.hexdigest()
+        return temp_zip_path
+
+    def on_retry(attempt_index, error, delay):
+        console.print(f"[red][FAIL][/red] Download failed: {error}")
+        console.print(f"[yellow][WARN][/yellow] Retrying in {delay:.1f} seconds...")
+
+    if segmented:
+        digest = download_segmented(asset_url, asset_name, part_path, state_path, logger, policy, ui_factory)
+        if digest:
+            os.replace(part_path, temp_zip_path)
+            discard_partial_download(state_path)
+
+    if not digest:
+        try:
+            policy.run(attempt, logger, "Download", on_retry)
+        except (requests.RequestException, RetryableStatus, DeadlineExceeded) as e:
+            logger.error(f"Download failed: {e}")
             console.print(f"[red][FAIL][/red] Download failed: {e}")
-            
-            if attempt < MAX_RETRIES - 1:
-                console.print(f"[yellow][WARN][/yellow] Retrying in {RETRY_DELAY} seconds...")
-                time.sleep(RETRY_DELAY)
+            return None
+
+    logger.info(f"Downloaded {asset_name}, SHA-256 {digest}")
+    if expected_sha256 and digest != expected_sha256.lower():
+        logger.error(f"Checksum mismatch for {asset_name}: expected {expected_sha256}, got {digest}")
+        console.print("[red][FAIL][/red] Checksum mismatch: the download is corrupt or was tampered with")
+        discard_partial_download(temp_zip_path)
+        return None
+    if expected_sha256:
+        console.print("[green][OK][/green] Checksum verified")
+
+    elapsed = time.time() - start_time
+    console.print(f"[green][OK][/green] Download complete! Elapsed time: {format_time(elapsed)}")
+    return temp_zip_path
+
+
+# A delta that needs more than this share of the full zip is not worth the extra requests
+DELTA_MAX_FRACTION = 0.5
+
+
+class DeltaUnavailable(Exception):
+    """A delta update is not possible; fall back to the full download"""
+
+
+class RemoteZip:
+    """Reads the central directory and chosen members of a remote zip via HTTP Range.
+
+    Only the last 64 KB (end of central directory record), the central
+    directory itself and the byte spans of the requested members are
+    fetched. A server that answers a range request with 200 raises
+    DeltaUnavailable before the body is read.
+    """
+
+    EOCD = b'PK\x05\x06'
+    ZIP64_LOCATOR = b'PK\x06\x07'
+    ZIP64_EOCD = b'PK\x06\x06'
+    CENTRAL_HEADER = b'PK\x01\x02'
+    LOCAL_HEADER = b'PK\x03\x04'
+
+    def __init__(self, url, logger, policy=FETCH_POLICY, merge_gap=64 * 1024):
+        self.url = url
+        self.logger = logger
+        self.policy = policy
+        self.merge_gap = merge_gap
+        self.size = None
+        self.validator = None
+        self.members = {}
+        self.cd_offset = None
+        self.requests = 0
+        self.bytes_fetched = 0
+
+    def _get_range(self, byte_range):
+        def attempt(timeout):
+            headers = {'Range': f'bytes={byte_range}', 'Accept': 'application/octet-stream'}
+            if self.validator:
+                headers['If-Range'] = self.validator
+            with get_session().get(self.url, stream=True, timeout=timeout, headers=headers) as r:
+                if r.status_code == 200:
+                    raise DeltaUnavailable("Server does not serve byte ranges" if not self.validator
+                                           else "Release asset changed during the delta update")
+                self.policy.check(r)
+                match = re.match(r'bytes (\d+)-(\d+)/(\d+)$', r.headers.get('content-range', ''))
+                if r.status_code != 206 or not match:
+                    raise DeltaUnavailable(f"Unexpected reply to a range request (HTTP {r.status_code})")
+                if self.validator is None:
+                    # Later requests go straight to the CDN URL the release redirected to
+                    self.url = r.url
+                    self.validator = r.headers.get('ETag') or r.headers.get('Last-Modified')
+                    self.size = int(match.group(3))
+                    if not self.validator:
+                        raise DeltaUnavailable("Server sends no ETag/Last-Modified to pin the asset")
+                data = r.content
+            self.requests += 1
+            self.bytes_fetched += len(data)
+            return data
+
+        return self.policy.run(attempt, self.logger, "Range request")
+
+    def read_central_directory(self):
+        """Fetch and parse the central directory into self.members (name -> dict)"""
+        tail = self._get_range('-65558')  # EOCD (22 bytes) plus the longest possible comment
+        tail_start = self.size - len(tail)
+        pos = tail.rfind(self.EOCD)
+        if pos < 0 or len(tail) - pos < 22:
+            raise DeltaUnavailable("End of central directory not found")
+        _, _, _, count, cd_size, cd_offset, _ = struct.unpack('<HHHHIIH', tail[pos + 4:pos + 22])
+
+        if 0xFFFFFFFF in (cd_size, cd_offset) or count == 0xFFFF:
+            locator = pos - 20
+            if locator < 0 or tail[locator:locator + 4] != self.ZIP64_LOCATOR:
+                raise DeltaUnavailable("ZIP64 locator not found")
+            _, record_offset, _ = struct.unpack('<IQI', tail[locator + 4:locator + 20])
+            if record_offset >= tail_start:
+                record = tail[record_offset - tail_start:record_offset - tail_start + 56]
+            else:
+                record = self._get_range(f'{record_offset}-{record_offset + 55}')
+            if record[:4] != self.ZIP64_EOCD:
+                raise DeltaUnavailable("ZIP64 end of central directory not found")
+            count, cd_size, cd_offset = struct.unpack('<QQQ', record[32:56])
+
+        if cd_offset >= tail_start:
+            cd = tail[cd_offset - tail_start:cd_offset - tail_start + cd_size]
+        else:
+            cd = self._get_range(f'{cd_offset}-{cd_offset + cd_size - 1}')
+        self.cd_offset = cd_offset
+
+        members = {}
+        i = 0
+        while i + 46 <= len(cd) and cd[i:i + 4] == self.CENTRAL_HEADER:
+            (flags, method, crc, compressed_size, size,
+             name_len, extra_len, comment_len) = struct.unpack('<HH4xIIIHHH', cd[i + 8:i + 34])
+            offset = struct.unpack('<I', cd[i + 42:i + 46])[0]
+            raw_name = cd[i + 46:i + 46 + name_len]
+            extra = cd[i + 46 + name_len:i + 46 + name_len + extra_len]
+            if 0xFFFFFFFF in (size, compressed_size, offset):
+                size, compressed_size, offset = self._zip64_values(extra, size, compressed_size, offset)
+            name = raw_name.decode('utf-8' if flags & 0x800 else 'cp437')
+            # Archives made by older PowerShell use backslashes
+            name = name.replace('\\', '/')
+            members[name] = {
+                'name': name,
+                'flags': flags,
+                'method': method,
+                'crc': crc,
+                'compressed_size': compressed_size,
+                'size': size,
+                'offset': offset
+            }
+            i += 46 + name_len + extra_len + comment_len
+        if len(members) != count:
+            raise DeltaUnavailable(f"Central directory lists {len(members)} of {count} entries")
+        self.members = members
+        return members
+
+    @staticmethod
+    def _zip64_values(extra, size, compressed_size, offset):
+        i = 0
+        while i + 4 <= len(extra):
+            header_id, length = struct.unpack('<HH', extra[i:i + 4])
+            if header_id == 0x0001:
+                values = extra[i + 4:i + 4 + length]
+                fields = []
+                for j in range(0, len(values) - 7, 8):
+                    fields.append(struct.unpack('<Q', values[j:j + 8])[0])
+                if size == 0xFFFFFFFF and fields:
+                    size = fields.pop(0)
+                if compressed_size == 0xFFFFFFFF and fields:
+                    compressed_size = fields.pop(0)
+                if offset == 0xFFFFFFFF and fields:
+                    offset = fields.pop(0)
+                break
+            i += 4 + length
+        return size, compressed_size, offset
+
+    def span_bytes(self, names):
+        """Compressed bytes (with local headers) that fetching `names` would cost"""
+        return sum(end - start for start, end in self._spans(names).values())
+
+    def _spans(self, names):
+        # A member runs from its local header to the next member (or the central directory)
+        offsets = sorted(member['offset'] for member in self.members.values()) + [self.cd_offset]
+        following = {offsets[k]: offsets[k + 1] for k in range(len(offsets) - 1)}
+        return {name: (self.members[name]['offset'], following[self.members[name]['offset']])
+                for name in names}
+
+    def fetch(self, names):
+        """Yield (name, data) for each member, merging nearby spans into one request"""
+        spans = sorted(self._spans(names).items(), key=lambda item: item[1][0])
+        runs = []
+        for name, (start, end) in spans:
+            if runs and start - runs[-1][1] <= self.merge_gap:
+                runs[-1][1] = max(runs[-1][1], end)
+                runs[-1][2].append(name)
             else:
-                console.print(f"[red][FAIL][/red] All download attempts failed")
-                raise
+                runs.append([start, end, [name]])
+
+        for start, end, run_names in runs:
+            data = self._get_range(f'{start}-{end - 1}')
+            for name in run_names:
+                yield name, self._extract(self.members[name], data, start)
+
+    def _extract(self, member, data, data_start):
+        if member['flags'] & 0x1:
+            raise DeltaUnavailable(f"{member['name']} is encrypted")
+        local = member['offset'] - data_start
+        if data[local:local + 4] != self.LOCAL_HEADER:
+            raise DeltaUnavailable(f"Bad local header for {member['name']}")
+        name_len, extra_len = struct.unpack('<HH', data[local + 26:local + 30])
+        body = local + 30 + name_len + extra_len
+        compressed = data[body:body + member['compressed_size']]
+        if len(compressed) != member['compressed_size']:
+            raise DeltaUnavailable(f"Short read for {member['name']}")
+        if member['method'] == zipfile.ZIP_STORED:
+            content = compressed
+        elif member['method'] == zipfile.ZIP_DEFLATED:
+            decompressor = zlib.decompressobj(-15)
+            content = decompressor.decompress(compressed) + decompressor.flush()
+        else:
+            raise DeltaUnavailable(f"Unsupported compression method {member['method']} for {member['name']}")
+        if len(content) != member['size'] or zlib.crc32(content) != member['crc']:
+            raise DeltaUnavailable(f"CRC mismatch for {member['name']}")
+        return content
+
+
+def manifest_asset_for(release_info, asset):
+    """The `<asset>.manifest.json` published next to a release zip, or None"""
+    name = asset.get('name', '')
+    wanted = name[:-4] + '.manifest.json' if name.lower().endswith('.zip') else name + '.manifest.json'
+    for candidate in release_info.get('assets', []):
+        if candidate.get('name', '').lower() == wanted.lower():
+            return candidate
     return None
 
+
+def fetch_release_manifest(manifest_asset, logger, policy=FETCH_POLICY):
+    """Download and sanity-check a release manifest: {"files": [{path, size, sha256}]}"""
+    def attempt(timeout):
+        response = get_session().get(manifest_asset['browser_download_url'], timeout=timeout,
+                                     headers={'Accept': 'application/octet-stream'})
+        return policy.check(response).json()
+
+    manifest = policy.run(attempt, logger, "Fetching manifest")
+    files = manifest.get('files') if isinstance(manifest, dict) else None
+    if not isinstance(files, list):
+        raise ValueError("Manifest has no file list")
+    for entry in files:
+        path = entry.get('path', '')
+        normalized = os.path.normpath(path)
+        if (not path or os.path.isabs(path) or normalized.startswith('..')
+                or not re.fullmatch(r'[0-9a-f]{64}', str(entry.get('sha256', '')))):
+            raise ValueError(f"Invalid manifest entry: {entry!r}")
+    return manifest
+
+
+def file_sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def changed_manifest_files(manifest, script_dir):
+    """Manifest entries whose local copy is missing or differs (size first, then SHA-256)"""
+    changed = []
+    for entry in manifest['files']:
+        local_path = os.path.join(script_dir, *entry['path'].split('/'))
+        try:
+            if os.path.getsize(local_path) == entry['size'] and file_sha256(local_path) == entry['sha256']:
+                continue
+        except OSError:
+            pass
+        changed.append(entry)
+    return changed
+
+
+def prepare_delta_update(release_info, asset, script_dir, logger):
+    """Stage only the files that differ from this install; None means do a full download.
+
+    Needs a `<asset>.manifest.json` in the release and a server that serves
+    ranges of the zip. Changed members are fetched straight out of the
+    remote zip, checked against their CRC and the manifest's SHA-256 and
+    written under TEMP_DIR/delta with their install-relative paths.
+    """
+    manifest_asset = manifest_asset_for(release_info, asset)
+    if not manifest_asset:
+        logger.info("Release has no file manifest; delta update not possible")
+        return None
+
+    delta_dir = os.path.join(TEMP_DIR, "delta")
+    try:
+        manifest = fetch_release_manifest(manifest_asset, logger)
+        changed = changed_manifest_files(manifest, script_dir)
+        logger.info(f"Delta update: {len(changed)} of {len(manifest['files'])} files differ")
+
+        remote = RemoteZip(asset['browser_download_url'], logger)
+        members = remote.read_central_directory()
+        missing = [entry['path'] for entry in changed if entry['path'] not in members]
+        if missing:
+            raise DeltaUnavailable(f"Manifest files missing from the zip: {', '.join(missing[:5])}")
+        names = [entry['path'] for entry in changed]
+        cost = remote.span_bytes(names)
+        if cost > DELTA_MAX_FRACTION * remote.size:
+            logger.info(f"Delta would fetch {format_size(cost)} of {format_size(remote.size)}; using the full download")
+            return None
+
+        console.print(f"[bold blue]Delta update: fetching {len(changed)} changed files "
+                      f"({format_size(cost)} of {format_size(remote.size)})...[/bold blue]")
+        if os.path.exists(delta_dir):
+            shutil.rmtree(delta_dir)
+        os.makedirs(delta_dir)
+        expected = {entry['path']: entry for entry in changed}
+        for name, content in remote.fetch(names):
+            if hashlib.sha256(content).hexdigest() != expected[name]['sha256']:
+                raise DeltaUnavailable(f"SHA-256 mismatch for {name}")
+            target = os.path.join(delta_dir, *name.split('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(content)
+    except (DeltaUnavailable, requests.RequestException, RetryableStatus, DeadlineExceeded,
+            ValueError, OSError) as e:
+        logger.warning(f"Delta update unavailable ({e}); using the full download")
+        console.print(f"[yellow][WARN][/yellow] Delta update unavailable: {e}")
+        shutil.rmtree(delta_dir, ignore_errors=True)
+        return None
+
+    logger.info(f"Delta update staged: {remote.bytes_fetched} bytes in {remote.requests} requests")
+    console.print(f"[green][OK][/green] Delta downloaded: {format_size(remote.bytes_fetched)} "
+                  f"in {remote.requests} requests")
+    return delta_dir
+
+
 def format_size(size_bytes):
     """Format size in bytes to human readable format."""
     if size_bytes == 0:
@@ -536,6 +1704,51 @@ def extract_and_install_update(zip_path, script_dir, app_name, logger):
         console.print(f"[red][FAIL][/red] Failed to update {total_count - success_count} out of {total_count} items")
         return False
 
+def install_delta_update(delta_dir, script_dir, backup_dir, logger):
+    """Copies staged delta files over the install.
+
+    create_backup only covers the usual top-level items, so any other
+    top-level file or folder touched here is added to the backup first;
+    restore_backup then puts it back whole.
+    """
+    console.print("[bold yellow]Installing changed files...[/bold yellow]")
+    update_table = Table(show_header=True, header_style="bold magenta")
+    update_table.add_column("File", style="cyan")
+    update_table.add_column("Status", style="green")
+
+    success_count = 0
+    total_count = 0
+    for root, _, files in os.walk(delta_dir):
+        for file_name in files:
+            total_count += 1
+            src_path = os.path.join(root, file_name)
+            relative = os.path.relpath(src_path, delta_dir)
+            dest_path = os.path.join(script_dir, relative)
+            top_level = relative.split(os.sep)[0]
+            try:
+                backup_path = os.path.join(backup_dir, top_level)
+                original = os.path.join(script_dir, top_level)
+                if not os.path.exists(backup_path) and os.path.exists(original):
+                    if os.path.isdir(original):
+                        shutil.copytree(original, backup_path)
+                    else:
+                        shutil.copy2(original, backup_path)
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                shutil.copy2(src_path, dest_path)
+                logger.info(f"Updated: {relative}")
+                update_table.add_row(relative, "[OK] Updated")
+                success_count += 1
+            except Exception as e:
+                logger.error(f"Failed to update {relative}: {e}")
+                update_table.add_row(relative, f"[FAIL] Failed: {str(e)}")
+
+    console.print(update_table)
+    if success_count == total_count:
+        console.print(f"[green][OK][/green] Successfully updated {success_count} files")
+        return True
+    console.print(f"[red][FAIL][/red] Failed to update {total_count - success_count} out of {total_count} files")
+    return False
+
 def restore_backup(backup_dir, script_dir, app_name):
     """Restores files from a backup."""
     console.print(Panel(f"[bold blue]Restoring from backup: {os.path.basename(backup_dir)}...[/bold blue]", border_style="blue"))
@@ -619,6 +1832,8 @@ def main():
         return
 
     # Check if application is running and close it if needed (only when update is needed)
+    # Ask it to close cleanly first so logs are flushed and the server is stopped
+    request_app_shutdown(script_dir, logger)
     try:
         subprocess.check_output(
             f'tasklist /FI "IMAGENAME eq {APP_NAME}" /FO CSV | find "{APP_NAME}"',
@@ -654,24 +1869,35 @@ def main():
             sys.exit(1)
         return
 
-    # Download asset
-    try:
-        zip_path = download_release_with_retry(
-            asset_to_download["browser_download_url"],
-            asset_to_download["name"],
-            logger
-        )
-        if not zip_path:
-            console.print(Panel("[bold red]Failed to download the update.[/bold red]", border_style="red"))
+    # Fetch only the files that changed when the release publishes a manifest
+    zip_path = None
+    delta_dir = prepare_delta_update(release_info, asset_to_download, script_dir, logger)
+
+    if not delta_dir:
+        # Published checksum, so a corrupt download is rejected before the backup runs
+        expected_sha256 = expected_asset_digest(release_info, asset_to_download, logger)
+        if not expected_sha256:
+            logger.warning("Release publishes no SHA-256 for the asset; download will not be verified")
+
+        # Download asset
+        try:
+            zip_path = download_release_with_retry(
+                asset_to_download["browser_download_url"],
+                asset_to_download["name"],
+                logger,
+                expected_sha256=expected_sha256
+            )
+            if not zip_path:
+                console.print(Panel("[bold red]Failed to download the update.[/bold red]", border_style="red"))
+                if auto_mode:
+                    sys.exit(1)
+                return
+        except Exception as e:
+            logger.error(f"Download error: {e}")
+            console.print(Panel(f"[bold red]Download error: {e}[/bold red]", border_style="red"))
             if auto_mode:
                 sys.exit(1)
             return
-    except Exception as e:
-        logger.error(f"Download error: {e}")
-        console.print(Panel(f"[bold red]Download error: {e}[/bold red]", border_style="red"))
-        if auto_mode:
-            sys.exit(1)
-        return
 
     # Auto mode confirmation
     user_input = None
@@ -714,7 +1940,11 @@ def main():
     
     # Install update
     try:
-        if extract_and_install_update(zip_path, script_dir, APP_NAME, logger):
+        if delta_dir:
+            installed = install_delta_update(delta_dir, script_dir, backup_dir, logger)
+        else:
+            installed = extract_and_install_update(zip_path, script_dir, APP_NAME, logger)
+        if installed:
             with open(os.path.join(script_dir, VERSION_FILE), 'w') as f:
                 f.write(latest_version)
             logger.info(f"Updated version to: {latest_version}")
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+
+# A '/' after one of these (or at the start of a line) starts a regex literal, not a division
+_REGEX_PREFIX = re.compile(r'(?:^|[(,=:\[!&|?{};+\-*%<>~^]|\b(?:return|typeof|case|do|else|in|of|void|'
+                           r'yield|await|delete|throw|new))\s*$')
+
+
+def _skip_regex(line, i):
+    """Index just past the regex literal starting at line[i]"""
+    in_class = False
+    i += 1
+    while i < len(line):
+        c = line[i]
+        if c == '\\':
+            i += 2
+            continue
+        if in_class:
+            in_class = c != ']'
+        elif c == '[':
+            in_class = True
+        elif c == '/':
+            return i + 1
+        i += 1
+    return i
+
+
+def _scan_line(line, stack):
+    """Carry the literal/comment state in `stack` across one line of source.
+
+    Entries are a quote character for an open string or template literal,
+    '/*' for an open block comment, '${' for a template substitution and
+    '{' for a plain block, so a '}' can tell which one it closes.
+    """
+    i = 0
+    while i < len(line):
+        top = stack[-1] if stack else None
+        c = line[i]
+        if top == '/*':
+            end = line.find('*/', i)
+            if end < 0:
+                return
+            stack.pop()
+            i = end + 2
+        elif top in ("'", '"', '`'):
+            if c == '\\':
+                i += 2
+                continue
+            if c == top:
+                stack.pop()
+            elif top == '`' and line.startswith('${', i):
+                stack.append('${')
+                i += 1
+            i += 1
+        elif c in "'\"`":
+            stack.append(c)
+            i += 1
+        elif line.startswith('//', i):
+            return
+        elif line.startswith('/*', i):
+            stack.append('/*')
+            i += 2
+        elif c == '/' and _REGEX_PREFIX.search(line, 0, i):
+            i = _skip_regex(line, i)
+        else:
+            if c == '{':
+                stack.append('{')
+            elif c == '}' and stack and stack[-1] in ('{', '${'):
+                stack.pop()
+            i += 1
+
+    # Quotes cannot span lines without a trailing backslash; an unterminated one
+    # means a '/' was misread, so drop it rather than let it swallow later lines
+    if stack and stack[-1] in ("'", '"') and not line.endswith('\\'):
+        stack.pop()
+
+
+def minify_js(source):
+    """Cheap, parser-free size reduction: drop indentation, blank lines and
+    whole-line // comments.
+
+    A light scanner tracks strings, template literals, regexes and block
+    comments across lines; lines that start inside a literal or comment are
+    kept verbatim, so multi-line template literals keep their whitespace and
+    any `//` inside them.
+    """
+    lines = []
+    stack = []
+    for line in source.splitlines():
+        if stack and stack[-1] in ("'", '"', '`', '/*'):
+            lines.append(line)
+        else:
+            stripped = line.strip()
+            if stripped and not stripped.startswith('//'):
+                lines.append(stripped)
+        _scan_line(line, stack)
+    return '\n'.join(lines)
+
+
+class InjectionBundle:
+    """The single payload evaluated in the page on every `loaded` event.
+
+    Concatenates the config prelude, the main injection script and any extra
+    snippets (hotkeys) into one string so injection costs one evaluate_js
+    round-trip. The script is wrapped in its own function scope so evaluating
+    it twice in the same document does not trip over its top-level `const`s.
+
+    The built payload is cached in memory. The script file is only re-read
+    when its mtime or size changes, and the payload is only rebuilt when the
+    script's hash, the config or the snippets change.
+    """
+
+    def __init__(self, script_path, snippets=(), minify=False):
+        self.script_path = script_path
+        self.snippets = list(snippets)
+        self.minify = minify
+        self._lock = threading.Lock()
+        self._source = None
+        self._source_stat = None
+        self._source_hash = None
+        self._key = None
+        self._payload = None
+        self.builds = 0
+        self.last_build_ms = None
+        self.last_injection_ms = None
+
+    def _read_source(self):
+        st = os.stat(self.script_path)
+        stat_key = (st.st_mtime_ns, st.st_size)
+        if stat_key != self._source_stat:
+            with open(self.script_path, 'r', encoding='utf-8') as f:
+                self._source = f.read()
+            self._source_stat = stat_key
+            self._source_hash = hashlib.sha256(self._source.encode('utf-8')).hexdigest()
+        return self._source
+
+    def build(self, config=None):
+        """Return the payload for `config` ({global name: JSON value}), rebuilding if stale"""
+        with self._lock:
+            source = self._read_source()
+            config_json = json.dumps(config or {}, sort_keys=True)
+            key = (self._source_hash, self._source_stat, config_json, tuple(self.snippets), self.minify)
+            if key == self._key:
+                return self._payload
+
+            start = time.perf_counter()
+            prelude = ''.join(f"window.{name} = {json.dumps(value)};\n"
+                              for name, value in sorted((config or {}).items()))
+            parts = [prelude, "(function () {\n", source, "\n})();\n"]
+            for snippet in self.snippets:
+                parts.extend(["(function () {\n", snippet, "\n})();\n"])
+            payload = ''.join(parts)
+            if self.minify:
+                payload = minify_js(payload)
+
+            self._key = key
+            self._payload = payload
+            self.builds += 1
+            self.last_build_ms = (time.perf_counter() - start) * 1000
+            return payload
+
+    def inject(self, window, config=None):
+        """Evaluate the bundle in `window`; returns the time spent in evaluate_js (ms)"""
+        payload = self.build(config)
+        start = time.perf_counter()
+        window.evaluate_js(payload)
+        self.last_injection_ms = (time.perf_counter() - start) * 1000
+        return self.last_injection_ms
+
+    def stats(self):
+        with self._lock:
+            return {
+                "source_sha256": self._source_hash,
+                "payload_bytes": len(self._payload.encode('utf-8')) if self._payload else 0,
+                "minified": self.minify,
+                "builds": self.builds,
+                "last_build_ms": self.last_build_ms,
+                "last_injection_ms": self.last_injection_ms
+            }
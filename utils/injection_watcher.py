@@ -0,0 +1,137 @@
+import logging
+import os
+import threading
+import time
+
+try:
+    # Native change notifications (inotify, ReadDirectoryChangesW, FSEvents)
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+
+class _EventForwarder(FileSystemEventHandler):
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+            dest = getattr(event, 'dest_path', None)
+            if dest:
+                self.watcher.notify(dest)
+
+
+class InjectionWatcher:
+    """Watches a directory and calls `on_change(paths, detected_at)` after edits settle.
+
+    Uses watchdog's native backend when it is installed and falls back to
+    polling mtimes every `poll_interval` seconds otherwise. Bursts of events
+    (editors often write a file several times per save) are coalesced: the
+    callback runs once no further change has been seen for `debounce`
+    seconds. `detected_at` is the time.perf_counter() of the first change in
+    the burst, so callers can report end-to-end reload latency.
+    """
+
+    def __init__(self, directory, on_change, extensions=(".js", ".css"), ignore_dirs=("vendor",),
+                 poll_interval=0.25, debounce=0.05, log=None):
+        self.directory = os.path.abspath(directory)
+        self.on_change = on_change
+        self.extensions = tuple(extensions)
+        self.ignore_dirs = set(ignore_dirs)
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.log = log
+        self.backend = None
+        self._observer = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._changed = threading.Event()
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._first_change = None
+
+    def _relevant(self, path):
+        rel = os.path.relpath(os.path.abspath(path), self.directory)
+        parts = rel.split(os.sep)
+        if parts[0] == os.pardir or self.ignore_dirs.intersection(parts[:-1]):
+            return False
+        return path.endswith(self.extensions)
+
+    def notify(self, path):
+        if not self._relevant(path):
+            return
+        with self._lock:
+            if not self._pending:
+                self._first_change = time.perf_counter()
+            self._pending.add(os.path.abspath(path))
+        self._changed.set()
+
+    def _snapshot(self):
+        state = {}
+        for dirpath, dirnames, filenames in os.walk(self.directory):
+            dirnames[:] = [d for d in dirnames if d not in self.ignore_dirs]
+            for filename in filenames:
+                if not filename.endswith(self.extensions):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                state[path] = (st.st_mtime_ns, st.st_size)
+        return state
+
+    def _poll(self):
+        previous = self._snapshot()
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot()
+            for path in set(previous) | set(current):
+                if previous.get(path) != current.get(path):
+                    self.notify(path)
+            previous = current
+
+    def _dispatch(self):
+        while not self._stop.is_set():
+            if not self._changed.wait(0.5):
+                continue
+            # Wait for the burst to go quiet before reloading
+            while self._changed.is_set() and not self._stop.is_set():
+                self._changed.clear()
+                time.sleep(self.debounce)
+            with self._lock:
+                paths, self._pending = sorted(self._pending), set()
+                detected_at = self._first_change
+            if not paths or self._stop.is_set():
+                continue
+            try:
+                self.on_change(paths, detected_at)
+            except Exception as e:
+                if self.log:
+                    self.log(f"Hot reload failed: {e}", logging.ERROR)
+
+    def start(self):
+        """Start watching; returns the backend in use ("watchdog" or "polling")"""
+        if self._thread is not None:
+            return self.backend
+        if Observer is not None:
+            self._observer = Observer()
+            self._observer.schedule(_EventForwarder(self), self.directory, recursive=True)
+            self._observer.daemon = True
+            self._observer.start()
+            self.backend = "watchdog"
+        else:
+            threading.Thread(target=self._poll, name="injection-poll", daemon=True).start()
+            self.backend = "polling"
+        self._thread = threading.Thread(target=self._dispatch, name="injection-watcher", daemon=True)
+        self._thread.start()
+        return self.backend
+
+    def stop(self):
+        self._stop.set()
+        self._changed.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
@@ -0,0 +1,168 @@
+import collections
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised by Job.check_cancelled() to unwind a cancelled job"""
+
+
+class Job:
+    """One unit of background work and its observable state"""
+
+    def __init__(self, manager, job_id, kind):
+        self._manager = manager
+        self._cancel = threading.Event()
+        self.id = job_id
+        self.kind = kind
+        self.state = PENDING
+        self.progress = None
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.future = None
+        self._last_push = 0.0
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def report(self, progress=None, message=None):
+        """Update progress (0.0-1.0, or None if unknown) and/or the status message"""
+        if progress is not None:
+            self.progress = max(0.0, min(1.0, float(progress)))
+        if message is not None:
+            self.message = message
+        self._manager._notify(self)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "progress": self.progress,
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished
+        }
+
+
+class JobManager:
+    """Runs long bridge operations on a thread pool instead of the bridge thread.
+
+    `start(kind, fn, *args)` returns a job id immediately; `fn(job, *args)`
+    runs on a worker and reports through `job.report()`. Every state change,
+    and progress at most every `push_interval` seconds, is handed to
+    `notify(job_dict)` (main.py forwards it to the page). Cancellation is
+    cooperative: queued jobs never start, running ones see `job.cancelled`.
+    """
+
+    def __init__(self, max_workers=4, notify=None, keep_finished=50, push_interval=0.1, log=None):
+        self.notify = notify
+        self.push_interval = push_interval
+        self.log = log
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = collections.OrderedDict()
+        self._keep_finished = keep_finished
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def _notify(self, job, force=False):
+        if self.notify is None:
+            return
+        now = time.monotonic()
+        if not force and now - job._last_push < self.push_interval:
+            return
+        job._last_push = now
+        try:
+            self.notify(job.to_dict())
+        except Exception as e:
+            if self.log:
+                self.log(f"Job update push failed: {e}", logging.DEBUG)
+
+    def _prune(self):
+        # Caller holds self._lock. Forget the oldest finished jobs beyond the limit.
+        finished = [job_id for job_id, job in self._jobs.items() if job.state in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - self._keep_finished)]:
+            del self._jobs[job_id]
+
+    def start(self, kind, fn, *args, **kwargs):
+        with self._lock:
+            job = Job(self, f"{kind}-{next(self._ids)}", kind)
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancelled:
+            # Cancelled after a worker picked it up but before it started
+            job.state = CANCELLED
+            job.finished = time.time()
+            self._notify(job, force=True)
+            return
+        job.state = RUNNING
+        job.started = time.time()
+        self._notify(job, force=True)
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.state = CANCELLED if job.cancelled else SUCCEEDED
+        except JobCancelled:
+            job.state = CANCELLED
+        except Exception as e:
+            job.state = FAILED
+            job.error = str(e)
+            if self.log:
+                self.log(f"Job {job.id} failed: {e}", logging.ERROR)
+        job.finished = time.time()
+        if job.state == SUCCEEDED:
+            job.progress = 1.0
+        self._notify(job, force=True)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def list(self):
+        with self._lock:
+            return [job.to_dict() for job in self._jobs.values()]
+
+    def cancel(self, job_id):
+        """Request cancellation; returns False for unknown or already finished jobs"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.state in FINISHED_STATES:
+            return False
+        job._cancel.set()
+        if job.future is not None and job.future.cancel():
+            # Still queued: it will never run
+            job.state = CANCELLED
+            job.finished = time.time()
+            self._notify(job, force=True)
+        return True
+
+    def shutdown(self):
+        for job_id in list(self._jobs):
+            self.cancel(job_id)
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,410 @@
+import concurrent.futures
+import http.server
+import io
+import hmac
+import logging
+import os
+import secrets
+import socket
+import socketserver
+import threading
+import time
+import urllib.parse
+
+from utils.asset_cache import AssetCache, is_compressible
+from utils.asset_manifest import AssetManifest
+from utils.asset_proxy import rewrite_css_urls
+
+# Paths (relative to the server directory) the local server may serve.
+# Everything else, including the ./data webview profile, backups and logs,
+# is answered with 404 without touching the disk.
+DEFAULT_SERVED_PATHS = ("injection", "greetings.txt")
+
+# Cache-Control max-age (seconds) per URL prefix; the longest matching prefix
+# wins. 0 means clients must revalidate, which is a cheap 304 from memory.
+DEFAULT_CACHE_MAX_AGE = {
+    "/": 0,
+    # Vendored files are requested with a ?v=<integrity> query, so they never change in place
+    "/injection/vendor/": 365 * 24 * 3600,
+}
+
+
+class AssetRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves the injection assets to the page running inside the webview"""
+
+    # Set by make_handler()
+    log_callback = None
+    asset_cache = None
+    manifest = None
+    session_token = None
+    asset_proxy = None
+    cache_max_age = DEFAULT_CACHE_MAX_AGE
+    default_cache_control = 'no-store, no-cache, must-revalidate'
+    extensions_map = {
+        **http.server.SimpleHTTPRequestHandler.extensions_map,
+        '.woff2': 'font/woff2',
+        '.woff': 'font/woff',
+    }
+    # Headers and body go out in separate writes; without TCP_NODELAY a
+    # keep-alive client waits on delayed ACKs for every response
+    disable_nagle_algorithm = True
+
+    @classmethod
+    def content_type_for(cls, path):
+        """The Content-Type guess_type() gives `path`, without a request instance"""
+        # guess_type only reads extensions_map, which lives on the class
+        return http.server.SimpleHTTPRequestHandler.guess_type(cls, path)
+
+    def end_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET')
+        self.send_header('Cache-Control', getattr(self, 'cache_control', self.default_cache_control))
+        return super().end_headers()
+
+    def cache_control_for(self, url_path):
+        """Cache-Control value for a cacheable asset, from the route's max-age"""
+        max_age = 0
+        matched = ""
+        for prefix, age in self.cache_max_age.items():
+            if url_path.startswith(prefix) and len(prefix) >= len(matched):
+                matched, max_age = prefix, age
+        if max_age > 0:
+            return f'public, max-age={max_age}'
+        return 'no-cache'
+
+    def send_head(self):
+        if self.manifest is not None:
+            entry = self.manifest.lookup(self.path)
+            if entry is None:
+                self.send_error(404, "File not found")
+                return None
+            path = entry.fs_path
+        else:
+            path = self.translate_path(self.path)
+            if os.path.isdir(path) or path.endswith("/"):
+                return super().send_head()
+
+        if self.asset_cache is None:
+            return super().send_head()
+
+        asset = self.asset_cache.get(path, self.guess_type)
+        if asset is None:
+            if self.manifest is not None and not os.path.exists(path):
+                # Listed at startup but removed since
+                self.send_error(404, "File not found")
+                return None
+            return super().send_head()
+
+        self.cache_control = self.cache_control_for(self.path.split('?', 1)[0])
+        body, encoding, etag = asset.representation(self.headers.get('Accept-Encoding'))
+        if asset.matches(self.headers.get('If-None-Match'), self.headers.get('If-Modified-Since')):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', asset.last_modified)
+            if asset.compressible:
+                self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return None
+
+        self.send_response(200)
+        self.send_header('Content-type', asset.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if asset.compressible:
+            self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', asset.last_modified)
+        self.end_headers()
+        return io.BytesIO(body)
+
+    def do_HEAD(self):
+        self.cache_control = self.default_cache_control
+        super().do_HEAD()
+
+    def has_valid_token(self):
+        """Check the per-session token sent as ?token= or an X-DeepSeek-Token header"""
+        if self.session_token is None:
+            return True
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        supplied = self.headers.get('X-DeepSeek-Token') or query.get('token', [''])[0]
+        return hmac.compare_digest(supplied, self.session_token)
+
+    def proxy_url_for(self, url):
+        """Local URL that fetches `url` through the caching proxy"""
+        query = urllib.parse.urlencode({"url": url, "token": self.session_token or ""})
+        return f"/proxy?{query}"
+
+    def send_proxied(self, query):
+        if self.asset_proxy is None:
+            self.send_error(404, "File not found")
+            return
+        if not self.has_valid_token():
+            self.send_error(403, "Invalid session token")
+            return
+        url = urllib.parse.parse_qs(query).get('url', [''])[0]
+        try:
+            status, headers, body, cache_status = self.asset_proxy.fetch(url, self.headers.get('User-Agent'))
+        except ValueError:
+            self.send_error(403, "Host not allowed")
+            return
+        except Exception as e:
+            self.send_error(502, f"Upstream fetch failed: {e}")
+            return
+
+        content_type = headers.get('content-type', 'application/octet-stream')
+        if status == 200 and content_type.startswith('text/css'):
+            # Fonts referenced by the stylesheet should come through the cache too
+            css = body.decode('utf-8', errors='replace')
+            body = rewrite_css_urls(css, self.proxy_url_for, self.asset_proxy.is_allowed).encode('utf-8')
+
+        self.cache_control = headers.get('cache-control', 'no-cache') if status == 200 else 'no-store'
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Cache', cache_status)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.cache_control = self.default_cache_control
+        parts = urllib.parse.urlsplit(self.path)
+        if parts.path == '/proxy':
+            self.send_proxied(parts.query)
+            return
+        if parts.path == '/port':
+            # Kept for older scripts; the port is normally handed over at injection time
+            if not self.has_valid_token():
+                self.send_error(403, "Invalid session token")
+                return
+            body = str(self.server.server_address[1]).encode()
+            self.send_response(200)
+            self.send_header('Content-type', 'text/plain')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            super().do_GET()
+
+    def log_message(self, format, *args):
+        # Never write to stderr directly: windowed builds have no console
+        if self.log_callback:
+            self.log_callback(f"Local server: {self.address_string()} {format % args}", logging.DEBUG)
+
+
+def make_handler(directory, protocol_version="HTTP/1.1", timeout=10, log=None,
+                 asset_cache=None, cache_max_age=None, manifest=None, session_token=None,
+                 asset_proxy=None):
+    """Build a handler class bound to a directory and connection settings"""
+    class FileHandler(AssetRequestHandler):
+        log_callback = staticmethod(log) if log else None
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=directory, **kwargs)
+
+    FileHandler.protocol_version = protocol_version
+    FileHandler.asset_cache = asset_cache
+    FileHandler.manifest = manifest
+    FileHandler.session_token = session_token
+    FileHandler.asset_proxy = asset_proxy
+    if cache_max_age is not None:
+        FileHandler.cache_max_age = cache_max_age
+    # Applied to each accepted socket; bounds how long a slow or idle
+    # keep-alive connection can hold on to a worker
+    FileHandler.timeout = timeout
+    return FileHandler
+
+
+class SimpleAssetHTTPServer(http.server.HTTPServer):
+    """One request at a time on the serving thread (the original behaviour)"""
+
+    allow_reuse_address = False
+    log_callback = None
+
+    def server_bind(self):
+        # HTTPServer.server_bind() resolves the FQDN of the host, which can
+        # stall startup for seconds on some networks; it is never used here
+        socketserver.TCPServer.server_bind(self)
+        host, port = self.server_address[:2]
+        self.server_name = host or "localhost"
+        self.server_port = port
+
+    def handle_error(self, request, client_address):
+        if self.log_callback:
+            self.log_callback(f"Local server: error handling request from {client_address[0]}", logging.WARNING)
+
+
+class PooledAssetHTTPServer(SimpleAssetHTTPServer):
+    """HTTP server that hands each connection to a bounded worker pool.
+
+    Connections beyond `max_workers + max_pending` are refused straight away
+    instead of queueing without limit.
+    """
+
+    def __init__(self, server_address, handler_class, max_workers=8, max_pending=32):
+        super().__init__(server_address, handler_class)
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="LocalServerWorker")
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._active = set()
+        self._active_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            self.shutdown_request(request)
+            return
+        try:
+            self._pool.submit(self._process_request_worker, request, client_address)
+        except RuntimeError:
+            # Pool already shut down
+            self._slots.release()
+            self.shutdown_request(request)
+
+    def _process_request_worker(self, request, client_address):
+        with self._active_lock:
+            self._active.add(request)
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self._active_lock:
+                self._active.discard(request)
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        # Wake up workers blocked on idle keep-alive connections so they exit now
+        with self._active_lock:
+            active = list(self._active)
+        for request in active:
+            try:
+                request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class LocalAssetServer:
+    """Owns the local HTTP server used by the injected script.
+
+    `mode` is "threaded" (bounded worker pool, HTTP/1.1 keep-alive) or
+    "simple" (single-threaded HTTP/1.0, kept for comparison and as a fallback).
+    """
+
+    MODES = ("threaded", "simple")
+
+    def __init__(self, directory=".", host="127.0.0.1", port=0, mode="threaded",
+                 max_workers=8, max_pending=32, request_timeout=10, log=None,
+                 cache=True, cache_max_age=None, precompress=False,
+                 served_paths=DEFAULT_SERVED_PATHS, asset_proxy=None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown server mode: {mode}")
+        self.directory = directory
+        self.host = host
+        self.port = port
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.request_timeout = request_timeout
+        self.log = log
+        # Shared by all handler threads; None serves straight from disk
+        self.asset_cache = AssetCache(precompress=precompress) if cache else None
+        self.cache_max_age = cache_max_age
+        # None serves the whole directory (no manifest)
+        self.served_paths = served_paths
+        self.manifest = None
+        # Optional CachingAssetProxy exposed at /proxy?url=...
+        self.asset_proxy = asset_proxy
+        # Handed to the page with the port; required by the non-asset endpoints
+        self.token = secrets.token_urlsafe(24)
+        self.bind_time = None
+        self.httpd = None
+        self._thread = None
+        self._handler = None
+
+    def _create_server(self):
+        if self.served_paths is not None:
+            self.manifest = AssetManifest.build(self.directory, self.served_paths)
+            if self.log:
+                self.log(f"Local server manifest: {len(self.manifest)} assets", logging.DEBUG)
+        protocol = "HTTP/1.1" if self.mode == "threaded" else "HTTP/1.0"
+        handler = make_handler(self.directory, protocol, self.request_timeout, self.log,
+                               asset_cache=self.asset_cache, cache_max_age=self.cache_max_age,
+                               manifest=self.manifest, session_token=self.token,
+                               asset_proxy=self.asset_proxy)
+        self._handler = handler
+        if self.mode == "threaded":
+            httpd = PooledAssetHTTPServer((self.host, self.port), handler,
+                                          max_workers=self.max_workers, max_pending=self.max_pending)
+        else:
+            httpd = SimpleAssetHTTPServer((self.host, self.port), handler)
+        httpd.log_callback = self.log
+        return httpd
+
+    def start(self):
+        """Bind and start serving on a daemon thread. Returns the bound port.
+
+        With port=0 the OS picks a free port during the single bind, so there
+        is no probe-then-rebind race.
+        """
+        started = time.perf_counter()
+        self.httpd = self._create_server()
+        self.port = self.httpd.server_address[1]
+        self.bind_time = time.perf_counter() - started
+        self._thread = threading.Thread(target=self.httpd.serve_forever,
+                                        name="LocalAssetServer", daemon=True)
+        self._thread.start()
+        if self.log:
+            self.log(f"Local server running on port {self.port} ({self.mode} mode, "
+                     f"ready in {self.bind_time * 1000:.1f} ms)", logging.INFO)
+        return self.port
+
+    def warm_cache(self):
+        """Load the manifest's text assets (and, with precompress, encode them) in the background.
+
+        Runs after start() on a daemon thread, so the first requests find the
+        bodies and their gzip/br variants already built without delaying the bind.
+        """
+        if self.asset_cache is None or self.manifest is None or self._handler is None:
+            return None
+        content_type = self._handler.content_type_for
+        paths = [entry.fs_path for entry in self.manifest if is_compressible(content_type(entry.fs_path))]
+
+        def warm():
+            started = time.perf_counter()
+            self.asset_cache.warm(paths, content_type)
+            if self.log:
+                self.log(f"Local server cache warmed: {len(paths)} assets in "
+                         f"{(time.perf_counter() - started) * 1000:.0f} ms", logging.DEBUG)
+
+        thread = threading.Thread(target=warm, name="AssetCacheWarm", daemon=True)
+        thread.start()
+        return thread
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def client_config(self):
+        """What the injected script needs to reach this server"""
+        return {
+            "port": self.port,
+            "token": self.token,
+            "baseUrl": self.base_url,
+            "proxy": self.asset_proxy is not None
+        }
+
+    def stop(self, timeout=2.0):
+        """Stop accepting requests and close the listening socket"""
+        if not self.httpd:
+            return
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout)
+        self.httpd = None
+        self._thread = None
+        if self.log:
+            self.log("Local server stopped", logging.INFO)
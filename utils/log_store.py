@@ -0,0 +1,148 @@
+import collections
+import logging
+import threading
+import time
+
+
+class LogRecord:
+    """A single log entry. Formatting is deferred until the record is read."""
+
+    __slots__ = ("seq", "created", "level", "msg")
+
+    def __init__(self, seq, created, level, msg):
+        self.seq = seq
+        self.created = created
+        self.level = level
+        self.msg = msg
+
+    @property
+    def level_name(self):
+        return logging.getLevelName(self.level)
+
+    def format(self):
+        """Render the record the same way the log viewer has always shown it"""
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.created))
+        return f"[{timestamp}] {self.msg}"
+
+    def __str__(self):
+        return self.format()
+
+    def to_dict(self):
+        """Compact representation for sending over the pywebview bridge"""
+        return {
+            "seq": self.seq,
+            "time": self.created,
+            "level": self.level_name,
+            "message": self.msg
+        }
+
+    def __repr__(self):
+        return f"LogRecord(seq={self.seq}, level={self.level_name}, msg={self.msg!r})"
+
+
+def parse_level(level):
+    """Accept a logging level as an int or a name like 'warning'"""
+    if level is None:
+        return logging.NOTSET
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Unknown log level: {level}")
+    return value
+
+
+class LogStore:
+    """Fixed-capacity, thread-safe ring buffer of log records.
+
+    Appending is O(1); once the buffer is full the oldest record is dropped.
+    Every record gets a monotonically increasing sequence number that is never
+    reused, even after clear(), so readers can keep a cursor into the stream.
+    """
+
+    def __init__(self, capacity=1000):
+        if capacity <= 0:
+            raise ValueError("capacity must be a positive integer")
+        self._records = collections.deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._last_seq = 0
+        # Records up to here were removed by clear(), not lost to eviction
+        self._cleared_seq = 0
+
+    @property
+    def capacity(self):
+        return self._records.maxlen
+
+    @property
+    def last_seq(self):
+        """Sequence number of the most recently appended record (0 if none)"""
+        return self._last_seq
+
+    def append(self, msg, level=logging.INFO):
+        """Store a message and return the new record"""
+        created = time.time()
+        with self._lock:
+            self._last_seq += 1
+            record = LogRecord(self._last_seq, created, level, msg)
+            self._records.append(record)
+        return record
+
+    def records(self):
+        """Snapshot of the stored records, oldest first"""
+        with self._lock:
+            return list(self._records)
+
+    def since(self, cursor=0, limit=None, min_level=logging.NOTSET):
+        """Return records newer than `cursor`, oldest first.
+
+        Returns a tuple of (records, next_cursor, dropped). `next_cursor` is
+        the value to pass on the next call; `dropped` is True when records
+        after `cursor` were already evicted from the buffer before being read.
+        A cursor ahead of the stream (e.g. kept by a page across an app
+        restart) is treated as a reset: reading starts again from the oldest
+        record and `dropped` is True. `limit` is clamped to at least 1.
+        Only the new tail of the buffer is walked, so polling is cheap.
+        """
+        min_level = parse_level(min_level)
+        cursor = int(cursor or 0)
+        if limit is not None:
+            limit = max(1, int(limit))
+        with self._lock:
+            last_seq = self._last_seq
+            cleared_seq = self._cleared_seq
+            reset = cursor > last_seq
+            if reset:
+                cursor = 0
+            first_seq = self._records[0].seq if self._records else last_seq + 1
+            new_records = []
+            for record in reversed(self._records):
+                if record.seq <= cursor:
+                    break
+                new_records.append(record)
+        new_records.reverse()
+
+        floor = max(cursor, cleared_seq)
+        dropped = reset or (floor + 1 < first_seq and floor < last_seq)
+        next_cursor = max(cursor, last_seq)
+        result = []
+        for record in new_records:
+            if record.level < min_level:
+                continue
+            if limit is not None and len(result) >= limit:
+                # Resume right after the last record we actually returned
+                next_cursor = result[-1].seq
+                break
+            result.append(record)
+        return result, next_cursor, dropped
+
+    def formatted(self):
+        """Snapshot of the stored records rendered as strings"""
+        return [record.format() for record in self.records()]
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._cleared_seq = self._last_seq
+
+    def __len__(self):
+        return len(self._records)
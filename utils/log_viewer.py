@@ -0,0 +1,173 @@
+import collections
+import datetime
+import threading
+
+
+class LogViewer:
+    """CustomTkinter log window that follows a LogStore like `tail -f`.
+
+    The window runs its own Tk mainloop on a dedicated daemon thread so the
+    pywebview bridge call that opens it returns immediately. Each poll only
+    asks the store for records newer than the last one shown and appends them,
+    instead of redrawing the whole text box.
+    """
+
+    def __init__(self, store, max_lines=2000, poll_interval_ms=500):
+        self.store = store
+        self.max_lines = max_lines
+        self.poll_interval_ms = poll_interval_ms
+        self._thread = None
+        self._lock = threading.Lock()
+        self._focus_requested = threading.Event()
+
+    def is_open(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def open(self):
+        """Open the window, or bring it to the front if it is already open.
+
+        Returns True when a new window was started.
+        """
+        with self._lock:
+            if self.is_open():
+                self._focus_requested.set()
+                return False
+            self._thread = threading.Thread(target=self._run, name="LogViewer", daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self):
+        import customtkinter as ctk
+
+        cursor = 0
+        # Widget line count of each shown entry, oldest first; a record's message may span lines
+        entry_lines = collections.deque()
+        shown_lines = 0
+
+        def set_status(text, color="white"):
+            status_label.configure(text=text, text_color=color)
+
+        def copy_all_logs():
+            try:
+                import pyperclip
+                pyperclip.copy('\n'.join(self.store.formatted()))
+                set_status("Copied all logs to clipboard!", "green")
+            except ImportError:
+                set_status("Please install pyperclip: pip install pyperclip", "orange")
+            except Exception as e:
+                set_status(f"Copy failed: {e}", "red")
+
+        def clear_logs():
+            nonlocal shown_lines
+            self.store.clear()
+            text_box.delete("1.0", "end")
+            entry_lines.clear()
+            shown_lines = 0
+            set_status("Logs cleared", "green")
+
+        def save_logs():
+            try:
+                filename = f"deepseek-logs-{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+                with open(filename, 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(self.store.formatted()))
+                set_status(f"Logs saved to {filename}", "green")
+            except Exception as e:
+                set_status(f"Save failed: {e}", "red")
+
+        def is_following():
+            # Only auto-scroll while the user is looking at the bottom
+            return text_box.yview()[1] >= 0.999
+
+        def append_new_logs():
+            nonlocal cursor, shown_lines
+            records, cursor, dropped = self.store.since(cursor)
+            if not records:
+                return
+            follow = is_following()
+
+            entries = [record.format() for record in records]
+            if dropped and entry_lines:
+                entries.insert(0, "... (older entries were dropped before they could be shown) ...")
+            prefix = "\n" if entry_lines else ""
+            text_box.insert("end", prefix + '\n'.join(entries))
+            for entry in entries:
+                count = entry.count("\n") + 1
+                entry_lines.append(count)
+                shown_lines += count
+
+            # Trim whole entries from the top so the widget never grows past max_lines
+            excess = 0
+            while shown_lines > self.max_lines and len(entry_lines) > 1:
+                count = entry_lines.popleft()
+                excess += count
+                shown_lines -= count
+            if excess:
+                text_box.delete("1.0", f"{excess + 1}.0")
+
+            if follow:
+                text_box.see("end")
+            set_status(f"Showing {len(entry_lines)} log entries"
+                       + ("" if follow else " (auto-scroll paused)"))
+
+        def poll():
+            try:
+                append_new_logs()
+                if self._focus_requested.is_set():
+                    self._focus_requested.clear()
+                    log_window.deiconify()
+                    log_window.lift()
+                    log_window.focus_force()
+                log_window.after(self.poll_interval_ms, poll)
+            except Exception:
+                pass  # Window closed
+
+        # Create the log window
+        ctk.set_appearance_mode("dark")
+        ctk.set_default_color_theme("blue")
+
+        log_window = ctk.CTk()
+        log_window.title("DeepSeek - Logs")
+        log_window.geometry("800x600")
+
+        # Main frame
+        main_frame = ctk.CTkFrame(log_window)
+        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # Title
+        title_label = ctk.CTkLabel(main_frame, text="DeepSeek Application Logs", font=("Inter", 16, "bold"))
+        title_label.pack(pady=5)
+
+        # Status label
+        status_label = ctk.CTkLabel(main_frame, text="Showing 0 log entries", font=("Inter", 12))
+        status_label.pack(pady=2)
+
+        # Button frame
+        button_frame = ctk.CTkFrame(main_frame)
+        button_frame.pack(fill="x", padx=10, pady=5)
+
+        # Buttons
+        copy_btn = ctk.CTkButton(button_frame, text="Copy All", command=copy_all_logs, width=100)
+        copy_btn.pack(side="left", padx=5)
+
+        save_btn = ctk.CTkButton(button_frame, text="Save to File", command=save_logs, width=100)
+        save_btn.pack(side="left", padx=5)
+
+        clear_btn = ctk.CTkButton(button_frame, text="Clear", command=clear_logs, width=100, fg_color="red")
+        clear_btn.pack(side="left", padx=5)
+
+        # Text box with scrollbar
+        text_frame = ctk.CTkFrame(main_frame)
+        text_frame.pack(fill="both", expand=True, padx=10, pady=5)
+
+        text_box = ctk.CTkTextbox(text_frame, wrap="word", font=("Consolas", 11))
+        text_box.pack(side="left", fill="both", expand=True)
+
+        # Scrollbar
+        scrollbar = ctk.CTkScrollbar(text_frame, command=text_box.yview)
+        scrollbar.pack(side="right", fill="y")
+        text_box.configure(yscrollcommand=scrollbar.set)
+
+        # Initial load, then follow new entries
+        poll()
+
+        log_window.mainloop()
@@ -0,0 +1,201 @@
+import gzip
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+
+
+def _console_write(text):
+    """Print text with Unicode encoding safety (stdout may be missing in windowed builds)"""
+    stream = sys.stdout
+    if stream is None:
+        return
+    try:
+        stream.write(text + "\n")
+    except UnicodeEncodeError:
+        stream.write(text.encode('ascii', errors='replace').decode('ascii') + "\n")
+    except Exception:
+        pass
+
+
+class AsyncLogWriter:
+    """Background sink that writes log records to disk and, optionally, the console.
+
+    Callers only put records on a SimpleQueue, so logging from the bridge or
+    server threads never waits on terminal or disk I/O. A single writer
+    thread drains the queue in batches, appends to a size-rotated log file
+    (older files are optionally gzip-compressed) and flushes either when a
+    batch fills up or when `flush_interval` seconds have passed.
+
+    If rotating or opening the file fails (on Windows another process
+    holding the log open makes os.replace fail), the writer keeps
+    appending to the current file, or reopens it, and tries again after
+    `retry_interval` seconds instead of giving up on disk logging.
+    """
+
+    _STOP = object()
+
+    def __init__(self, log_dir, filename="deepseek.log", max_bytes=1024 * 1024,
+                 backup_count=5, compress=True, batch_size=64, flush_interval=1.0,
+                 console_level=None, retry_interval=60.0):
+        self.log_dir = log_dir
+        self.path = os.path.join(log_dir, filename)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Records at or above this level are echoed to stdout; None disables the console
+        self.console_level = console_level
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self.retry_interval = retry_interval
+        self._file = None
+        self._size = 0
+        # Earliest monotonic time for the next rotation / reopen attempt after a failure
+        self._rotate_at = 0.0
+        self._reopen_at = 0.0
+        self._closed = False
+
+    def submit(self, record):
+        """Queue a LogRecord for writing. Never blocks; dropped after close()."""
+        if self._closed:
+            return
+        self._queue.put(record)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="AsyncLogWriter", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout=5.0):
+        """Write everything still queued, then stop the writer thread"""
+        self._closed = True
+        if self._thread is None:
+            return
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _open(self):
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._size = self._file.tell()
+
+    def _backup_name(self, index):
+        name = f"{self.path}.{index}"
+        return name + ".gz" if self.compress else name
+
+    def _reopen(self, force=False):
+        """Try to (re)open the log file unless a recent attempt failed (or `force`)"""
+        if not force and time.monotonic() < self._reopen_at:
+            return False
+        try:
+            self._open()
+            return True
+        except OSError as e:
+            _console_write(f"Could not open {self.path}, will retry: {e}")
+            self._reopen_at = time.monotonic() + self.retry_interval
+            return False
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+
+        try:
+            if self.backup_count > 0:
+                oldest = self._backup_name(self.backup_count)
+                if os.path.exists(oldest):
+                    os.remove(oldest)
+                for index in range(self.backup_count - 1, 0, -1):
+                    src = self._backup_name(index)
+                    if os.path.exists(src):
+                        os.replace(src, self._backup_name(index + 1))
+
+                if self.compress:
+                    with open(self.path, 'rb') as src, gzip.open(self._backup_name(1), 'wb') as dst:
+                        shutil.copyfileobj(src, dst)
+                    os.remove(self.path)
+                else:
+                    os.replace(self.path, self._backup_name(1))
+            else:
+                os.remove(self.path)
+        except OSError as e:
+            # Typically another process has the file open; keep appending and retry later
+            _console_write(f"Log rotation failed, will retry: {e}")
+            self._rotate_at = time.monotonic() + self.retry_interval
+
+        # The current file is still there after a failed rotation; keep appending to it
+        self._reopen(force=True)
+
+    def _write_batch(self, records):
+        lines = []
+        for record in records:
+            line = f"{record.format()} [{record.level_name}]"
+            lines.append(line)
+            if self.console_level is not None and record.level >= self.console_level:
+                _console_write(record.msg)
+
+        if self._file is None and not self._reopen():
+            return
+        data = "\n".join(lines) + "\n"
+        size = len(data.encode('utf-8'))
+        if self._size and self._size + size > self.max_bytes and time.monotonic() >= self._rotate_at:
+            self._rotate()
+            if self._file is None:
+                return
+        self._file.write(data)
+        self._size += size
+
+    def _run(self):
+        try:
+            self._open()
+        except OSError as e:
+            _console_write(f"Could not open {self.path}, will retry: {e}")
+            self._file = None
+            self._reopen_at = time.monotonic() + self.retry_interval
+
+        stopping = False
+        last_flush = time.monotonic()
+        while not stopping:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+                while True:
+                    if item is self._STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+
+            if stopping:
+                # Drain whatever was queued behind the stop marker
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not self._STOP:
+                        batch.append(item)
+
+            try:
+                if batch:
+                    self._write_batch(batch)
+                now = time.monotonic()
+                if self._file and (stopping or len(batch) >= self.batch_size
+                                   or now - last_flush >= self.flush_interval):
+                    self._file.flush()
+                    last_flush = now
+            except Exception as e:
+                _console_write(f"Log writer error: {e}")
+
+        if self._file:
+            self._file.close()
+            self._file = None
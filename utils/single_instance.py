@@ -0,0 +1,187 @@
+import hmac
+import json
+import logging
+import os
+import secrets
+import socket
+import threading
+import time
+
+# A request is one JSON line; anything longer is not ours
+MAX_MESSAGE_BYTES = 64 * 1024
+
+
+def _try_lock(f):
+    """Take a non-blocking exclusive lock on an open file; OSError if already held"""
+    if os.name == "nt":
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def _unlock(f):
+    if os.name == "nt":
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _read_line(sock):
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+        if len(data) > MAX_MESSAGE_BYTES:
+            raise ValueError("Message too large")
+    return data
+
+
+class SingleInstance:
+    """Single-instance lock plus a loopback IPC channel to the running app.
+
+    The first process to take an OS file lock on `<directory>/instance.lock`
+    is the primary. It listens on 127.0.0.1 (random port) and publishes the
+    port and a random token in `instance.json`. Later launches find the lock
+    held, send their command as one JSON line to that port and exit. The lock
+    is released by the OS if the primary dies, so a crash never leaves a
+    stale lock behind.
+
+    Requests look like {"token": ..., "command": ..., "args": {...}}; the
+    reply is {"status": ..., ...} from the primary's handler.
+    """
+
+    LOCK_NAME = "instance.lock"
+    INFO_NAME = "instance.json"
+
+    def __init__(self, directory, log=None):
+        self.directory = directory
+        self.lock_path = os.path.join(directory, self.LOCK_NAME)
+        self.info_path = os.path.join(directory, self.INFO_NAME)
+        self.log = log
+        self.token = None
+        self.port = None
+        self._lock_file = None
+        self._server = None
+        self._handler = None
+        self._thread = None
+
+    @property
+    def is_primary(self):
+        return self._lock_file is not None
+
+    def acquire(self):
+        """Try to become the primary instance; returns True on success"""
+        os.makedirs(self.directory, exist_ok=True)
+        f = open(self.lock_path, "a+b")
+        try:
+            _try_lock(f)
+        except OSError:
+            f.close()
+            return False
+        self._lock_file = f
+        return True
+
+    def serve(self, handler):
+        """Start accepting commands; `handler(command, args)` returns the reply dict"""
+        self._handler = handler
+        self.token = secrets.token_urlsafe(24)
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen(8)
+        self.port = self._server.getsockname()[1]
+
+        info = {"pid": os.getpid(), "port": self.port, "token": self.token}
+        tmp_path = self.info_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(info, f)
+        if os.name != "nt":
+            os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.info_path)
+
+        self._thread = threading.Thread(target=self._accept_loop, name="single-instance", daemon=True)
+        self._thread.start()
+        return self.port
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return  # Socket closed by release()
+            with conn:
+                conn.settimeout(2.0)
+                try:
+                    reply = self._handle(_read_line(conn))
+                except (OSError, ValueError) as e:
+                    reply = {"status": "error", "message": str(e)}
+                try:
+                    conn.sendall(json.dumps(reply).encode("utf-8") + b"\n")
+                except OSError:
+                    pass
+
+    def _handle(self, raw):
+        request = json.loads(raw.decode("utf-8"))
+        if not isinstance(request, dict) or not hmac.compare_digest(str(request.get("token", "")), self.token):
+            return {"status": "error", "message": "Invalid token"}
+        command = request.get("command")
+        try:
+            return self._handler(command, request.get("args") or {})
+        except Exception as e:
+            if self.log:
+                self.log(f"Instance command {command!r} failed: {e}", logging.ERROR)
+            return {"status": "error", "message": str(e)}
+
+    def send(self, command, args=None, timeout=2.0):
+        """Send a command to the primary instance and return its reply.
+
+        Waits up to `timeout` seconds for a primary that is still starting
+        up to publish its port. Raises OSError if it cannot be reached.
+        """
+        deadline = time.monotonic() + timeout
+        last_error = None
+        while True:
+            try:
+                with open(self.info_path, "r", encoding="utf-8") as f:
+                    info = json.load(f)
+                message = {"token": info["token"], "command": command, "args": args or {}}
+                with socket.create_connection(("127.0.0.1", info["port"]), timeout=timeout) as sock:
+                    sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+                    return json.loads(_read_line(sock).decode("utf-8"))
+            except (OSError, ValueError, KeyError) as e:
+                last_error = e
+            if time.monotonic() >= deadline:
+                raise OSError(f"Running instance not reachable: {last_error}")
+            time.sleep(0.05)
+
+    def release(self):
+        """Stop serving and give up the lock"""
+        if self._server is not None:
+            try:
+                # shutdown() is what wakes a thread blocked in accept() on Linux
+                self._server.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            try:
+                self._server.close()
+            except OSError:
+                pass
+            self._server = None
+        if self._lock_file is not None:
+            try:
+                os.remove(self.info_path)
+            except OSError:
+                pass
+            try:
+                _unlock(self._lock_file)
+            except OSError:
+                pass
+            self._lock_file.close()
+            self._lock_file = None
@@ -0,0 +1,76 @@
+import datetime
+import json
+import os
+import threading
+import time
+
+
+class StartupTimeline:
+    """Monotonic timestamps for the phases between process launch and a usable UI.
+
+    Each phase is recorded once (the first time it is reached), so events that
+    repeat on every navigation, like `loaded`, only count for the cold start.
+    Times are reported in milliseconds since `origin`, a time.perf_counter()
+    value taken as early as possible in the process.
+    """
+
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        # Wall-clock time corresponding to `origin`, for the report header
+        self.started_at = time.time() - (time.perf_counter() - self.origin)
+        self._marks = {}
+        self._lock = threading.Lock()
+
+    def mark(self, name, at=None):
+        """Record phase `name`; returns False if it was already recorded"""
+        at = time.perf_counter() if at is None else at
+        with self._lock:
+            if name in self._marks:
+                return False
+            self._marks[name] = at
+            return True
+
+    def has(self, name):
+        with self._lock:
+            return name in self._marks
+
+    def elapsed_ms(self, name):
+        with self._lock:
+            at = self._marks.get(name)
+        return None if at is None else (at - self.origin) * 1000
+
+    def phases(self):
+        """[{name, at_ms, delta_ms}] in the order the phases were reached"""
+        with self._lock:
+            marks = sorted(self._marks.items(), key=lambda item: item[1])
+        phases = []
+        previous = self.origin
+        for name, at in marks:
+            phases.append({
+                "name": name,
+                "at_ms": round((at - self.origin) * 1000, 2),
+                "delta_ms": round((at - previous) * 1000, 2)
+            })
+            previous = at
+        return phases
+
+    def to_dict(self):
+        phases = self.phases()
+        return {
+            "started_at": datetime.datetime.fromtimestamp(self.started_at).isoformat(timespec="milliseconds"),
+            "total_ms": phases[-1]["at_ms"] if phases else 0.0,
+            "phases": phases
+        }
+
+    def format(self):
+        lines = [f"{'phase':<20}{'at ms':>10}{'delta ms':>10}"]
+        for phase in self.phases():
+            lines.append(f"{phase['name']:<20}{phase['at_ms']:>10.1f}{phase['delta_ms']:>10.1f}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """Write the timeline as JSON to `path`"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
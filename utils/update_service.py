@@ -0,0 +1,248 @@
+import email.utils
+import json
+import logging
+import os
+import threading
+import time
+
+
+def _header(headers, name):
+    """Case-insensitive header lookup on a plain dict"""
+    name = name.lower()
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _retry_after(headers, now):
+    """Wall-clock time before which GitHub asked us not to call again, or None"""
+    value = _header(headers, "Retry-After")
+    if value:
+        try:
+            return now + max(0, int(value))
+        except ValueError:
+            try:
+                return email.utils.parsedate_to_datetime(value).timestamp()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                pass
+    remaining = _header(headers, "X-RateLimit-Remaining")
+    reset = _header(headers, "X-RateLimit-Reset")
+    if remaining is not None and reset is not None:
+        try:
+            if int(remaining) <= 0:
+                return float(reset)
+        except ValueError:
+            pass
+    return None
+
+
+class UpdateService:
+    """Background, single-flight update checker with a persistent TTL cache.
+
+    One instance is owned by DeepSeekApp. A scheduler thread re-checks once
+    the cached result is older than `ttl`; the bridge reads the cached result
+    without touching the network. A forced refresh joins a check that is
+    already running instead of starting another, and forced refreshes closer
+    together than `min_force_interval` are answered from the cache, so
+    repeated key presses cost at most one request.
+
+    Requests are conditional (If-None-Match), and GitHub's Retry-After and
+    X-RateLimit-* headers push the next request past the reset time. The
+    cache is a small JSON file so a restart within the TTL makes no request.
+    """
+
+    def __init__(self, app_dir, cache_path, ttl=6 * 3600, min_force_interval=60,
+                 initial_delay=5.0, timeout=15, checker_factory=None, log=None):
+        self.app_dir = app_dir
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.min_force_interval = min_force_interval
+        self.initial_delay = initial_delay
+        self.timeout = timeout
+        self.checker_factory = checker_factory
+        self.log = log
+        self._lock = threading.Lock()
+        self._inflight = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self._checker = None
+        self.requests_made = 0
+        self._state = self._load()
+
+    # --- persistence ---------------------------------------------------------
+
+    def _load(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if isinstance(state, dict):
+                return state
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _save(self):
+        # Caller holds self._lock
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._state, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            self._log(f"Could not save update cache: {e}", logging.WARNING)
+
+    def _log(self, msg, level=logging.INFO):
+        if self.log:
+            self.log(msg, level)
+
+    # --- checking ------------------------------------------------------------
+
+    def _get_checker(self):
+        if self._checker is None:
+            if self.checker_factory is None:
+                # Pulls in requests and rich; deferred until the first real check
+                from utils.auto_update import UpdateChecker
+                self.checker_factory = UpdateChecker
+            self._checker = self.checker_factory()
+        return self._checker
+
+    def _blocked_until(self):
+        return self._state.get("retry_after") or 0
+
+    def is_stale(self, now=None):
+        now = now or time.time()
+        return now - self._state.get("checked_at", 0) >= self.ttl
+
+    def _run_check(self, done):
+        try:
+            now = time.time()
+            with self._lock:
+                etag = self._state.get("etag")
+            try:
+                self.requests_made += 1
+                status, headers, latest, info = self._get_checker().fetch_release(etag, self.timeout)
+            except Exception as e:
+                self._log(f"Update check failed: {e}", logging.WARNING)
+                with self._lock:
+                    self._state["last_error"] = str(e)
+                    # Don't hammer a failing network; retry after a short pause
+                    self._state["retry_after"] = now + min(self.ttl, 300)
+                    self._save()
+                return
+
+            with self._lock:
+                retry_after = _retry_after(headers, now)
+                self._state["retry_after"] = retry_after
+                if status == 200 and latest:
+                    self._state.update({
+                        "checked_at": now,
+                        "etag": _header(headers, "ETag"),
+                        "latest_version": latest,
+                        "release_notes": info.get("body", "") if info else "",
+                        "last_error": None
+                    })
+                    self._log(f"Update check: latest release is {latest}")
+                elif status == 304:
+                    self._state["checked_at"] = now
+                    self._state["last_error"] = None
+                    self._log("Update check: release unchanged (304)", logging.DEBUG)
+                else:
+                    self._state["last_error"] = f"HTTP {status}"
+                    if retry_after:
+                        self._log(f"Update check rate limited until "
+                                  f"{time.strftime('%H:%M:%S', time.localtime(retry_after))}", logging.WARNING)
+                    else:
+                        self._log(f"Update check returned HTTP {status}", logging.WARNING)
+                        self._state["retry_after"] = now + min(self.ttl, 300)
+                self._save()
+        finally:
+            with self._lock:
+                self._inflight = None
+            done.set()
+
+    def refresh(self, force=False):
+        """Start a check unless one is running, cached data is fresh or we are rate limited.
+
+        Returns the threading.Event of the running (or just started) check, or
+        None when no check was needed.
+        """
+        now = time.time()
+        with self._lock:
+            if self._inflight is not None:
+                return self._inflight
+            if now < self._blocked_until():
+                return None
+            age = now - self._state.get("checked_at", 0)
+            if force:
+                if age < self.min_force_interval:
+                    return None
+            elif age < self.ttl:
+                return None
+            done = threading.Event()
+            self._inflight = done
+        threading.Thread(target=self._run_check, args=(done,), name="update-check", daemon=True).start()
+        return done
+
+    def check(self, force=False, wait=None):
+        """Result for the bridge, from cache.
+
+        With `force`, a refresh is started (or joined) and waited on for up to
+        `wait` seconds (default: the request timeout) before answering.
+        """
+        if force:
+            done = self.refresh(force=True)
+            if done is not None:
+                done.wait(self.timeout if wait is None else wait)
+        elif self.is_stale():
+            done = self.refresh()
+            # With nothing cached yet there is no answer to give; otherwise
+            # answer now and let the next call see the new result
+            if done is not None and not self._state.get("latest_version"):
+                done.wait(self.timeout if wait is None else wait)
+        return self.result()
+
+    def result(self):
+        from utils.auto_update import compare_versions, get_current_version
+
+        with self._lock:
+            state = dict(self._state)
+            checking = self._inflight is not None
+        current = get_current_version(self.app_dir)
+        latest = state.get("latest_version")
+        return {
+            "need_update": bool(latest) and not compare_versions(current, latest),
+            "current_version": current,
+            "latest_version": latest,
+            "release_notes": state.get("release_notes", ""),
+            "checked_at": state.get("checked_at"),
+            "checking": checking,
+            "rate_limited_until": state.get("retry_after") if (state.get("retry_after") or 0) > time.time() else None,
+            "last_error": state.get("last_error")
+        }
+
+    # --- scheduling ----------------------------------------------------------
+
+    def _schedule(self):
+        if self._stop.wait(self.initial_delay):
+            return
+        while not self._stop.is_set():
+            done = self.refresh()
+            if done is not None:
+                done.wait()
+            with self._lock:
+                next_due = max(self._state.get("checked_at", 0) + self.ttl, self._blocked_until())
+            delay = max(1.0, next_due - time.time())
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._schedule, name="update-service", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
@@ -0,0 +1,231 @@
+"""
+Vendors the third-party resources used by injection/inject.js.
+
+Downloads pinned versions of marked, DOMPurify and the Inter / JetBrains Mono
+web fonts into injection/vendor/ and records each file's Subresource
+Integrity hash in injection/vendor/vendor.json. The local server then serves
+them to the page, with the CDN only used as a fallback.
+
+The scripts' sha384 values are committed in RESOURCES, so a download that
+does not match them is refused instead of being pinned, and the page checks
+the same values on the CDN fallback. Fonts are not pinned: Google Fonts
+tailors its CSS to the client.
+
+Usage:
+    python utils/vendor_assets.py            # download anything missing
+    python utils/vendor_assets.py --update   # re-download everything
+    python utils/vendor_assets.py --verify   # check files against vendor.json
+    python utils/vendor_assets.py --pin      # print the SRI values to commit after a version bump
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import re
+import sys
+import urllib.request
+
+VENDOR_DIR = os.path.join("injection", "vendor")
+MANIFEST_NAME = "vendor.json"
+
+# Pinned sources. Keys match CONFIG.resources in inject.js. Scripts must carry the
+# sha384 SRI of the pinned file (see --pin); without it they are not vendored.
+RESOURCES = {
+    "marked": {
+        "url": "https://cdn.jsdelivr.net/npm/marked@15.0.12/marked.min.js",
+        "file": "marked.min.js",
+        "type": "script",
+        "integrity": None
+    },
+    "domPurify": {
+        "url": "https://cdn.jsdelivr.net/npm/dompurify@3.0.5/dist/purify.min.js",
+        "file": "purify.min.js",
+        "type": "script",
+        "integrity": None
+    },
+    "fontInter": {
+        "url": "https://fonts.googleapis.com/css2?family=Inter:wght@100..900&display=swap",
+        "file": "inter.css",
+        "type": "font-css"
+    },
+    "fontMono": {
+        "url": "https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@100..800&display=swap",
+        "file": "jetbrains-mono.css",
+        "type": "font-css"
+    }
+}
+
+# Google Fonts only returns woff2 sources to browsers it recognises
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36")
+
+FONT_URL_RE = re.compile(r"url\((https://fonts\.gstatic\.com/[^)]+)\)")
+
+
+def sri_hash(data):
+    """Subresource Integrity value (sha384) for a blob"""
+    return "sha384-" + base64.b64encode(hashlib.sha384(data).digest()).decode("ascii")
+
+
+def fetch(url):
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return response.read()
+
+
+def manifest_path(root):
+    return os.path.join(root, VENDOR_DIR, MANIFEST_NAME)
+
+
+def load_manifest(root="."):
+    """Read vendor.json; returns {} when nothing has been vendored"""
+    try:
+        with open(manifest_path(root), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def client_manifest(root="."):
+    """Vendored resources in the shape inject.js expects: name -> {path, integrity}.
+
+    Entries whose file is missing are left out so the page goes straight to the CDN.
+    """
+    resources = {}
+    for name, entry in load_manifest(root).get("resources", {}).items():
+        if os.path.exists(os.path.join(root, VENDOR_DIR, entry["file"])):
+            resources[name] = {
+                "path": "/" + "/".join([VENDOR_DIR.replace(os.sep, "/"), entry["file"]]),
+                "integrity": entry["integrity"]
+            }
+    return resources
+
+
+def pinned_integrity():
+    """Committed SRI values by resource name, for the page's CDN fallback"""
+    return {name: spec["integrity"] for name, spec in RESOURCES.items() if spec.get("integrity")}
+
+
+def vendor_font_css(css, vendor_dir):
+    """Download the font files referenced by a Google Fonts stylesheet and point it at them"""
+    fonts_dir = os.path.join(vendor_dir, "fonts")
+    os.makedirs(fonts_dir, exist_ok=True)
+    files = {}
+
+    def replace(match):
+        url = match.group(1)
+        name = url.rsplit("/", 1)[-1]
+        data = fetch(url)
+        with open(os.path.join(fonts_dir, name), "wb") as f:
+            f.write(data)
+        files["fonts/" + name] = sri_hash(data)
+        return f"url(fonts/{name})"
+
+    return FONT_URL_RE.sub(replace, css), files
+
+
+def vendor(root=".", update=False):
+    vendor_dir = os.path.join(root, VENDOR_DIR)
+    os.makedirs(vendor_dir, exist_ok=True)
+    manifest = load_manifest(root)
+    entries = manifest.setdefault("resources", {})
+    ok = True
+
+    for name, spec in RESOURCES.items():
+        target = os.path.join(vendor_dir, spec["file"])
+        previous = entries.get(name)
+        pinned = spec.get("integrity")
+        if spec["type"] == "script" and not pinned:
+            print(f"[FAIL] {name}: no integrity pinned in RESOURCES; run --pin and commit the value")
+            ok = False
+            continue
+        if (not update and previous and previous.get("url") == spec["url"] and os.path.exists(target)
+                and (pinned is None or previous.get("integrity") == pinned)):
+            print(f"[OK] {name}: already vendored")
+            continue
+
+        print(f"Downloading {name} from {spec['url']}...")
+        data = fetch(spec["url"])
+        extra_files = {}
+        if spec["type"] == "font-css":
+            css, extra_files = vendor_font_css(data.decode("utf-8"), vendor_dir)
+            data = css.encode("utf-8")
+        elif sri_hash(data) != pinned:
+            # The CDN served something other than the pinned file: refuse it
+            print(f"[FAIL] {name}: got {sri_hash(data)}, expected {pinned}")
+            ok = False
+            continue
+
+        with open(target, "wb") as f:
+            f.write(data)
+        entries[name] = {
+            "url": spec["url"],
+            "file": spec["file"],
+            "integrity": sri_hash(data),
+            "files": extra_files
+        }
+        print(f"[OK] {name}: {len(data)} bytes, {entries[name]['integrity']}")
+
+    with open(manifest_path(root), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return ok
+
+
+def verify(root="."):
+    vendor_dir = os.path.join(root, VENDOR_DIR)
+    entries = load_manifest(root).get("resources", {})
+    if not entries:
+        print("Nothing vendored yet.")
+        return False
+
+    ok = True
+    for name, entry in entries.items():
+        files = dict(entry.get("files", {}))
+        files[entry["file"]] = entry["integrity"]
+        resource_ok = True
+        pinned = RESOURCES.get(name, {}).get("integrity")
+        if pinned and entry["integrity"] != pinned:
+            print(f"[FAIL] {name}: vendor.json does not match the integrity pinned in RESOURCES")
+            resource_ok = False
+        for rel, expected in files.items():
+            path = os.path.join(vendor_dir, rel)
+            try:
+                with open(path, "rb") as f:
+                    actual = sri_hash(f.read())
+            except OSError:
+                print(f"[FAIL] {name}: {rel} is missing")
+                resource_ok = False
+                continue
+            if actual != expected:
+                print(f"[FAIL] {name}: {rel} does not match vendor.json")
+                resource_ok = False
+        if resource_ok:
+            print(f"[OK] {name}")
+        ok = ok and resource_ok
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vendor third-party assets for the injected script.")
+    parser.add_argument("--update", action="store_true", help="Re-download every resource.")
+    parser.add_argument("--verify", action="store_true", help="Only check vendored files against vendor.json.")
+    parser.add_argument("--pin", action="store_true",
+                        help="Download the pinned scripts and print their SRI values for RESOURCES.")
+    parser.add_argument("--root", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        help="Project root (default: the repository root).")
+    args = parser.parse_args()
+
+    if args.verify:
+        sys.exit(0 if verify(args.root) else 1)
+    if args.pin:
+        for name, spec in RESOURCES.items():
+            if spec["type"] == "script":
+                print(f'{name}: "integrity": "{sri_hash(fetch(spec["url"]))}"')
+        return
+    sys.exit(0 if vendor(args.root, update=args.update) else 1)
+
+
+if __name__ == "__main__":
+    main()